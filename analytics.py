@@ -0,0 +1,109 @@
+from history import COMPLETE, day_number
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback below
+    np = None
+
+
+# ---------- Streak / completion analytics ----------
+# Statistics for many habits are computed from a (habits x days) matrix of
+# daily best progress values taken from HabitHistory. With NumPy the whole
+# matrix is processed in a few array operations; without it the same numbers
+# come from plain loops. Results are cached per habit and only recomputed when
+# that habit's history changed (or the day rolled over).
+RATE_WINDOWS = (7, 30)
+
+
+class HabitAnalytics:
+    def __init__(self, history, window=365, use_numpy=True):
+        self.history = history
+        self.window = window
+        self.use_numpy = use_numpy and np is not None
+        self._cache = {}  # habit id -> (history version, today, stats)
+
+    def habit_stats(self, habits, today=None):
+        # {habit id: {"current_streak", "longest_streak", "rate_7", "rate_30"}}
+        today = day_number() if today is None else today
+        result = {}
+        stale = []
+        for habit in habits:
+            version = self.history.version(habit.habit_id)
+            cached = self._cache.get(habit.habit_id)
+            if cached is not None and cached[0] == version and cached[1] == today:
+                result[habit.habit_id] = cached[2]
+            else:
+                stale.append((habit.habit_id, version))
+
+        if stale:
+            rows = [self.history.last_days(hid, self.window, today) for hid, _ in stale]
+            compute = self._compute_numpy if self.use_numpy else self._compute_python
+            for (hid, version), stats in zip(stale, compute(rows)):
+                self._cache[hid] = (version, today, stats)
+                result[hid] = stats
+        return result
+
+    def category_stats(self, habits, per_habit=None):
+        # Per category: habit count, and current progress / completion rates
+        # averaged with each habit's increment as its weight
+        per_habit = per_habit if per_habit is not None else self.habit_stats(habits)
+        groups = {}
+        for habit in habits:
+            groups.setdefault(habit.category, []).append(habit)
+
+        out = {}
+        for category, members in groups.items():
+            weights = [max(h.increment, 1e-9) for h in members]
+            total = sum(weights)
+            entry = {
+                "habits": len(members),
+                "avg_progress": sum(w * h.progress for w, h in zip(weights, members)) / total,
+                "best_streak": max(per_habit[h.habit_id]["longest_streak"] for h in members),
+            }
+            for n in RATE_WINDOWS:
+                key = f"rate_{n}"
+                entry[key] = sum(w * per_habit[h.habit_id][key] for w, h in zip(weights, members)) / total
+            out[category] = entry
+        return out
+
+    # ----- kernels -----
+    def _compute_numpy(self, rows):
+        done = np.asarray(rows, dtype=np.float32) >= COMPLETE   # (habits, days)
+        counts = np.cumsum(done, axis=1)
+        # length of the run of completed days ending at each column: the running
+        # count minus the count at the last missed day before it
+        last_reset = np.maximum.accumulate(np.where(done, 0, counts), axis=1)
+        runs = counts - last_reset
+        longest = runs.max(axis=1)
+        # today still counts while it is in progress: fall back to yesterday's run
+        current = np.where(done[:, -1], runs[:, -1], runs[:, -2] if done.shape[1] > 1 else 0)
+        rates = {n: done[:, -n:].mean(axis=1) for n in RATE_WINDOWS}
+        return [
+            {
+                "current_streak": int(current[i]),
+                "longest_streak": int(longest[i]),
+                **{f"rate_{n}": float(rates[n][i]) for n in RATE_WINDOWS},
+            }
+            for i in range(done.shape[0])
+        ]
+
+    def _compute_python(self, rows):
+        out = []
+        for values in rows:
+            done = [v >= COMPLETE for v in values]
+            longest = run = 0
+            runs = []
+            for d in done:
+                run = run + 1 if d else 0
+                runs.append(run)
+                longest = max(longest, run)
+            if done and done[-1]:
+                current = runs[-1]
+            else:
+                current = runs[-2] if len(runs) > 1 else 0
+            stats = {"current_streak": current, "longest_streak": longest}
+            for n in RATE_WINDOWS:
+                window = done[-n:]
+                stats[f"rate_{n}"] = sum(window) / float(len(window)) if window else 0.0
+            out.append(stats)
+        return out
@@ -1,28 +1,134 @@
-import json
-import os
+import sys
+import time
+
+# reference point of the startup report (before the GUI toolkit is imported)
+STARTUP_T0 = time.perf_counter()
+
+# Storage backend: "json" (HABITS_FILE, optionally journaled) or "sqlite" (SQLITE_FILE)
+STORAGE_BACKEND = "json"
+HABITS_FILE = "habits.json"
+SQLITE_FILE = "habits.db"
+
+# Quiet period (ms) after the last change before habits are written to disk
+SAVE_QUIET_MS = 750
+
+# Journaled storage: mutations are appended to JOURNAL_FILE and folded into
+# HABITS_FILE in the background once the journal grows past the threshold
+USE_JOURNAL = True
+JOURNAL_FILE = "habits.journal"
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Previous versions of HABITS_FILE kept as habits.json.1 .. .N (used when the
+# file cannot be read), and when writes are fsynced: "always", "close" or "none"
+# ("always" flushes every journal append to disk from the Tk thread)
+SNAPSHOT_KEEP = 3
+DURABILITY = "close"
+
+# Per-habit completion history (binary, one file per habit)
+HISTORY_DIR = "history"
+
+# How often (ms) to check whether another window or cli.py changed the data files
+EXTERNAL_POLL_MS = 1000
+
+# Named profiles (one habit set per person): the default profile uses the
+# files above, every other profile the same file names in PROFILES_DIR/<name>/
+PROFILES_DIR = "profiles"
+
+# ---------- Command line ----------
+# "python app.py habit <command> ..." runs the scripting interface in cli.py on
+# the same files, without importing the GUI toolkit
+if __name__ == "__main__" and sys.argv[1:2] == ["habit"]:
+    import cli
+
+    sys.exit(cli.main(sys.argv[2:], backend=STORAGE_BACKEND, json_path=HABITS_FILE,
+                      journal_path=JOURNAL_FILE if USE_JOURNAL else None, sqlite_path=SQLITE_FILE,
+                      snapshots=SNAPSHOT_KEEP, durability=DURABILITY, history_dir=HISTORY_DIR,
+                      profiles_dir=PROFILES_DIR))
+
+import bisect
 import datetime
+import functools
+import importlib
+import itertools
+import tkinter
+from contextlib import contextmanager
 import customtkinter as ctk
-from tkinter import simpledialog, messagebox
+from tkinter import font as tkfont
+
+from habit_store import Habit, HabitStore
+from history import DayRolloverScheduler, HabitHistory, roll_over
+from profiles import ProfileError, ProfileManager
+from reminders import HabitReminders
+from search_index import HabitIndex, PROGRESS_FACETS
+from storage import JsonStorage, SqliteStorage, open_storage
+from transfer import ExportJob, ImportJob, TransferError, habit_key
+
+
+class _LazyModule:
+    # Imports the module on first attribute access (dialog modules are only
+    # needed once a dialog is actually shown)
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+simpledialog = _LazyModule("tkinter.simpledialog")
+messagebox = _LazyModule("tkinter.messagebox")
+filedialog = _LazyModule("tkinter.filedialog")
+
+STARTUP_IMPORTED = time.perf_counter()
 
 # ---------- Appearance defaults ----------
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
+# applied when the first HabitTrackerApp is created
+APPEARANCE_MODE = "dark"
+COLOR_THEME = "blue"
 
-HABITS_FILE = "habits.json"
+# Progress ring renderer for habit cards: "light" draws on one plain canvas,
+# "frame" wraps a canvas in a CTkFrame (the original widget)
+PROGRESS_RENDERER = "light"
 
-# Default categories
-DEFAULT_CATEGORIES = [
-    "Health",
-    "Fitness",
-    "Productivity",
-    "Learning",
-    "Work",
-    "Personal",
-    "Finance",
-    "Chores",
-    "Social",
-    "Other",
-]
+# Cards of a category group collapsed for this long are destroyed (rebuilt on
+# the next expand); None keeps them
+COLLAPSED_RELEASE_MS = 5 * 60 * 1000
+
+# Dashboard list mode: "classic" builds one card per habit, "virtual" recycles a
+# small pool of cards while scrolling, "auto" switches to virtual for big sets
+DASHBOARD_MODE = "auto"
+VIRTUAL_LIST_THRESHOLD = 300
+
+# habits added to the dashboard per event-loop turn while a file is loading
+LOAD_CHUNK = 500
+
+# Build pages other than the dashboard the first time they are shown
+LAZY_PAGES = True
+
+# how often (ms) a running import/export reports progress and hands over parsed rows
+TRANSFER_POLL_MS = 50
+
+# last entry of the sidebar's profile menu
+NEW_PROFILE = "New profile..."
+
+# reminder intervals offered in the habit dialogs (minutes; None = off)
+REMINDER_CHOICES = {
+    "No reminder": None,
+    "Every 30 minutes": 30,
+    "Every hour": 60,
+    "Every 2 hours": 120,
+    "Every 3 hours": 180,
+    "Every 4 hours": 240,
+}
+
+
+def reminder_label(minutes):
+    for label, value in REMINDER_CHOICES.items():
+        if value == minutes:
+            return label
+    return f"Every {minutes} minutes"
 
 
 # Minimal DateTimeDisplay (keeps behavior simple and always packs)
@@ -42,23 +148,115 @@ class DateTimeDisplay(ctk.CTkLabel):
             pass
 
 
+# ---------- Other processes' changes ----------
+class ExternalChangeWatcher:
+    # Polls (one pending after()) whether another process changed the data
+    # files; the storage merges only the changed habits into the store, and the
+    # store's "merge" event refreshes just their cards.
+    def __init__(self, app, interval_ms=EXTERNAL_POLL_MS):
+        self.app = app
+        self.interval_ms = interval_ms
+        self._timer = None
+
+    def start(self):
+        self.cancel()
+        self._timer = self.app.after(self.interval_ms, self._fire)
+
+    def cancel(self):
+        if self._timer is not None:
+            try:
+                self.app.after_cancel(self._timer)
+            except Exception:
+                pass
+            self._timer = None
+
+    def _fire(self):
+        self._timer = None
+        self.app.merge_external_changes()
+        self.start()
+
+
+# ---------- Render scheduling ----------
+class RenderScheduler:
+    # Dirty set of habits whose widgets are out of date. Store events only mark
+    # habits here; a single after_idle callback then hands the set to every
+    # registered renderer once the pending events are processed, so a burst of
+    # clicks or a bulk change costs one widget update per habit per frame
+    # instead of one per mutation. A renderer is called with a list of records,
+    # or with None when every habit changed (mark_all).
+    def __init__(self, widget, store):
+        self.widget = widget
+        self.store = store
+        self._renderers = []
+        self._dirty = set()
+        self._everything = False
+        self._pending = None
+        self.marks = 0
+        self.flushes = 0
+
+    def add_renderer(self, renderer):
+        self._renderers.append(renderer)
+
+    def mark(self, habit_id):
+        self.marks += 1
+        self._dirty.add(habit_id)
+        self._schedule()
+
+    def mark_all(self):
+        self.marks += 1
+        self._everything = True
+        self._schedule()
+
+    def _schedule(self):
+        if self._pending is None:
+            self._pending = self.widget.after_idle(self.flush)
+
+    def flush(self):
+        if self._pending is not None:
+            try:
+                self.widget.after_cancel(self._pending)
+            except Exception:
+                pass
+            self._pending = None
+        dirty, self._dirty = self._dirty, set()
+        everything, self._everything = self._everything, False
+        if not dirty and not everything:
+            return
+        self.flushes += 1
+        records = None if everything else [r for r in map(self.store.get, dirty) if r is not None]
+        for renderer in self._renderers:
+            renderer(records)
+
+    def stats(self):
+        return {"marks": self.marks, "flushes": self.flushes, "coalesced": max(0, self.marks - self.flushes)}
+
+
 # ---------- Circular progress widget ----------
-class CircularProgress(ctk.CTkFrame):
-    def __init__(self, master, size=120, thickness=10, progress=0.0, progress_color="#1f6aa5", **kwargs):
-        super().__init__(master, fg_color="#1b1b1b", **kwargs)
+@functools.lru_cache(maxsize=None)
+def ring_geometry(size, thickness):
+    # (bounding box of the ring, centre) for a ring of this size
+    return (thickness, thickness, size - thickness, size - thickness), size / 2
+
+
+@functools.lru_cache(maxsize=None)
+def ring_font(size):
+    # one shared named font per ring size instead of a font spec parsed per item
+    return tkfont.Font(family="Arial", size=14 if size >= 60 else max(7, size // 5), weight="bold")
 
+
+class _RingDrawing:
+    # Drawing shared by CircularProgress and RingCanvas. Items are created once
+    # and afterwards only reconfigured, and only when the visible integer
+    # percent changed.
+    def _init_ring(self, size, thickness, progress, progress_color):
         self.size = size
         self.thickness = thickness
         self.progress = max(0.0, min(1.0, progress))
         self.progress_color = progress_color
-
-        self.canvas = ctk.CTkCanvas(self, width=size, height=size, bg=self.cget("fg_color"), highlightthickness=0)
-        self.canvas.pack()
-
         self.text_id = None
         self.bg_ring = None
         self.progress_arc = None
-        self.draw()
+        self._shown_percent = None
 
     def set_progress(self, value: float):
         self.progress = max(0.0, min(1.0, value))
@@ -66,22 +264,15 @@ class CircularProgress(ctk.CTkFrame):
 
     def draw(self):
         self.canvas.delete("all")
-        radius = self.size / 2
-        start_angle = -90
-        extent_angle = self.progress * 360
+        box, radius = ring_geometry(self.size, self.thickness)
+        percent = int(self.progress * 100)
 
-        self.bg_ring = self.canvas.create_oval(
-            self.thickness, self.thickness,
-            self.size - self.thickness, self.size - self.thickness,
-            width=self.thickness,
-            outline="#444444"
-        )
+        self.bg_ring = self.canvas.create_oval(*box, width=self.thickness, outline="#444444")
 
         self.progress_arc = self.canvas.create_arc(
-            self.thickness, self.thickness,
-            self.size - self.thickness, self.size - self.thickness,
-            start=start_angle,
-            extent=extent_angle,
+            *box,
+            start=-90,
+            extent=percent * 3.6,
             style="arc",
             width=self.thickness,
             outline=self.progress_color
@@ -89,34 +280,194 @@ class CircularProgress(ctk.CTkFrame):
 
         self.text_id = self.canvas.create_text(
             radius, radius,
-            text=f"{int(self.progress * 100)}%",
+            text=f"{percent}%",
             fill="white",
-            font=("Arial", 14, "bold")
+            font=ring_font(self.size)
         )
+        self._shown_percent = percent
 
     def update_draw(self):
         if self.progress_arc is None:
             self.draw()
             return
-        self.canvas.itemconfig(self.progress_arc, extent=self.progress * 360)
-        self.canvas.itemconfig(self.text_id, text=f"{int(self.progress * 100)}%")
+        percent = int(self.progress * 100)
+        if percent == self._shown_percent:
+            return
+        self._shown_percent = percent
+        self.canvas.itemconfig(self.progress_arc, extent=percent * 3.6)
+        self.canvas.itemconfig(self.text_id, text=f"{percent}%")
 
     def to_dict(self):
         return {"progress": self.progress}
 
 
+class CircularProgress(_RingDrawing, ctk.CTkFrame):
+    def __init__(self, master, size=120, thickness=10, progress=0.0, progress_color="#1f6aa5", **kwargs):
+        super().__init__(master, fg_color="#1b1b1b", **kwargs)
+        self._init_ring(size, thickness, progress, progress_color)
+
+        self.canvas = ctk.CTkCanvas(self, width=size, height=size, bg=self.cget("fg_color"), highlightthickness=0)
+        self.canvas.pack()
+        self.draw()
+
+
+class RingCanvas(_RingDrawing, tkinter.Canvas):
+    # Lighter renderer: a single plain canvas instead of a CTkFrame holding a canvas
+    def __init__(self, master, size=120, thickness=10, progress=0.0, progress_color="#1f6aa5", **kwargs):
+        super().__init__(master, width=size, height=size, bg="#1b1b1b", highlightthickness=0, **kwargs)
+        self._init_ring(size, thickness, progress, progress_color)
+        self.canvas = self
+        self.draw()
+
+
+def make_progress_widget(master, **kwargs):
+    cls = RingCanvas if PROGRESS_RENDERER == "light" else CircularProgress
+    return cls(master, **kwargs)
+
+
+# ---------- Progress ring grid ----------
+class ProgressRingGrid(ctk.CTkFrame):
+    # Many habits' progress rings drawn on one canvas (a few canvas items per
+    # habit instead of a widget tree per habit). Clicking a ring adds that
+    # habit's increment.
+    RING = 64
+    THICKNESS = 6
+    CELL_W = 110
+    CELL_H = 96
+
+    def __init__(self, master, app, max_rings=500, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.app = app
+        self.max_rings = max_rings
+        self._items = {}     # habit id -> (arc item, percent text item, name text item)
+        self._shown = {}     # habit id -> displayed percent
+        self._stale = True
+        self._columns = 0
+
+        self.canvas = ctk.CTkCanvas(self, bg="#1b1b1b", highlightthickness=0)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", expand=True, fill="both")
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.canvas.bind("<Button-1>", self._on_click)
+
+    def attach(self, store):
+        store.subscribe(self._on_store_event)
+        self.app.render.add_renderer(self.render)
+
+    def _on_store_event(self, event, habit, changes):
+        events = changes if event in ("batch", "merge") else [(event, habit, changes)]
+        for event, habit, changes in events:
+            if event in ("add", "remove", "reload", "load") or (event == "update" and "name" in changes):
+                self._stale = True
+            elif event == "update" and "progress" in changes:
+                self.app.render.mark(habit.habit_id)
+            elif event == "all" and "progress" in changes:
+                self.app.render.mark_all()
+        if self._stale and self.winfo_ismapped():
+            self.redraw()
+
+    def render(self, records):
+        # RenderScheduler renderer: redraw the rings of changed habits
+        for habit in self.app.store if records is None else records:
+            self.update_habit(habit)
+
+    def show(self):
+        if self._stale:
+            self.redraw()
+
+    def _on_resize(self, event):
+        columns = max(1, event.width // self.CELL_W)
+        if columns != self._columns:
+            self.redraw()
+
+    def redraw(self):
+        self._stale = False
+        self.canvas.delete("all")
+        self._items.clear()
+        self._shown.clear()
+        self._columns = max(1, self.canvas.winfo_width() // self.CELL_W)
+        box, _ = ring_geometry(self.RING, self.THICKNESS)
+        font = ring_font(self.RING)
+        all_habits = list(self.app.store)
+        habits = all_habits[:self.max_rings]
+        for i, habit in enumerate(habits):
+            x0 = (i % self._columns) * self.CELL_W + (self.CELL_W - self.RING) // 2
+            y0 = (i // self._columns) * self.CELL_H + 6
+            tag = f"h:{habit.habit_id}"
+            percent = int(habit.progress * 100)
+            # (filled with the background so a click inside the ring hits it)
+            self.canvas.create_oval(box[0] + x0, box[1] + y0, box[2] + x0, box[3] + y0,
+                                    width=self.THICKNESS, outline="#444444", fill="#1b1b1b", tags=tag)
+            arc = self.canvas.create_arc(box[0] + x0, box[1] + y0, box[2] + x0, box[3] + y0, start=-90,
+                                         extent=percent * 3.6, style="arc", width=self.THICKNESS,
+                                         outline="#1f6aa5", tags=tag)
+            text = self.canvas.create_text(x0 + self.RING / 2, y0 + self.RING / 2, text=f"{percent}%",
+                                           fill="white", font=font, tags=tag)
+            name = self.canvas.create_text(x0 + self.RING / 2, y0 + self.RING + 12, text=habit.name[:14],
+                                           fill="#cccccc", font=("Arial", 10), tags=tag)
+            self._items[habit.habit_id] = (arc, text, name)
+            self._shown[habit.habit_id] = percent
+        rows = (len(habits) + self._columns - 1) // self._columns
+        height = rows * self.CELL_H + 6
+        hidden = len(all_habits) - len(habits)
+        if hidden > 0:
+            self.canvas.create_text(8, height + 4, anchor="nw", fill="#cccccc", font=("Arial", 11),
+                                    text=f"+{hidden} more (showing the first {self.max_rings}; see the dashboard)")
+            height += 30
+        self.canvas.configure(scrollregion=(0, 0, self._columns * self.CELL_W, height))
+
+    def update_habit(self, habit):
+        items = self._items.get(habit.habit_id)
+        if items is None:
+            return
+        percent = int(habit.progress * 100)
+        if self._shown.get(habit.habit_id) == percent:
+            return
+        self._shown[habit.habit_id] = percent
+        self.canvas.itemconfig(items[0], extent=percent * 3.6)
+        self.canvas.itemconfig(items[1], text=f"{percent}%")
+
+    def _on_click(self, event):
+        # only a click on a ring (or its labels) counts, not one on empty canvas
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        for item in reversed(self.canvas.find_overlapping(x, y, x, y)):
+            for tag in self.canvas.gettags(item):
+                if tag.startswith("h:"):
+                    habit = self.app.store.get(tag[2:])
+                    if habit is not None:
+                        self.app.store.update(habit, progress=min(1.0, habit.progress + habit.increment))
+                    return
+
+
 # ---------- Collapsible Group Frame (for categories) ----------
 class CollapsibleGroup(ctk.CTkFrame):
-    def __init__(self, master, title, *args, **kwargs):
+    # A group that starts collapsed has no cards until it is first expanded
+    # (on_build creates them); after staying collapsed for release_ms its cards
+    # are handed to on_release to be destroyed, and rebuilt on the next expand.
+    # When the store is reloaded (another profile) the group and its cards are
+    # kept: park() hides the cards in `spare` until they are re-bound.
+    def __init__(self, master, title, *args, collapsed=False, on_build=None, on_release=None, on_toggle=None,
+                 release_ms=None, **kwargs):
         super().__init__(master, **kwargs)
         self.title = title
-        self.visible = True
+        self.visible = not collapsed
+        self.built = not collapsed
+        self.shown = None  # widgets matching the dashboard search (None = all)
+        self.spare = []    # parked cards, not bound to any habit
+        self.parked = False
+        self.on_build = on_build
+        self.on_release = on_release
+        self.on_toggle = on_toggle
+        self.release_ms = release_ms
+        self._release_timer = None
 
         self.header = ctk.CTkFrame(self, fg_color="transparent")
         self.header.pack(fill="x", padx=4, pady=(6, 0))
 
-        self.toggle_btn = ctk.CTkButton(self.header, text=f"▼ {self.title}", anchor="w", command=self.toggle,
-                                        height=28, fg_color="#2a2a2a", corner_radius=6)
+        self.toggle_btn = ctk.CTkButton(self.header, text=f"{'▼' if self.visible else '▶'} {self.title}", anchor="w",
+                                        command=self.toggle, height=28, fg_color="#2a2a2a", corner_radius=6)
         self.toggle_btn.pack(fill="x")
 
         self.content = ctk.CTkFrame(self, fg_color="transparent")
@@ -130,34 +481,91 @@ class CollapsibleGroup(ctk.CTkFrame):
             self.content.forget = True
             self.toggle_btn.configure(text=f"▶ {self.title}")
             self.visible = False
+            if self.release_ms is not None and self.on_release is not None:
+                self._release_timer = self.after(self.release_ms, self._release)
         else:
             # show
-            for w in self.content.winfo_children():
-                w.pack(pady=8, padx=12, fill="x")
+            if self._release_timer is not None:
+                self.after_cancel(self._release_timer)
+                self._release_timer = None
             self.toggle_btn.configure(text=f"▼ {self.title}")
             self.visible = True
+            if not self.built:
+                # first expand (or first since the cards were released): cards pack themselves
+                self.built = True
+                if self.on_build is not None:
+                    self.on_build(self)
+            else:
+                for w in self.shown if self.shown is not None else self.cards():
+                    w.pack(pady=8, padx=12, fill="x")
+        if self.on_toggle is not None:
+            self.on_toggle(self)
+
+    def _release(self):
+        self._release_timer = None
+        if self.visible or not self.built:
+            return
+        self.built = False
+        self.shown = None
+        self.on_release(self)
+
+    def cards(self):
+        spare = set(self.spare)
+        return [w for w in self.content.winfo_children() if w not in spare]
 
     def add_widget(self, widget):
-        widget.pack(pady=8, padx=12, fill="x")
+        if self.visible:
+            widget.pack(pady=8, padx=12, fill="x")
+
+    def set_shown(self, widgets):
+        # Pack only `widgets` (in the given order), or every card again for None
+        self.shown = widgets
+        for w in self.content.winfo_children():
+            w.pack_forget()
+        if self.visible:
+            for w in widgets if widgets is not None else self.cards():
+                w.pack(pady=8, padx=12, fill="x")
+
+    # ----- reuse after a reload -----
+    def park(self):
+        for w in self.cards():
+            w.pack_forget()
+            self.spare.append(w)
+        self.parked = True
+
+    def take_spare(self):
+        return self.spare.pop() if self.spare else None
+
+    def reset(self, collapsed):
+        # back to the state of a new group (cards come from take_spare / on_build)
+        if self._release_timer is not None:
+            self.after_cancel(self._release_timer)
+            self._release_timer = None
+        self.visible = not collapsed
+        self.built = not collapsed
+        self.shown = None
+        self.parked = False
+        self.toggle_btn.configure(text=f"{'▼' if self.visible else '▶'} {self.title}")
 
 
 # ---------- HabitCard ----------
 class HabitCard(ctk.CTkFrame):
-    def __init__(self, master, app, name, category="Other", progress=0.0, increment=0.1, save_callback=None,
-                 **kwargs):
+    # A card is a view of one Habit from the app's HabitStore; in the virtualized
+    # dashboard the same card is re-bound to different habits as the user scrolls.
+    # Card actions only mutate the store; the app refreshes cards from store events.
+    def __init__(self, master, app, record, **kwargs):
         super().__init__(master, fg_color="#222222", corner_radius=8, **kwargs)
 
-        self.app = app  # reference to main app for operations like remove
-        self.habit_name = name
-        self.category = category
-        self.increment = increment
-        self.save_callback = save_callback
+        self.app = app  # reference to main app (and its store)
+        self.record = record
 
         # Layout: left = progress widget, center = label, right = controls
-        self.progress_widget = CircularProgress(self, size=78, thickness=8, progress=progress)
+        self.progress_widget = make_progress_widget(self, size=78, thickness=8, progress=record.progress)
         self.progress_widget.pack(side="left", padx=12, pady=12)
 
-        # Middle label (name + category + progress)
+        # Middle label (name + category + progress); refresh() skips unchanged text
+        self._label_shown = (record.name, record.category, int(record.progress * 100))
+        self._step_shown = int(record.increment * 100)
         text = self._label_text()
         self.label = ctk.CTkLabel(self, text=text, font=("Arial", 14), anchor="w", justify="left")
         self.label.pack(side="left", expand=True, fill="x", padx=6)
@@ -184,25 +592,54 @@ class HabitCard(ctk.CTkFrame):
         self.reset_btn = ctk.CTkButton(controls, text="Reset", width=64, height=30, command=self.reset_progress)
         self.reset_btn.grid(row=0, column=3, padx=(0, 0), pady=2)
 
+    @property
+    def habit_id(self):
+        return self.record.habit_id
+
+    @property
+    def habit_name(self):
+        return self.record.name
+
+    @property
+    def category(self):
+        return self.record.category
+
+    @property
+    def increment(self):
+        return self.record.increment
+
     def _label_text(self):
-        return f"{self.habit_name}\nCategory: {self.category}\nProgress: {int(self.progress_widget.progress * 100)}%"
+        return f"{self.habit_name}\nCategory: {self.category}\nProgress: {int(self.record.progress * 100)}%"
+
+    def bind_record(self, record):
+        self.record = record
+        self.refresh()
+
+    def refresh(self):
+        # Bring every widget in line with the bound record; text is only
+        # formatted and configured when what it shows changed
+        record = self.record
+        self.progress_widget.set_progress(record.progress)
+        shown = (record.name, record.category, int(record.progress * 100))
+        if shown != self._label_shown:
+            self._label_shown = shown
+            self.label.configure(text=self._label_text())
+        step = int(record.increment * 100)
+        if step != self._step_shown:
+            self._step_shown = step
+            self.inc_btn.configure(text=f"+{step}%")
 
     def increase_progress(self):
-        new_val = min(1.0, self.progress_widget.progress + self.increment)
-        self.progress_widget.set_progress(new_val)
-        self.label.configure(text=self._label_text())
-        self._trigger_save()
+        self.app.store.update(self.record, progress=min(1.0, self.record.progress + self.increment))
 
     def reset_progress(self):
-        self.progress_widget.set_progress(0.0)
-        self.label.configure(text=self._label_text())
-        self._trigger_save()
+        self.app.store.update(self.record, progress=0.0)
 
     def edit_name(self):
         # Build a simple dialog box that allows editing name and category
         dialog = ctk.CTkToplevel(self)
         dialog.title("Edit Habit")
-        dialog.geometry("350x160")
+        dialog.geometry("350x220")
 
         ctk.CTkLabel(dialog, text="Habit name:").pack(pady=(12, 2))
         name_var = ctk.StringVar(value=self.habit_name)
@@ -217,6 +654,15 @@ class HabitCard(ctk.CTkFrame):
         cat_dropdown = ctk.CTkOptionMenu(dialog, variable=category_var, values=dropdown_values)
         cat_dropdown.pack(padx=12, fill="x")
 
+        ctk.CTkLabel(dialog, text="Reminder (until 100%):").pack(pady=(8, 2))
+        reminder_var = ctk.StringVar(value=reminder_label(self.record.reminder))
+        reminder_values = list(REMINDER_CHOICES)
+        if reminder_var.get() not in reminder_values:
+            reminder_values.append(reminder_var.get())
+        ctk.CTkOptionMenu(dialog, variable=reminder_var, values=reminder_values).pack(padx=12, fill="x")
+
+        record = self.record
+
         def on_save():
             new_name = name_var.get().strip()
             new_cat = category_var.get()
@@ -224,13 +670,13 @@ class HabitCard(ctk.CTkFrame):
                 custom = simpledialog.askstring("Custom category", "Enter new category name:", parent=self)
                 if custom:
                     new_cat = custom.strip()
-                    if new_cat and new_cat not in self.app.categories:
-                        self.app.categories.append(new_cat)
+                    self.app.store.add_category(new_cat)
+            fields = {"category": new_cat}
             if new_name:
-                self.habit_name = new_name
-            self.category = new_cat
-            self.label.configure(text=self._label_text())
-            self._trigger_save()
+                fields["name"] = new_name
+            if reminder_var.get() in REMINDER_CHOICES:
+                fields["reminder"] = REMINDER_CHOICES[reminder_var.get()]
+            self.app.store.update(record, **fields)
             dialog.destroy()
 
         btn_frame = ctk.CTkFrame(dialog, fg_color="transparent")
@@ -241,56 +687,235 @@ class HabitCard(ctk.CTkFrame):
     def delete_self(self):
         confirm = messagebox.askyesno("Delete habit", f"Are you sure you want to delete '{self.habit_name}'?")
         if confirm:
-            try:
-                # remove from app list
-                if self in self.app.habit_cards:
-                    self.app.habit_cards.remove(self)
-            except Exception:
-                pass
-            self.destroy()
-            # trigger save from app
-            if callable(self.save_callback):
-                self.save_callback()
-
-    def set_increment(self, new_increment):
-        self.increment = new_increment
-        try:
-            self.inc_btn.configure(text=f"+{int(self.increment * 100)}%")
-        except Exception:
-            pass
+            # the app destroys or recycles this card when the store reports the removal
+            self.app.store.remove(self.record)
 
     def to_dict(self):
-        return {
-            "name": self.habit_name,
-            "progress": self.progress_widget.progress,
-            "increment": self.increment,
-            "category": self.category,
-        }
+        return self.record.to_dict()
+
+
+# ---------- Virtualized habit list ----------
+class VirtualHabitList(ctk.CTkFrame):
+    # Dashboard list for large habit sets. Rows (category headers and habits) are
+    # plain tuples with precomputed y offsets; only enough HabitCard/header
+    # widgets to fill the viewport are created, and they are re-bound to
+    # whichever rows are visible as the user scrolls.
+    # row heights match the natural size of a HabitCard / group header button
+    CARD_HEIGHT = 102
+    HEADER_HEIGHT = 28
+    ROW_GAP = 8
+
+    # lists not yet destroyed; one global mouse wheel binding (made by the first
+    # list) hands each event to them, so destroyed lists are not kept alive
+    _live = []
+    _wheel_bound = False
+
+    def __init__(self, master, app, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.app = app
+
+        self.rows = []      # ("header", category) or ("habit", record)
+        self.offsets = []   # top y of each row
+        self.total_height = 0
+        self.top = 0        # scroll position in pixels
+
+        self.card_pool = []
+        self.header_pool = []
+        self._render_pending = False
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.pack(side="left", expand=True, fill="both")
+        self.viewport.bind("<Configure>", lambda e: self.render())
+
+        VirtualHabitList._live.append(self)
+        if not VirtualHabitList._wheel_bound:
+            VirtualHabitList._wheel_bound = True
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.bind_all(sequence, VirtualHabitList._dispatch_mousewheel, add="+")
+
+    def destroy(self):
+        if self in VirtualHabitList._live:
+            VirtualHabitList._live.remove(self)
+        super().destroy()
+
+    # ----- rows -----
+    def rebuild(self):
+        # Categories in order of first use (like the classic view), via the store's
+        # index; with an active search only matching habits (and their headers) get rows
+        store = self.app.store
+        matches = self.app.matching_habits()
+        groups = None
+        if matches is not None:
+            groups = {}
+            for record in matches:
+                groups.setdefault(record.category, []).append(record)
+        self.rows = []
+        self.offsets = []
+        y = 0
+        for category in store.used_categories():
+            if groups is not None and category not in groups:
+                continue
+            self.rows.append(("header", category))
+            self.offsets.append(y)
+            y += self.HEADER_HEIGHT + self.ROW_GAP
+            if category in self.collapsed:
+                continue
+            for record in groups[category] if groups is not None else store.by_category(category):
+                self.rows.append(("habit", record))
+                self.offsets.append(y)
+                y += self.CARD_HEIGHT + self.ROW_GAP
+        self.total_height = y
+        self.render()
+
+    def schedule_rebuild(self):
+        # coalesce several adds/removes into one rebuild
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._run_rebuild)
+
+    def _run_rebuild(self):
+        self._render_pending = False
+        self.rebuild()
+
+    @property
+    def collapsed(self):
+        # shared with the classic view and saved in the data file's meta
+        return self.app.store.collapsed
+
+    def toggle(self, category):
+        self.app.store.set_collapsed(category, category not in self.collapsed)
+        self.rebuild()
+
+    # ----- rendering -----
+    def render(self):
+        height = max(1, self.viewport.winfo_height())
+        self.top = max(0, min(self.top, max(0, self.total_height - height)))
+
+        first = max(0, bisect.bisect_right(self.offsets, self.top) - 1)
+        used_cards = 0
+        used_headers = 0
+        i = first
+        while i < len(self.rows) and self.offsets[i] < self.top + height:
+            kind, payload = self.rows[i]
+            y = self.offsets[i] - self.top
+            if kind == "header":
+                btn = self._header(used_headers)
+                used_headers += 1
+                arrow = "▶" if payload in self.collapsed else "▼"
+                btn.category = payload
+                btn.configure(text=f"{arrow} {payload}")
+                btn.place(x=0, y=y, relwidth=1.0)
+            else:
+                card = self._card(used_cards)
+                used_cards += 1
+                # (a card that was hidden missed the refreshes of its record meanwhile)
+                if card.record is not payload:
+                    card.bind_record(payload)
+                else:
+                    card.refresh()
+                card.place(x=0, y=y, relwidth=1.0)
+            i += 1
+
+        for card in self.card_pool[used_cards:]:
+            card.place_forget()
+        for btn in self.header_pool[used_headers:]:
+            btn.place_forget()
+
+        if self.total_height > 0:
+            self.scrollbar.set(self.top / self.total_height, min(1.0, (self.top + height) / self.total_height))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # Both refresh every placed card, mapped or not (the dashboard may be behind
+    # another page); cards out of place are refreshed by render() when placed again
+    def refresh_visible(self):
+        for card in self.card_pool:
+            if card.winfo_manager():
+                card.refresh()
+
+    def refresh_records(self, records):
+        ids = {record.habit_id for record in records}
+        for card in self.card_pool:
+            if card.record.habit_id in ids and card.winfo_manager():
+                card.refresh()
+
+    def _card(self, index):
+        if index < len(self.card_pool):
+            return self.card_pool[index]
+        card = HabitCard(self.viewport, app=self.app, record=Habit(""))
+        self.card_pool.append(card)
+        return card
 
-    def _trigger_save(self):
-        if callable(self.save_callback):
-            try:
-                self.save_callback()
-            except Exception:
-                pass
+    def _header(self, index):
+        if index < len(self.header_pool):
+            return self.header_pool[index]
+        btn = ctk.CTkButton(self.viewport, text="", anchor="w", height=28, fg_color="#2a2a2a", corner_radius=6)
+        btn.category = None
+        btn.configure(command=lambda b=btn: self.toggle(b.category))
+        self.header_pool.append(btn)
+        return btn
+
+    # ----- scrolling -----
+    def scroll_to(self, top):
+        self.top = top
+        self.render()
+
+    def _on_scrollbar(self, *args):
+        height = max(1, self.viewport.winfo_height())
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.total_height)
+        elif args[0] == "scroll":
+            step = height if args[2] == "pages" else self.CARD_HEIGHT // 2
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    @staticmethod
+    def _dispatch_mousewheel(event):
+        for virtual_list in list(VirtualHabitList._live):
+            virtual_list._on_mousewheel(event)
+
+    def _on_mousewheel(self, event):
+        # only react when the pointer is over this list
+        if not str(event.widget).startswith(str(self.viewport)):
+            return
+        if getattr(event, "num", None) == 4:
+            delta = -1
+        elif getattr(event, "num", None) == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.scroll_to(self.top + delta * (self.CARD_HEIGHT // 2))
 
 
 # ---------- Main App ----------
 class HabitTrackerApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, instrumentation=None, startup_report=False):
+        ctk.set_appearance_mode(APPEARANCE_MODE)
+        ctk.set_default_color_theme(COLOR_THEME)
         super().__init__()
         self.title("Smart Habit Tracker")
         self.geometry("900x600")
         self.configure(fg_color="#1b1b1b")
 
-        # default increment (0.1 = 10%)
-        self.progress_increment = 0.1
+        # startup timing (ms since the app module started importing)
+        self.startup_report = startup_report
+        self.startup_times = {"imports_ms": round((STARTUP_IMPORTED - STARTUP_T0) * 1000, 1)}
+        self.bind("<Expose>", self._on_expose, add="+")
 
-        # in-memory habit card references
-        self.habit_cards = []
+        # optional timers/counters (see instrumentation.py and --instrument)
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            instrumentation.watch_event_loop(self)
 
-        # categories (persisted)
-        self.categories = list(DEFAULT_CATEGORIES)
+        # all habit state (records, settings, categories); widgets subscribe to it
+        self.store = HabitStore()
+
+        # in the classic dashboard: habit id -> HabitCard
+        self.habit_cards = {}
+
+        # virtualized dashboard list (None when cards are packed into cards_frame)
+        self.virtual_list = None
 
         # mapping category -> CollapsibleGroup
         self.category_groups = {}
@@ -298,15 +923,89 @@ class HabitTrackerApp(ctk.CTk):
         # pages container
         self.pages = {}
 
+        # streaming load state (see load_habits)
+        self._loading = None
+        self._pending_entries = None
+
+        # running ImportJob/ExportJob, and the storage hold (no background writes) of an import
+        self._transfer = None
+        self._import_hold = None
+        self._imported = 0
+
+        # named profiles; only the active one is loaded (storage and history
+        # below belong to it and are replaced by switch_profile)
+        self.profiles = ProfileManager(PROFILES_DIR)
+        self.profile = None
+        self._open_profile(self.profiles.last_used())
+        self.day_rollover = DayRolloverScheduler(self.after, self.after_cancel, self.roll_over_day)
+
+        # per-habit reminders: one heap, one pending after() for the earliest
+        self.reminders = HabitReminders(self.after, self.after_cancel, on_due=self.show_reminders)
+        self.reminders.attach(self.store)
+        self._reminder_window = None
+        self.external_changes = ExternalChangeWatcher(self)
+
+        # widget refreshes for changed habits, coalesced to one pass per frame
+        self.render = RenderScheduler(self, self.store)
+        self.render.add_renderer(self._render_habits)
+
+        # name/category/progress search over the store (subscribed before the
+        # dashboard so it is current when the view refreshes)
+        self.search_index = HabitIndex(self.store)
+        self.search_query = None  # (text, category, progress range) or None
+        self._search_pending = False
+
+        self.store.subscribe(self._on_store_event)
+        if instrumentation is not None:
+            self.store.subscribe(lambda event, habit, changes: instrumentation.count(f"store.{event}"))
+
         # create UI
         self.create_sidebar()
         self.create_pages()
 
-        # load persisted habits (if any)
+        # load persisted habits (if any), catching up on days the app was closed
         self.load_habits()
+        self.day_rollover.start()
+        self.external_changes.start()
 
         # show dashboard by default
         self.show_page("dashboard")
+        self._startup_mark("window_built_ms")
+        self.after_idle(self._startup_ready)
+
+    # ---------------- Startup timing ----------------
+    def _startup_mark(self, name):
+        self.startup_times.setdefault(name, round((time.perf_counter() - STARTUP_T0) * 1000, 1))
+
+    def _on_expose(self, event):
+        if event.widget is self and "first_paint_ms" not in self.startup_times:
+            self._startup_mark("first_paint_ms")
+
+    def _startup_ready(self):
+        # interactive = every habit loaded and the event loop idle again
+        if self._loading is not None or "interactive_ms" in self.startup_times:
+            return
+        self._startup_mark("interactive_ms")
+        if self.startup_report:
+            print("startup: " + ", ".join(f"{k} {v}" for k, v in self.startup_times.items())
+                  + f" ({len(self.store)} habits)", file=sys.stderr)
+
+    @property
+    def analytics(self):
+        if self._analytics is None:
+            from analytics import HabitAnalytics
+
+            self._analytics = HabitAnalytics(self.history)
+        return self._analytics
+
+    # default increment (0.1 = 10%) and categories live in the store
+    @property
+    def progress_increment(self):
+        return self.store.progress_increment
+
+    @property
+    def categories(self):
+        return self.store.categories
 
     # ---------------- Sidebar ----------------
     def create_sidebar(self):
@@ -325,6 +1024,8 @@ class HabitTrackerApp(ctk.CTk):
         # Sidebar buttons
         ctk.CTkButton(self.sidebar_inner, text="Dashboard", command=lambda: self.show_page("dashboard")).pack(pady=8, fill="x")
         ctk.CTkButton(self.sidebar_inner, text="Add Habit", command=self.add_habit_prompt).pack(pady=8, fill="x")
+        ctk.CTkButton(self.sidebar_inner, text="Overview", command=lambda: self.show_page("overview")).pack(pady=8, fill="x")
+        ctk.CTkButton(self.sidebar_inner, text="Statistics", command=lambda: self.show_page("statistics")).pack(pady=8, fill="x")
         ctk.CTkButton(self.sidebar_inner, text="Settings", command=lambda: self.show_page("settings")).pack(pady=8, fill="x")
 
         # Appearance mode
@@ -333,9 +1034,17 @@ class HabitTrackerApp(ctk.CTk):
         self.mode_switch.pack(pady=5)
         self.mode_switch.set(ctk.get_appearance_mode().capitalize())
 
-        # Quick "save now" and path label
-        ctk.CTkButton(self.sidebar_inner, text="Save now", command=self.save_habits).pack(pady=(20, 6), fill="x")
-        ctk.CTkLabel(self.sidebar_inner, text=f"Data file: {HABITS_FILE}", font=("Arial", 9)).pack(pady=(6, 12))
+        # Quick "save now", profile selector and path label
+        ctk.CTkButton(self.sidebar_inner, text="Save now", command=self.save_now).pack(pady=(20, 6), fill="x")
+        self.profile_menu = ctk.CTkOptionMenu(self.sidebar_inner, values=self.profiles.names() + [NEW_PROFILE],
+                                              command=self._on_profile_chosen)
+        self.profile_menu.set(self.profile)
+        self.profile_menu.pack(pady=(6, 0), fill="x")
+        self.data_file_label = ctk.CTkLabel(self.sidebar_inner, text=f"Data file: {self.storage.location}",
+                                            font=("Arial", 9))
+        self.data_file_label.pack(pady=(2, 0))
+        self.save_status = ctk.CTkLabel(self.sidebar_inner, text="", font=("Arial", 9))
+        self.save_status.pack(pady=(0, 12))
 
 
 
@@ -351,13 +1060,54 @@ class HabitTrackerApp(ctk.CTk):
         header = ctk.CTkLabel(dashboard, text="Daily Dashboard", font=("Arial", 28, "bold"))
         header.pack(pady=(6, 12))
 
-        # Scrollable frame for habit groups
-        self.cards_frame = ctk.CTkScrollableFrame(dashboard, fg_color="transparent")
-        self.cards_frame.pack(padx=20, pady=10, expand=True, fill="both")
+        # Search bar: name text plus category and progress facets
+        search_bar = ctk.CTkFrame(dashboard, fg_color="transparent")
+        search_bar.pack(padx=20, fill="x")
+        self.search_var = ctk.StringVar(value="")
+        self.search_var.trace_add("write", self._on_search_changed)
+        ctk.CTkEntry(search_bar, textvariable=self.search_var, placeholder_text="Search habits").pack(
+            side="left", expand=True, fill="x")
+        self.search_category = ctk.CTkOptionMenu(search_bar, values=["All categories"] + list(self.categories),
+                                                 command=self._on_search_changed, width=140)
+        self.search_category.pack(side="left", padx=(8, 0))
+        self.search_progress = ctk.CTkOptionMenu(search_bar, values=list(PROGRESS_FACETS),
+                                                 command=self._on_search_changed, width=130)
+        self.search_progress.pack(side="left", padx=(8, 0))
+        self.search_status = ctk.CTkLabel(search_bar, text="", width=90)
+        self.search_status.pack(side="left", padx=(8, 0))
+
+        # Holder for either the scrollable frame of habit groups or the virtual list
+        self.cards_host = ctk.CTkFrame(dashboard, fg_color="transparent")
+        self.cards_host.pack(padx=20, pady=10, expand=True, fill="both")
+        self.cards_frame = None
+        self._build_habit_view(virtual=DASHBOARD_MODE == "virtual")
+
+        # The other pages are built the first time they are shown (or right away
+        # without LAZY_PAGES)
+        self.page_builders = {
+            "settings": self._build_settings_page,
+            "overview": self._build_overview_page,
+            "statistics": self._build_statistics_page,
+            "diagnostics": self._build_diagnostics_page,
+        }
+        self.bind_all("<Control-Shift-D>", lambda e: self.show_page("diagnostics"))
+        self._diag_timer = None
+        if not LAZY_PAGES:
+            for name in self.page_builders:
+                self._page(name)
 
-        # Settings page
+        # Add pages to UI (but don't pack them here; show_page handles packing)
+        for p in self.pages.values():
+            p.pack_forget()
+
+    def _page(self, name):
+        page = self.pages.get(name)
+        if page is None and name in self.page_builders:
+            page = self.pages[name] = self.page_builders[name]()
+        return page
+
+    def _build_settings_page(self):
         settings = ctk.CTkFrame(self, corner_radius=0)
-        self.pages["settings"] = settings
 
         header = ctk.CTkLabel(settings, text="Settings", font=("Arial", 28, "bold"))
         header.pack(pady=20)
@@ -371,53 +1121,397 @@ class HabitTrackerApp(ctk.CTk):
 
         ctk.CTkButton(settings, text="Reset All Habits", command=self.reset_all_habits).pack(pady=20)
 
-        # Add pages to UI (but don't pack them here; show_page handles packing)
-        for p in self.pages.values():
-            p.pack_forget()
+        # Bulk import / export (CSV or NDJSON, see transfer.py)
+        ctk.CTkLabel(settings, text="Import / Export", font=("Arial", 16)).pack(pady=(10, 6))
+        transfer_buttons = ctk.CTkFrame(settings, fg_color="transparent")
+        transfer_buttons.pack()
+        ctk.CTkButton(transfer_buttons, text="Import habits...", command=self.import_habits_prompt).pack(
+            side="left", padx=6)
+        ctk.CTkButton(transfer_buttons, text="Export habits...", command=self.export_habits_prompt).pack(
+            side="left", padx=6)
+        self.transfer_progress = ctk.CTkProgressBar(settings)
+        self.transfer_progress.set(0)
+        self.transfer_progress.pack(pady=(10, 4), padx=20, fill="x")
+        self.transfer_status = ctk.CTkLabel(settings, text="")
+        self.transfer_status.pack()
+        return settings
+
+    def _build_overview_page(self):
+        # every habit's ring on a single canvas
+        overview = ctk.CTkFrame(self, corner_radius=0)
+        ctk.CTkLabel(overview, text="Overview", font=("Arial", 28, "bold")).pack(pady=20)
+        self.progress_grid = ProgressRingGrid(overview, app=self)
+        self.progress_grid.pack(padx=20, pady=10, expand=True, fill="both")
+        self.progress_grid.attach(self.store)
+        return overview
+
+    def _build_statistics_page(self):
+        statistics = ctk.CTkFrame(self, corner_radius=0)
+
+        header = ctk.CTkLabel(statistics, text="Statistics", font=("Arial", 28, "bold"))
+        header.pack(pady=20)
+        ctk.CTkButton(statistics, text="Refresh", command=self.refresh_statistics).pack(pady=(0, 10))
+        self.stats_text = ctk.CTkTextbox(statistics, font=("Courier", 13), wrap="none")
+        self.stats_text.pack(padx=20, pady=10, expand=True, fill="both")
+        return statistics
+
+    def _build_diagnostics_page(self):
+        # hidden: Ctrl+Shift+D
+        diagnostics = ctk.CTkFrame(self, corner_radius=0)
+        ctk.CTkLabel(diagnostics, text="Diagnostics", font=("Arial", 28, "bold")).pack(pady=20)
+        diag_buttons = ctk.CTkFrame(diagnostics, fg_color="transparent")
+        diag_buttons.pack(pady=(0, 10))
+        ctk.CTkButton(diag_buttons, text="Refresh", command=self.refresh_diagnostics).pack(side="left", padx=6)
+        ctk.CTkButton(diag_buttons, text="Dump to file", command=self.dump_diagnostics).pack(side="left", padx=6)
+        self.diag_text = ctk.CTkTextbox(diagnostics, font=("Courier", 12), wrap="none")
+        self.diag_text.pack(padx=20, pady=10, expand=True, fill="both")
+        return diagnostics
 
     def show_page(self, name):
         # Hide all pages
         for page in self.pages.values():
             page.pack_forget()
         # Show requested page
-        page = self.pages.get(name)
+        page = self._page(name)
         if page:
             page.pack(side="left", expand=True, fill="both")
+        if name == "statistics":
+            self.refresh_statistics()
+        elif name == "diagnostics":
+            self.refresh_diagnostics()
+        elif name == "overview":
+            self.progress_grid.show()
+
+    def refresh_statistics(self, top=50):
+        # Only habits whose history changed since the last refresh are recomputed
+        habits = list(self.store)
+        per_habit = self.analytics.habit_stats(habits)
+        per_category = self.analytics.category_stats(habits, per_habit)
+
+        lines = [f"{'Category':<18}{'Habits':>7}{'Progress':>10}{'7 days':>9}{'30 days':>9}{'Best':>6}"]
+        for category, st in sorted(per_category.items()):
+            lines.append(f"{category[:17]:<18}{st['habits']:>7}{st['avg_progress']:>10.0%}"
+                         f"{st['rate_7']:>9.0%}{st['rate_30']:>9.0%}{st['best_streak']:>6}")
+
+        ranked = sorted(habits, key=lambda h: (per_habit[h.habit_id]["current_streak"],
+                                               per_habit[h.habit_id]["rate_30"]), reverse=True)[:top]
+        lines += ["", f"{'Habit':<26}{'Streak':>7}{'Longest':>8}{'7 days':>9}{'30 days':>9}"]
+        for habit in ranked:
+            st = per_habit[habit.habit_id]
+            lines.append(f"{habit.name[:25]:<26}{st['current_streak']:>7}{st['longest_streak']:>8}"
+                         f"{st['rate_7']:>9.0%}{st['rate_30']:>9.0%}")
+
+        self.stats_text.configure(state="normal")
+        self.stats_text.delete("1.0", "end")
+        self.stats_text.insert("1.0", "\n".join(lines))
+        self.stats_text.configure(state="disabled")
+
+    def _build_habit_view(self, virtual):
+        # (Re)create the dashboard list in classic or virtualized mode
+        if self.cards_frame is not None:
+            self.cards_frame.destroy()
+        self.category_groups.clear()
+        self.habit_cards.clear()
+        if virtual:
+            self.virtual_list = VirtualHabitList(self.cards_host, app=self)
+            self.cards_frame = self.virtual_list
+        else:
+            self.virtual_list = None
+            self.cards_frame = ctk.CTkScrollableFrame(self.cards_host, fg_color="transparent")
+        self.cards_frame.pack(expand=True, fill="both")
+
+    # ---------------- Search ----------------
+    def _on_search_changed(self, *_):
+        text = self.search_var.get().strip()
+        category = self.search_category.get()
+        category = None if category == "All categories" else category
+        progress = PROGRESS_FACETS.get(self.search_progress.get())
+        self.search_query = (text, category, progress) if text or category or progress else None
+        self._apply_search(new_query=True)
+
+    def matching_habits(self):
+        # Habits passing the dashboard search, in store order (None without a search)
+        if self.search_query is None:
+            return None
+        text, category, progress = self.search_query
+        return self.search_index.search(text, category=category, progress=progress)
+
+    def _refresh_search_categories(self):
+        values = ["All categories"] + list(self.categories)
+        if self.search_category.cget("values") != values:
+            self.search_category.configure(values=values)
+
+    def _search_affected(self, event, changes):
+        # Whether a store event can change which habits match the active search
+        if event in ("batch", "merge"):
+            return any(self._search_affected(e, c) for e, _, c in changes)
+        if event in ("add", "remove", "reload", "load"):
+            return True
+        if event == "update":
+            return "name" in changes or "category" in changes or (
+                "progress" in changes and self.search_query[2] is not None)
+        if event == "all":
+            return "progress" in changes and self.search_query[2] is not None
+        return False
+
+    def _schedule_search(self):
+        # re-run the search once after a burst of store changes
+        if not self._search_pending:
+            self._search_pending = True
+            self.after_idle(self._run_scheduled_search)
+
+    def _run_scheduled_search(self):
+        self._search_pending = False
+        self._apply_search()
+
+    def _apply_search(self, new_query=False):
+        # Only a changed query scrolls back to the top; re-running it after a
+        # store change keeps the position (render() clamps it to the new length)
+        matches = self.matching_habits()
+        if self.virtual_list is not None:
+            if new_query:
+                self.virtual_list.top = 0
+            self.virtual_list.rebuild()
+        else:
+            self._filter_cards(matches)
+        if matches is None:
+            self.search_status.configure(text="")
+        else:
+            self.search_status.configure(text=f"{len(matches)} of {len(self.store)}")
+
+    def _filter_cards(self, matches):
+        # Classic dashboard: pack only matching cards, and only groups that have any
+        visible = None if matches is None else {h.habit_id for h in matches}
+        for grp in self.category_groups.values():
+            grp.pack_forget()
+        for category in self.store.used_categories():
+            grp = self.category_groups.get(category)
+            if grp is None:
+                continue
+            if visible is None:
+                grp.set_shown(None)
+            else:
+                records = [h for h in self.store.by_category(category) if h.habit_id in visible]
+                if not records:
+                    continue
+                if grp.built:
+                    grp.set_shown([self.habit_cards[h.habit_id] for h in records if h.habit_id in self.habit_cards])
+            grp.pack(fill="x", pady=4, padx=4)
+
+    def refresh_diagnostics(self):
+        # Redraws itself every second while the page is shown
+        if self._diag_timer is not None:
+            self.after_cancel(self._diag_timer)
+            self._diag_timer = None
+        page = self.pages.get("diagnostics")
+        if page is None or not page.winfo_manager():
+            return
+        if self.instrumentation is None:
+            text = "Instrumentation is off. Start the app with --instrument to collect timings."
+        else:
+            text = self.instrumentation.report()
+        text += "\n\nStartup (ms): " + ", ".join(f"{k[:-3]} {v}" for k, v in self.startup_times.items())
+        stats = self.storage.stats()
+        if stats:
+            text += "\n\nStorage: " + ", ".join(f"{k} {v}" for k, v in stats.items())
+        text += "\nRendering: " + ", ".join(f"{k} {v}" for k, v in self.render.stats().items())
+        self.diag_text.configure(state="normal")
+        self.diag_text.delete("1.0", "end")
+        self.diag_text.insert("1.0", text)
+        self.diag_text.configure(state="disabled")
+        self._diag_timer = self.after(1000, self.refresh_diagnostics)
+
+    def dump_diagnostics(self):
+        if self.instrumentation is None:
+            messagebox.showinfo("Diagnostics", "Instrumentation is off (start with --instrument).")
+            return
+        path = f"diagnostics-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+        self.instrumentation.dump(path)
+        messagebox.showinfo("Diagnostics", f"Wrote {path}")
 
     # ---------------- Habit management ----------------
     def _ensure_category_group(self, category):
         # create a group frame for a category if missing
-        if category in self.category_groups:
-            return self.category_groups[category]
-        grp = CollapsibleGroup(self.cards_frame, title=category)
+        grp = self.category_groups.get(category)
+        if grp is not None:
+            if grp.parked:
+                # kept from before a reload (see _park_habit_view)
+                grp.reset(collapsed=category in self.store.collapsed)
+                grp.pack(fill="x", pady=4, padx=4)
+            return grp
+        grp = CollapsibleGroup(self.cards_frame, title=category, collapsed=category in self.store.collapsed,
+                               on_build=self._build_group_cards, on_release=self._release_group_cards,
+                               on_toggle=self._on_group_toggled, release_ms=COLLAPSED_RELEASE_MS)
         grp.pack(fill="x", pady=4, padx=4)
         self.category_groups[category] = grp
         return grp
 
-    def add_habit_card(self, name, category="Other", progress=0.0, increment=None, save=True):
-        if increment is None:
-            increment = self.progress_increment
-        # Ensure the category exists in the app categories list
-        if category not in self.categories:
-            self.categories.append(category)
-
-        # Create card - save_callback ensures the app persists when card state changes (like delete)
-        grp = self._ensure_category_group(category)
-        card = HabitCard(grp.content, app=self, name=name, category=category, progress=progress, increment=increment,
-                         save_callback=self.save_habits)
+    def _build_group_cards(self, grp):
+        for record in self.store.by_category(grp.title):
+            if record.habit_id not in self.habit_cards:
+                self._create_card(record)
+
+    def _release_group_cards(self, grp):
+        for record in self.store.by_category(grp.title):
+            self._destroy_card(record)
+        for card in grp.spare:
+            card.destroy()
+        grp.spare.clear()
+
+    def _on_group_toggled(self, grp):
+        self.store.set_collapsed(grp.title, not grp.visible)
+        if self.search_query is not None:
+            self._schedule_search()
+
+    def add_habit_card(self, name, category="Other", progress=0.0, increment=None, reminder=None):
+        # The card itself is created (and the habit persisted) from the store's "add" event
+        return self.store.add(name, category=category, progress=progress, increment=increment, reminder=reminder)
+
+    def _create_card(self, record):
+        grp = self._ensure_category_group(record.category)
+        if not grp.built:
+            # collapsed group: the card is created when the group is expanded
+            return None
+        card = grp.take_spare()
+        if card is None:
+            card = HabitCard(grp.content, app=self, record=record)
+        else:
+            card.bind_record(record)
         grp.add_widget(card)
-        self.habit_cards.append(card)
-        # Ensure increment button text matches current increment
-        card.set_increment(increment)
-        if save:
-            self.save_habits()
+        self.habit_cards[record.habit_id] = card
         return card
 
+    def _destroy_card(self, record):
+        card = self.habit_cards.pop(record.habit_id, None)
+        if card is not None:
+            card.destroy()
+
+    def _on_store_event(self, event, habit, changes):
+        # Keep the dashboard widgets in line with the store
+        if self.search_query is not None and self._search_affected(event, changes):
+            self._schedule_search()
+        if event in ("settings", "reload", "batch", "merge"):
+            self._refresh_search_categories()
+        if event in ("batch", "merge"):
+            self._apply_batch_to_view(changes)
+        elif event == "reload":
+            self._rebuild_habit_view()
+        elif event == "load":
+            self._show_loaded_habits(changes)
+        elif self.virtual_list is not None:
+            if event in ("add", "remove") or (event == "update" and "category" in changes):
+                self.virtual_list.schedule_rebuild()
+            elif event == "update":
+                self.render.mark(habit.habit_id)
+            elif event == "all":
+                self.render.mark_all()
+        elif event == "add":
+            self._create_card(habit)
+        elif event == "remove":
+            self._destroy_card(habit)
+        elif event == "update":
+            if "category" in changes:
+                # move the card to its new group
+                self._destroy_card(habit)
+                self._create_card(habit)
+            else:
+                self.render.mark(habit.habit_id)
+        elif event == "all":
+            self.render.mark_all()
+
+    def _apply_batch_to_view(self, events):
+        # One coalesced refresh for a whole batch: rebuild the view if its shape
+        # changed, otherwise refresh each affected card once
+        kinds = {event for event, _, _ in events}
+        if "reload" in kinds or "load" in kinds:
+            self._rebuild_habit_view()
+            return
+        structural = [(e, h, c) for e, h, c in events
+                      if e in ("add", "remove") or (e == "update" and "category" in c)]
+        if structural:
+            if self.virtual_list is not None:
+                self.virtual_list.schedule_rebuild()
+            else:
+                for event, habit, changes in structural:
+                    self._on_store_event(event, habit, changes)
+        if "all" in kinds:
+            self.render.mark_all()
+            return
+        for event, habit, changes in events:
+            if event == "update" and "category" not in changes:
+                self.render.mark(habit.habit_id)
+
+    def _render_habits(self, records):
+        # RenderScheduler renderer for the dashboard cards
+        if records is None:
+            self._refresh_cards()
+        elif self.virtual_list is not None:
+            self.virtual_list.refresh_records(records)
+        else:
+            for record in records:
+                card = self.habit_cards.get(record.habit_id)
+                if card is not None:
+                    card.refresh()
+
+    def _show_loaded_habits(self, habits):
+        # A loaded chunk: switch to the virtual list once the store outgrows the
+        # classic view, else add the chunk's cards
+        if (self.virtual_list is None and DASHBOARD_MODE == "auto"
+                and len(self.store) >= VIRTUAL_LIST_THRESHOLD):
+            self._rebuild_habit_view()
+        elif self.virtual_list is not None:
+            self.virtual_list.schedule_rebuild()
+        else:
+            for habit in habits:
+                self._create_card(habit)
+
+    def _rebuild_habit_view(self):
+        virtual = DASHBOARD_MODE == "virtual" or (DASHBOARD_MODE == "auto" and len(self.store) >= VIRTUAL_LIST_THRESHOLD)
+        if self._loading is not None and self.virtual_list is not None:
+            # the (empty) reload that starts a streamed load: keep the virtual list
+            # for the chunks, _finish_loading picks the mode for the final count
+            virtual = True
+        if virtual and self.virtual_list is not None:
+            self.virtual_list.rebuild()
+            return
+        if not virtual and self.virtual_list is None:
+            self._park_habit_view()
+        else:
+            self._build_habit_view(virtual)
+        if virtual:
+            self.virtual_list.rebuild()
+        else:
+            for habit in self.store:
+                self._create_card(habit)
+
+    def _park_habit_view(self):
+        # Classic dashboard after a reload (e.g. another profile): rather than
+        # destroying every group and card, hide them; _ensure_category_group
+        # re-packs a group and _create_card re-binds its parked cards as the
+        # new habits arrive
+        self.habit_cards.clear()
+        for grp in self.category_groups.values():
+            grp.park()
+            grp.pack_forget()
+
+    def _free_parked_cards(self):
+        # Once the reloaded habits are all in: groups the new data has no habits
+        # for and cards no habit re-bound are destroyed, so memory follows the
+        # profile in use rather than the largest one opened
+        for category, grp in list(self.category_groups.items()):
+            if grp.parked:
+                grp.destroy()
+                del self.category_groups[category]
+            else:
+                for card in grp.spare:
+                    card.destroy()
+                grp.spare.clear()
+
     def add_habit_prompt(self):
         # Create a small dialog to get name and category
         dialog = ctk.CTkToplevel(self)
         dialog.title("New Habit")
-        dialog.geometry("360x200")
+        dialog.geometry("360x260")
 
         ctk.CTkLabel(dialog, text="Habit name:").pack(pady=(12, 2))
         name_var = ctk.StringVar(value="")
@@ -432,6 +1526,10 @@ class HabitTrackerApp(ctk.CTk):
         cat_dropdown = ctk.CTkOptionMenu(dialog, variable=category_var, values=dropdown_values)
         cat_dropdown.pack(padx=12, fill="x")
 
+        ctk.CTkLabel(dialog, text="Reminder (until 100%):").pack(pady=(12, 2))
+        reminder_var = ctk.StringVar(value="No reminder")
+        ctk.CTkOptionMenu(dialog, variable=reminder_var, values=list(REMINDER_CHOICES)).pack(padx=12, fill="x")
+
         def on_create():
             name = name_var.get().strip()
             if not name:
@@ -442,9 +1540,9 @@ class HabitTrackerApp(ctk.CTk):
                 custom = simpledialog.askstring("Custom category", "Enter new category name:", parent=self)
                 if custom:
                     category = custom.strip()
-                    if category and category not in self.categories:
-                        self.categories.append(category)
-            self.add_habit_card(name=name, category=category, progress=0.0, increment=self.progress_increment, save=True)
+                    self.store.add_category(category)
+            self.add_habit_card(name=name, category=category, progress=0.0, increment=self.progress_increment,
+                                reminder=REMINDER_CHOICES.get(reminder_var.get()))
             dialog.destroy()
             self.show_page("dashboard")
 
@@ -453,128 +1551,356 @@ class HabitTrackerApp(ctk.CTk):
         ctk.CTkButton(btn_frame, text="Create", command=on_create).pack(side="left", padx=8)
         ctk.CTkButton(btn_frame, text="Cancel", command=dialog.destroy).pack(side="left", padx=8)
 
+    @contextmanager
+    def batch(self):
+        # Group many store changes: saves and widget refreshes are suspended and
+        # happen once (one coalesced UI refresh, one journal append / write) at the end
+        with self.storage.hold(), self.store.batch():
+            yield self.store
+
     def update_increment(self, value):
         # Slider returns float-like; convert to fraction
         try:
-            self.progress_increment = float(value) / 100.0
+            increment = float(value) / 100.0
         except Exception:
-            self.progress_increment = 0.1
-        # Update all existing cards' increments and button text
-        for card in list(self.habit_cards):
-            try:
-                card.set_increment(self.progress_increment)
-            except Exception:
-                pass
-        # Save setting to disk as part of habits file
-        self.save_habits()
+            increment = 0.1
+        # Updates every habit's increment; cards and the data file follow via store events
+        with self.batch():
+            self.store.set_progress_increment(increment)
 
     def reset_all_habits(self):
-        for card in list(self.habit_cards):
+        with self.batch():
+            self.store.reset_all()
+        messagebox.showinfo("Reset", "All habits have been reset to 0%.")
+
+    def _refresh_cards(self):
+        if self.virtual_list is not None:
+            self.virtual_list.refresh_visible()
+            return
+        for card in self.habit_cards.values():
             try:
-                card.reset_progress()
+                card.refresh()
             except Exception:
                 pass
-        self.save_habits()
-        messagebox.showinfo("Reset", "All habits have been reset to 0%.")
 
-    # ---------------- Persistence (JSON) ----------------
-    def save_habits(self):
-        # Build list of habit dicts
-        data = {
-            "meta": {
-                "saved_at": datetime.datetime.utcnow().isoformat(),
-                "progress_increment": self.progress_increment,
-                "categories": self.categories,
-            },
-            "habits": []
-        }
+    # ---------------- Profiles ----------------
+    def _open_profile(self, name):
+        path = functools.partial(self.profiles.path, name)
+        # persistence backend (ignores the store's "reload"/"load"/"merge" events, persists everything else)
+        self.storage = open_storage(STORAGE_BACKEND, path(HABITS_FILE),
+                                    journal_path=path(JOURNAL_FILE) if USE_JOURNAL else None,
+                                    sqlite_path=path(SQLITE_FILE), compact_bytes=JOURNAL_COMPACT_BYTES,
+                                    quiet_ms=SAVE_QUIET_MS, after=self.after, after_cancel=self.after_cancel,
+                                    on_error=self._on_save_error, snapshots=SNAPSHOT_KEEP, durability=DURABILITY)
+        self.storage.attach(self.store)
+
+        # timestamped increments/resets per habit; only read when queried
+        self.history = HabitHistory(path(HISTORY_DIR), after=self.after)
+        self.history.attach(self.store)
+        self._analytics = None  # created with the statistics page (imports NumPy when available)
+        self.profile = name
+
+    def _close_profile(self):
+        self.history.close()
+        self.history.detach()
+        self.storage.close()
+        self.storage.detach()
+
+    def _on_profile_chosen(self, choice):
+        if choice == NEW_PROFILE:
+            self.profile_menu.set(self.profile)
+            self.new_profile_prompt()
+        else:
+            self.switch_profile(choice)
 
-        # Collect from current widget children in the cards_frame
-        new_cards = []
-        for card in self.habit_cards:
-            if getattr(card, "winfo_exists", None) and card.winfo_exists():
-                try:
-                    data["habits"].append(card.to_dict())
-                    new_cards.append(card)
-                except Exception:
-                    pass
-        self.habit_cards = new_cards
+    def new_profile_prompt(self):
+        name = ctk.CTkInputDialog(title="New Profile", text="Profile name:").get_input()
+        if not name:
+            return
+        try:
+            name = self.profiles.create(name)
+        except (ProfileError, OSError) as e:
+            messagebox.showerror("New profile", str(e))
+            return
+        self.switch_profile(name)
+
+    def switch_profile(self, name):
+        # The current profile is flushed and closed and the store reloaded from
+        # the other profile's files, so only one profile is ever in memory.
+        # Everything subscribed to the store follows the "reload"; the classic
+        # dashboard re-binds its existing cards (see _park_habit_view).
+        if name == self.profile:
+            return
+        if self._loading is not None or self._transfer is not None:
+            messagebox.showinfo("Profiles", "Wait until the habits have loaded and no import or export is running.")
+            self.profile_menu.set(self.profile)
+            return
+        if not self.profiles.exists(name):
+            messagebox.showerror("Profiles", f"The profile {name!r} no longer exists.")
+            self.profile_menu.configure(values=self.profiles.names() + [NEW_PROFILE])
+            self.profile_menu.set(self.profile)
+            return
+        previous = self.profile
+        self._close_profile()
+        self._open_profile(name)
+        self.show_page("dashboard")
+        if not self.load_habits():
+            # unreadable and not started over: go back to the profile that was open
+            self._close_profile()
+            self._open_profile(previous)
+            self.profile_menu.set(previous)
+            self.load_habits()
+            return
+        try:
+            self.profiles.set_last_used(name)
+        except OSError:
+            pass
+        self.profile_menu.configure(values=self.profiles.names() + [NEW_PROFILE])
+        self.profile_menu.set(name)
+        self.data_file_label.configure(text=f"Data file: {self.storage.location}")
+
+    # ---------------- Persistence ----------------
+    def save_now(self):
+        self.storage.save()
+        self.storage.flush()
+        self._update_save_status()
+
+    def _update_save_status(self):
+        stats = self.storage.stats()
+        if "writes" in stats:
+            text = f"Writes: {stats['writes']} (coalesced {stats['coalesced']})"
+        else:
+            text = f"Row updates: {stats.get('statements', 0)}"
+        try:
+            self.save_status.configure(text=text)
+        except Exception:
+            pass
 
+    def merge_external_changes(self):
+        if self._loading is not None or self._import_hold is not None:
+            # not while a streamed load or an import is still filling the store
+            return
         try:
-            with open(HABITS_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            changes = self.storage.sync()
         except Exception as e:
-            messagebox.showerror("Save error", f"Failed to save habits to {HABITS_FILE}:\n{e}")
-
-    def load_habits(self):
-        if not os.path.exists(HABITS_FILE):
-            sample = [
-                {"name": "Drink Water", "progress": 0.0, "increment": self.progress_increment, "category": "Health"},
-                {"name": "Exercise", "progress": 0.0, "increment": self.progress_increment, "category": "Fitness"},
-                {"name": "Read", "progress": 0.0, "increment": self.progress_increment, "category": "Learning"},
-            ]
-            for s in sample:
-                self.add_habit_card(s["name"], category=s.get("category", "Other"), progress=s["progress"],
-                                   increment=s["increment"], save=False)
-            self.save_habits()
+            self.save_status.configure(text=f"Could not read changes from another process: {e}")
+            return
+        if not changes:
             return
+        if "settings" in self.pages and any(event == "settings" for event, _, _ in changes):
+            self.increment_slider.set(int(self.progress_increment * 100))
+        habits = sum(1 for event, _, _ in changes if event in ("add", "update", "remove"))
+        self.save_status.configure(text=f"Merged {habits} change(s) made elsewhere")
+
+    def _on_save_error(self, e):
+        messagebox.showerror("Save error", f"Failed to save habits to {self.storage.location}:\n{e}")
 
+    def load_habits(self):
+        # False if the files could not be read and the user did not start over:
+        # the store is then empty and nothing is saved (see switch_profile)
         try:
-            with open(HABITS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = self.storage.load()
         except Exception:
-            choice = messagebox.askyesno("Load Error", f"Could not read {HABITS_FILE}. Reset to empty?")
+            choice = messagebox.askyesno("Load Error", f"Could not read {self.storage.location} or any of its "
+                                                       f"snapshots. Start empty? (the files are kept as *.corrupt)")
             if choice:
-                try:
-                    os.remove(HABITS_FILE)
-                except Exception:
-                    pass
+                self.storage.reset()
                 # restart loading (will create sample)
                 return self.load_habits()
+            # nothing in memory (e.g. another profile's habits) may be saved over them
+            self.storage.detach()
+            self.store.load({"habits": [], "meta": {}})
+            if "settings" in self.pages:
+                self.increment_slider.set(int(self.progress_increment * 100))
+            self._free_parked_cards()
+            self.save_status.configure(text=f"Not saving: {self.storage.location} could not be read")
+            return False
+
+        if data is None:
+            # (no increment: they get the default the store falls back to, not the previous profile's)
+            sample = [
+                {"name": "Drink Water", "progress": 0.0, "category": "Health"},
+                {"name": "Exercise", "progress": 0.0, "category": "Fitness"},
+                {"name": "Read", "progress": 0.0, "category": "Learning"},
+            ]
+            self.store.load({"habits": sample, "meta": {"current_day": datetime.date.today().isoformat()}})
+            if "settings" in self.pages:
+                self.increment_slider.set(int(self.progress_increment * 100))
+            self.storage.write_all()
+            self._free_parked_cards()
+            return True
+
+        if self.storage.recovered_from:
+            messagebox.showwarning("Recovered", f"{self.storage.location} could not be read; loaded the snapshot "
+                                                f"{self.storage.recovered_from} instead.")
+
+        # Settings first (empty dashboard via the "reload" event), then the habit
+        # entries in LOAD_CHUNK pieces from the event loop so the window is up and
+        # responsive while a large file streams in. Each entry is validated and
+        # clamped by the store; unusable ones go to the storage's quarantine file.
+        # No snapshot may be written while only part of the file is in the store.
+        self._loading = self.storage.hold()
+        self._loading.__enter__()
+        self.store.load({"meta": data.get("meta", {}), "habits": []})
+        if "settings" in self.pages:
+            # (a settings page built later reads the loaded value itself)
+            self.increment_slider.set(int(self.progress_increment * 100))
+
+        self._pending_entries = iter(data.get("habits", []))
+        self.after_idle(self._load_next_chunk)
+        return True
+
+    def _load_next_chunk(self):
+        try:
+            chunk = list(itertools.islice(self._pending_entries, LOAD_CHUNK))
+        except Exception as e:
+            chunk = []
+            messagebox.showerror("Load Error", f"Stopped reading {self.storage.location}:\n{e}")
+        if chunk:
+            self.store.extend(chunk, on_invalid=self.storage.quarantine)
+        if len(chunk) == LOAD_CHUNK:
+            self.save_status.configure(text=f"Loading... {len(self.store)} habits")
+            self.after(1, self._load_next_chunk)
+            return
+        self._finish_loading()
+
+    def _finish_loading(self):
+        self._pending_entries = None
+        self._loading.__exit__(None, None, None)
+        self._loading = None
+        self.save_status.configure(text="")
+        self._free_parked_cards()
+        if (DASHBOARD_MODE == "auto" and self.virtual_list is not None
+                and len(self.store) < VIRTUAL_LIST_THRESHOLD):
+            # the virtual list kept across the reload: this profile is small
+            self._rebuild_habit_view()
+
+        if self.storage.needs_rewrite:
+            self.storage.flush()
+
+        self.roll_over_day()
+        self.after_idle(self._startup_ready)
+
+        if self.storage.quarantined:
+            messagebox.showwarning(
+                "Load warning",
+                f"{self.storage.quarantined} unreadable habit record(s) were skipped and kept in "
+                f"{self.storage.quarantine_path}.")
+
+    def roll_over_day(self):
+        if self._loading is not None:
+            # _finish_loading rolls over once every habit is in the store
             return
+        with self.batch():
+            roll_over(self.store, self.history)
+
+    # ---------------- Reminders ----------------
+    def show_reminders(self, habits):
+        # One small window lists every habit that is due; it is reused (and
+        # its list replaced) while it stays open
+        lines = [f"{h.name}  ({int(h.progress * 100)}%)" for h in habits[:10]]
+        if len(habits) > 10:
+            lines.append(f"... and {len(habits) - 10} more")
+        window = self._reminder_window
+        if window is None or not window.winfo_exists():
+            window = self._reminder_window = ctk.CTkToplevel(self)
+            window.title("Reminder")
+            window.attributes("-topmost", True)
+            ctk.CTkLabel(window, text="Time for:", font=("Arial", 16, "bold")).pack(padx=16, pady=(12, 4))
+            self._reminder_text = ctk.CTkLabel(window, text="", justify="left")
+            self._reminder_text.pack(padx=16)
+            ctk.CTkButton(window, text="OK", command=window.destroy).pack(pady=12)
+        self._reminder_text.configure(text="\n".join(lines))
+        self.bell()
+
+    # ---------------- Import / export ----------------
+    def import_habits_prompt(self):
+        if self._transfer is not None:
+            messagebox.showinfo("Import", "An import or export is already running.")
+            return
+        path = filedialog.askopenfilename(title="Import habits", filetypes=[
+            ("CSV or NDJSON", "*.csv *.ndjson *.jsonl"), ("All files", "*.*")])
+        if path:
+            self.import_habits(path)
+
+    def import_habits(self, path):
+        # The file is parsed and de-duplicated on a worker thread; the rows are
+        # added here, in chunks from the event loop, each poll's chunks in one
+        # short store batch (one refresh, one journal append). Background writes
+        # are held for the whole import, so there is one save when it completes;
+        # the store stays live in between, so clicks still redraw and persist.
+        try:
+            job = ImportJob(path, {habit_key(h.name, h.category) for h in self.store}, chunk_size=LOAD_CHUNK)
+        except (OSError, TransferError) as e:
+            messagebox.showerror("Import", f"Could not import {path}:\n{e}")
+            return
+        self._transfer = job
+        self._imported = 0
+        self._import_hold = self.storage.hold()
+        self._import_hold.__enter__()
+        self.after(TRANSFER_POLL_MS, self._poll_import)
+
+    def _poll_import(self):
+        job = self._transfer
+        with self.store.batch():
+            for chunk in job.poll():
+                self._imported += len(self.store.add_many(chunk, on_invalid=self.storage.quarantine))
+        if not job.done:
+            self._show_transfer_progress(f"Importing... {job.rows} rows read", job.fraction)
+            self.after(TRANSFER_POLL_MS, self._poll_import)
+            return
+        self._finish_import()
+        summary = f"Imported {self._imported} habits from {job.path}."
+        if job.duplicates:
+            summary += f"\n{job.duplicates} duplicate(s) (same name and category) skipped."
+        if job.bad_count:
+            summary += f"\n{job.bad_count} unreadable row(s) skipped, e.g. line {job.bad[0][0]}: {job.bad[0][1]}"
+        self._show_transfer_progress("", 1.0)
+        if job.error is not None:
+            messagebox.showerror("Import", f"{summary}\nStopped early: {job.error}")
+        else:
+            messagebox.showinfo("Import", summary)
 
-        meta = data.get("meta", {})
-        inc = meta.get("progress_increment")
-        cats = meta.get("categories")
-        if isinstance(inc, (int, float)):
-            self.progress_increment = float(inc)
+    def _finish_import(self):
+        self._transfer = None
+        hold, self._import_hold = self._import_hold, None
+        hold.__exit__(None, None, None)
 
-        if isinstance(cats, list) and cats:
-            # merge saved categories, ensuring defaults are present
-            for c in cats:
-                if c not in self.categories:
-                    self.categories.append(c)
+    def export_habits_prompt(self):
+        if self._transfer is not None:
+            messagebox.showinfo("Export", "An import or export is already running.")
+            return
+        path = filedialog.asksaveasfilename(title="Export habits", defaultextension=".csv", filetypes=[
+            ("CSV", "*.csv"), ("NDJSON", "*.ndjson")])
+        if path:
+            self.export_habits(path)
 
+    def export_habits(self, path):
+        # the records are listed here; the worker converts and writes them one by one
         try:
-            self.increment_slider.set(int(self.progress_increment * 100))
-        except Exception:
-            pass
-
-        # Clear any existing UI
-        for grp in list(self.category_groups.values()):
-            try:
-                grp.destroy()
-            except Exception:
-                pass
-        self.category_groups.clear()
+            self._transfer = ExportJob(path, list(self.store))
+        except TransferError as e:
+            messagebox.showerror("Export", str(e))
+            return
+        self.after(TRANSFER_POLL_MS, self._poll_export)
 
-        for card in list(self.habit_cards):
-            try:
-                card.destroy()
-            except Exception:
-                pass
-        self.habit_cards.clear()
+    def _poll_export(self):
+        job = self._transfer
+        if not job.done:
+            self._show_transfer_progress(f"Exporting... {job.written} of {job.total}", job.fraction)
+            self.after(TRANSFER_POLL_MS, self._poll_export)
+            return
+        self._transfer = None
+        self._show_transfer_progress("", 1.0)
+        if job.error is not None:
+            messagebox.showerror("Export", f"Could not write {job.path}:\n{job.error}")
+        else:
+            messagebox.showinfo("Export", f"Exported {job.written} habits to {job.path}.")
 
-        for entry in data.get("habits", []):
-            name = entry.get("name", "Untitled")
-            progress = float(entry.get("progress", 0.0))
-            increment = float(entry.get("increment", self.progress_increment))
-            category = entry.get("category", "Other")
-            if progress < 0:
-                progress = 0.0
-            if progress > 1:
-                progress = 1.0
-            self.add_habit_card(name=name, category=category, progress=progress, increment=increment, save=False)
+    def _show_transfer_progress(self, text, fraction):
+        if "settings" in self.pages:
+            self.transfer_status.configure(text=text)
+            self.transfer_progress.set(fraction)
 
     # ---------------- Utility ----------------
     def change_mode(self, mode):
@@ -582,12 +1908,93 @@ class HabitTrackerApp(ctk.CTk):
 
     # When closing, ensure we save
     def on_close(self):
-        self.save_habits()
+        if self._loading is not None:
+            # closed mid-load: read the rest so a pending snapshot holds every habit
+            self.store.extend(self._pending_entries, on_invalid=self.storage.quarantine)
+            self._loading.__exit__(None, None, None)
+            self._loading = None
+        if self._transfer is not None:
+            # keep what an import added so far; a partial export file is removed
+            self._transfer.cancel()
+            if self._import_hold is not None:
+                self._finish_import()
+        self.day_rollover.cancel()
+        self.external_changes.cancel()
+        self.reminders.cancel()
+        self.history.close()
+        self.storage.close()
         self.destroy()
 
 
 # ---------------- Run App ----------------
+# hot paths timed by --instrument
+INSTRUMENTED = [
+    ("HabitTrackerApp", "save_now"),
+    ("JsonStorage", "_snapshot_data"),
+    ("JsonStorage", "_write_data"),
+    ("SqliteStorage", "_on_store_event"),
+    ("SqliteStorage", "write_all"),
+    ("SqliteStorage", "flush"),
+    ("HabitTrackerApp", "load_habits"),
+    ("HabitTrackerApp", "merge_external_changes"),
+    ("HabitTrackerApp", "switch_profile"),
+    ("HabitTrackerApp", "_poll_import"),
+    ("HabitTrackerApp", "_load_next_chunk"),
+    ("HabitTrackerApp", "_create_card"),
+    ("HabitTrackerApp", "_on_store_event"),
+    ("RenderScheduler", "flush"),
+    ("HabitTrackerApp", "_apply_search"),
+    ("HabitTrackerApp", "refresh_statistics"),
+    ("_RingDrawing", "draw"),
+    ("_RingDrawing", "update_draw"),
+    ("HabitCard", "refresh"),
+    ("VirtualHabitList", "rebuild"),
+    ("VirtualHabitList", "render"),
+    ("ProgressRingGrid", "redraw"),
+]
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Smart Habit Tracker")
+    parser.add_argument("--instrument", action="store_true",
+                        help="time hot paths and Tk callbacks (Ctrl+Shift+D shows the diagnostics page)")
+    parser.add_argument("--instrument-dump", metavar="PATH", help="with --instrument: write the timings here on exit")
+    # (not --profile: that names a data profile, see profiles.py and cli.py)
+    parser.add_argument("--cprofile", metavar="PATH", help="run under cProfile and write pstats data to PATH")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print time to first paint and to interactive on stderr")
+    args = parser.parse_args(argv)
+
+    instrumentation = None
+    if args.instrument or args.instrument_dump:
+        from instrumentation import Instrumentation
+
+        instrumentation = Instrumentation()
+        for owner, attr in INSTRUMENTED:
+            instrumentation.wrap(globals()[owner], attr)
+        instrumentation.wrap_tk_callbacks()
+
+    profiler = None
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        app = HabitTrackerApp(instrumentation=instrumentation, startup_report=args.startup_report)
+        app.protocol("WM_DELETE_WINDOW", app.on_close)
+        app.mainloop()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+        if instrumentation is not None:
+            if args.instrument_dump:
+                instrumentation.dump(args.instrument_dump)
+            instrumentation.uninstall()
+
+
 if __name__ == "__main__":
-    app = HabitTrackerApp()
-    app.protocol("WM_DELETE_WINDOW", app.on_close)
-    app.mainloop()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,297 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from habit_store import DEFAULT_CATEGORIES, new_habit_id  # noqa: E402
+from persistence import write_json_file  # noqa: E402
+
+# ---------- Benchmark harness ----------
+# Each size runs in its own process (so peak RSS belongs to that size alone)
+# inside a scratch directory holding a synthetic habits.json:
+#
+#   python bench/benchmark.py run --sizes 10 1000 10000 100000 --output before.json
+#   python bench/benchmark.py compare before.json after.json
+#
+# "gui" mode builds the real HabitTrackerApp (needs a display; --xvfb starts a
+# virtual one) and times its methods; "headless" times the same operations on
+# the store and storage backend without widgets.
+DEFAULT_SIZES = (10, 1000, 10000, 100000)
+WORDS = ["Drink", "Water", "Read", "Walk", "Run", "Stretch", "Meditate", "Journal", "Study", "Code", "Call",
+         "Clean", "Cook", "Sleep", "Budget", "Practice", "Review", "Plan", "Write", "Floss"]
+
+
+def generate(path, count, seed=0):
+    # A habits.json with `count` habits spread over DEFAULT_CATEGORIES
+    rng = random.Random(seed)
+    habits = [
+        {
+            "id": new_habit_id(),
+            "name": f"{rng.choice(WORDS)} {rng.choice(WORDS).lower()} {i}",
+            "progress": round(rng.choice([0.0, 0.0, 0.3, 0.5, 1.0]), 2),
+            "increment": 0.1,
+            "category": DEFAULT_CATEGORIES[i % len(DEFAULT_CATEGORIES)],
+        }
+        for i in range(count)
+    ]
+    data = {
+        "meta": {
+            "progress_increment": 0.1,
+            "categories": list(DEFAULT_CATEGORIES),
+            "current_day": datetime.date.today().isoformat(),
+        },
+        "habits": habits,
+    }
+    write_json_file(path, data, fsync=False)
+
+
+def peak_rss_kb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # bytes on macOS, KiB elsewhere
+
+
+class Timer:
+    def __init__(self):
+        self.timings = {}
+
+    def __call__(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.timings[name] = round(time.perf_counter() - start, 6)
+        return result
+
+
+# ---------- Headless ----------
+def bench_headless(size):
+    from habit_store import HabitStore
+    from storage import JsonStorage
+
+    timer = Timer()
+    store = HabitStore()
+    storage = JsonStorage("habits.json", journal_path="habits.journal")
+
+    def load():
+        data = storage.load()
+        store.load(data)
+
+    timer("load_habits", load)
+    storage.attach(store)
+    timer("save_habits", lambda: (storage.save(), storage.flush()))
+    timer("reset_all_habits", store.reset_all)
+    timer("update_increment", store.set_progress_increment, 0.25)
+
+    def toggle_categories():
+        for category in store.used_categories():
+            store.set_collapsed(category, True)
+        for category in store.used_categories():
+            store.set_collapsed(category, False)
+
+    timer("toggle_categories", toggle_categories)
+    timer("close", storage.close)
+    return {"timings": timer.timings, "widgets": 0, "habits_loaded": len(store)}
+
+
+# ---------- GUI ----------
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def bench_gui(size):
+    import app as app_module
+
+    # reset_all_habits confirms with a dialog; answer it immediately
+    app_module.messagebox.showinfo = lambda *args, **kwargs: None
+
+    timer = Timer()
+
+    def settle(app):
+        # run the event loop until the streamed load and queued redraws are done
+        while app._loading is not None:
+            app.update()
+        app.update()
+
+    def load():
+        created = app_module.HabitTrackerApp()
+        settle(created)
+        return created
+
+    app = timer("load_habits", load)
+    timer("save_habits", lambda: (app.save_now(), app.update()))
+    timer("reset_all_habits", lambda: (app.reset_all_habits(), app.update()))
+    timer("update_increment", lambda: (app.update_increment(25), app.update()))
+
+    def toggle_categories():
+        if app.virtual_list is not None:
+            for category in app.store.used_categories():
+                app.virtual_list.toggle(category)
+                app.update()
+            for category in app.store.used_categories():
+                app.virtual_list.toggle(category)
+                app.update()
+        else:
+            for group in list(app.category_groups.values()):
+                group.toggle()
+                app.update()
+            for group in list(app.category_groups.values()):
+                group.toggle()
+                app.update()
+
+    timer("toggle_categories", toggle_categories)
+    widgets = count_widgets(app)
+    result = {
+        "timings": timer.timings,
+        "widgets": widgets,
+        "habits_loaded": len(app.store),
+        "dashboard": "virtual" if app.virtual_list is not None else "classic",
+    }
+    timer("close", app.on_close)
+    result["timings"]["close"] = timer.timings["close"]
+    return result
+
+
+def run_one(size, mode, workdir):
+    os.chdir(workdir)
+    generate("habits.json", size)
+    start = time.perf_counter()
+    result = bench_gui(size) if mode == "gui" else bench_headless(size)
+    result.update(size=size, mode=mode, total_seconds=round(time.perf_counter() - start, 6),
+                  peak_rss_kb=peak_rss_kb())
+    return result
+
+
+# ---------- Driver ----------
+def start_xvfb(display=":99"):
+    if not shutil.which("Xvfb"):
+        raise SystemExit("Xvfb not found; install it or use --mode headless")
+    proc = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    if proc.poll() is not None:
+        raise SystemExit(f"Xvfb exited with code {proc.returncode}")
+    os.environ["DISPLAY"] = display
+    return proc
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def run(args):
+    xvfb = None
+    mode = args.mode
+    if mode == "auto":
+        mode = "gui" if os.environ.get("DISPLAY") or args.xvfb else "headless"
+    if mode == "gui" and args.xvfb and not os.environ.get("DISPLAY"):
+        xvfb = start_xvfb(args.display)
+
+    report = {
+        "revision": git_revision(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mode": mode,
+        "results": [],
+    }
+    try:
+        for size in args.sizes:
+            workdir = tempfile.mkdtemp(prefix=f"habit-bench-{size}-")
+            try:
+                proc = subprocess.run([sys.executable, os.path.abspath(__file__), "one", "--size", str(size),
+                                       "--mode", mode, "--workdir", workdir],
+                                      capture_output=True, text=True, timeout=args.timeout)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            if proc.returncode != 0:
+                result = {"size": size, "mode": mode, "error": proc.stderr.strip().splitlines()[-1:]}
+            else:
+                result = json.loads(proc.stdout.strip().splitlines()[-1])
+            report["results"].append(result)
+            parts = [f"{k} {v:.3f}s" for k, v in result.get("timings", {}).items()]
+            if "peak_rss_kb" in result:
+                parts.append(f"peak RSS {result['peak_rss_kb'] / 1024:.0f} MiB")
+            if "error" in result:
+                parts.append(f"error {result['error']}")
+            print(f"{size:>7} habits: " + ", ".join(parts), file=sys.stderr)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+def compare(args):
+    # Print new/old timing ratios per size and operation
+    with open(args.old, encoding="utf-8") as f:
+        old = {r["size"]: r for r in json.load(f)["results"]}
+    with open(args.new, encoding="utf-8") as f:
+        new = {r["size"]: r for r in json.load(f)["results"]}
+    status = 0
+    for size in sorted(set(old) & set(new)):
+        before, after = old[size].get("timings", {}), new[size].get("timings", {})
+        for name in before:
+            if name not in after or not before[name]:
+                continue
+            ratio = after[name] / before[name]
+            flag = "  REGRESSION" if ratio > args.threshold else ""
+            status = 1 if flag else status
+            print(f"{size:>7} {name:<20}{before[name]:>10.4f}s {after[name]:>10.4f}s {ratio:>7.2f}x{flag}")
+        if "peak_rss_kb" in old[size] and "peak_rss_kb" in new[size]:
+            print(f"{size:>7} {'peak_rss_kb':<20}{old[size]['peak_rss_kb']:>11} {new[size]['peak_rss_kb']:>11}")
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Habit tracker benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="benchmark synthetic data sets and write a JSON report")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    run_parser.add_argument("--mode", choices=["auto", "gui", "headless"], default="auto")
+    run_parser.add_argument("--xvfb", action="store_true", help="start Xvfb when there is no DISPLAY")
+    run_parser.add_argument("--display", default=":99")
+    run_parser.add_argument("--timeout", type=float, default=1800)
+    run_parser.add_argument("--output", "-o", default=None, help="report file (default: stdout)")
+
+    one_parser = sub.add_parser("one", help=argparse.SUPPRESS)
+    one_parser.add_argument("--size", type=int, required=True)
+    one_parser.add_argument("--mode", choices=["gui", "headless"], required=True)
+    one_parser.add_argument("--workdir", required=True)
+
+    compare_parser = sub.add_parser("compare", help="compare two reports")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=1.2,
+                                help="flag operations slower than this ratio (exit status 1)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    if args.command == "one":
+        print(json.dumps(run_one(args.size, args.mode, args.workdir)))
+        return 0
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
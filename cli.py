@@ -0,0 +1,379 @@
+import argparse
+import json
+import sys
+
+from habit_store import HabitStore
+from history import HabitHistory, roll_over
+from profiles import ProfileManager
+from storage import open_storage
+from transfer import FORMATS, TransferError, detect_format, habit_key, read_habits, write_habits
+
+# ---------- Command line interface ----------
+# Works on the persisted habits without the GUI toolkit:
+#
+#   python app.py habit list [--category Health] [--search water] [--json]
+#   python app.py habit add "Stretch" --category Fitness
+#   python app.py habit inc "Exercise" [--by 0.25]
+#   python app.py habit reset [NAME ...]
+#   python app.py habit import habits.csv          (CSV or NDJSON, see transfer.py)
+#   python app.py habit export --format csv -o habits.csv
+#   python app.py habit stats [--json]
+#   python app.py habit --profile Alex list     (a profile's files, see profiles.py)
+#
+# add/inc/reset take "-" to read one habit per line from stdin (a plain name,
+# or a JSON object such as {"name": "Read", "by": 0.5}); `apply` reads mixed
+# operations ({"op": "inc", "name": ...}). Everything read is applied as one
+# batch: one journal append (or one snapshot / SQLite transaction), while the
+# data file lock is held so a running GUI never writes in between.
+DEFAULTS = {
+    "backend": "json",
+    "json_path": "habits.json",
+    "journal_path": "habits.journal",
+    "sqlite_path": "habits.db",
+    "snapshots": 3,
+    "durability": "close",
+    "history_dir": "history",
+    "profiles_dir": "profiles",
+}
+
+
+class CliError(Exception):
+    pass
+
+
+class Session:
+    # The store loaded from disk plus everything needed to persist changes to it
+    def __init__(self, config):
+        self.storage = open_storage(config["backend"], config["json_path"], journal_path=config["journal_path"],
+                                    sqlite_path=config["sqlite_path"], snapshots=config["snapshots"],
+                                    durability=config["durability"])
+        self.config = config
+        self.store = HabitStore()
+        self.history = None
+        self._by_name = None
+        self.errors = 0
+
+    def open(self):
+        data = self.storage.load()
+        if data is not None:
+            self.store.load(data, on_invalid=self.storage.quarantine)
+        self.storage.attach(self.store)
+        self.history = HabitHistory(self.config["history_dir"])
+        self.history.attach(self.store)
+        # a new day may have started since the GUI last ran
+        with self.storage.hold():
+            roll_over(self.store, self.history)
+        return self
+
+    def close(self):
+        self.storage.flush()
+        self.storage.close()
+        if self.history is not None:
+            self.history.close()
+
+    def find(self, key):
+        # by id, else by (case-insensitive) name
+        habit = self.store.get(key)
+        if habit is not None:
+            return habit
+        if self._by_name is None:
+            self._by_name = {}
+            for h in self.store:
+                self._by_name.setdefault(h.name.lower(), []).append(h)
+        matches = self._by_name.get(str(key).lower(), [])
+        if not matches:
+            raise CliError(f"no habit named {key!r}")
+        if len(matches) > 1:
+            raise CliError(f"{len(matches)} habits are named {key!r}; use an id: "
+                           + ", ".join(h.habit_id for h in matches))
+        return matches[0]
+
+    def report(self, error):
+        self.errors += 1
+        print(f"error: {error}", file=sys.stderr)
+
+    # ----- operations -----
+    def add(self, name, category="Other", progress=0.0, increment=None, reminder=None):
+        habit = self.store.add(name, category=category, progress=progress, increment=increment, reminder=reminder)
+        if self._by_name is not None:
+            self._by_name.setdefault(habit.name.lower(), []).append(habit)
+        return habit
+
+    def inc(self, key, by=None):
+        habit = self.find(key)
+        step = habit.increment if by is None else float(by)
+        self.store.update(habit, progress=habit.progress + step)
+        return habit
+
+    def reset(self, key):
+        habit = self.find(key)
+        self.store.update(habit, progress=0.0)
+        return habit
+
+    def apply(self, op, fields):
+        if op == "add":
+            if not fields.get("name"):
+                raise CliError("add needs a name")
+            self.add(str(fields["name"]), category=str(fields.get("category", "Other")),
+                     progress=float(fields.get("progress", 0.0)), increment=fields.get("increment"),
+                     reminder=fields.get("reminder"))
+        elif op == "inc":
+            self.inc(fields.get("id") or fields.get("name"), by=fields.get("by"))
+        elif op == "reset":
+            self.reset(fields.get("id") or fields.get("name"))
+        elif op == "delete":
+            self.store.remove(self.find(fields.get("id") or fields.get("name")))
+            self._by_name = None
+        else:
+            raise CliError(f"unknown op {op!r}")
+
+
+def read_lines(stream):
+    # stdin entries: a JSON object per line, or a bare habit name
+    for lineno, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                yield lineno, json.loads(line)
+            except ValueError as e:
+                yield lineno, CliError(f"line {lineno}: {e}")
+        else:
+            yield lineno, {"name": line}
+
+
+def entries(args_names, stdin):
+    if args_names == ["-"]:
+        yield from read_lines(stdin)
+    else:
+        for i, name in enumerate(args_names, 1):
+            yield i, {"name": name}
+
+
+# ---------- Commands ----------
+def cmd_list(session, args, out):
+    habits = session.store.by_category(args.category) if args.category else list(session.store)
+    if args.search:
+        needle = args.search.lower()
+        habits = [h for h in habits if needle in h.name.lower()]
+    if args.json:
+        for habit in habits:
+            out.write(json.dumps(habit.to_dict()) + "\n")
+        return
+    for habit in habits:
+        out.write(f"{habit.habit_id}  {habit.progress:>4.0%}  {habit.category[:14]:<14}  {habit.name}\n")
+
+
+def cmd_add(session, args, out, stdin):
+    for lineno, fields in entries(args.names, stdin):
+        try:
+            if isinstance(fields, Exception):
+                raise fields
+            fields.setdefault("category", args.category)
+            fields.setdefault("increment", args.increment)
+            fields.setdefault("reminder", args.reminder)
+            session.apply("add", fields)
+        except (CliError, TypeError, ValueError) as e:
+            session.report(e)
+
+
+def cmd_inc(session, args, out, stdin):
+    for lineno, fields in entries(args.names, stdin):
+        try:
+            if isinstance(fields, Exception):
+                raise fields
+            fields.setdefault("by", args.by)
+            habit = session.inc(fields.get("id") or fields.get("name"), by=fields.get("by"))
+            if args.names != ["-"]:
+                out.write(f"{habit.name}: {habit.progress:.0%}\n")
+        except (CliError, TypeError, ValueError) as e:
+            session.report(e)
+
+
+def cmd_reset(session, args, out, stdin):
+    if not args.names:
+        session.store.reset_all()
+        return
+    for lineno, fields in entries(args.names, stdin):
+        try:
+            if isinstance(fields, Exception):
+                raise fields
+            session.reset(fields.get("id") or fields.get("name"))
+        except (CliError, TypeError, ValueError) as e:
+            session.report(e)
+
+
+def cmd_apply(session, args, out, stdin):
+    for lineno, fields in read_lines(stdin):
+        try:
+            if isinstance(fields, Exception):
+                raise fields
+            if not isinstance(fields, dict) or "op" not in fields:
+                raise CliError(f"line {lineno}: expected a JSON object with an \"op\"")
+            session.apply(fields["op"], fields)
+        except (CliError, TypeError, ValueError) as e:
+            session.report(e)
+
+
+def cmd_import(session, args, out, stdin):
+    # rows already present (same name and category) are skipped; added in chunks of 500
+    known = {habit_key(h.name, h.category) for h in session.store}
+    added = duplicates = 0
+    try:
+        fmt = args.format or ("ndjson" if args.path == "-" else detect_format(args.path))
+        f = stdin if args.path == "-" else open(args.path, "r", encoding="utf-8-sig", newline="")
+    except (OSError, TransferError) as e:
+        session.report(e)
+        return
+    try:
+        chunk = []
+        for entry in read_habits(f, fmt, on_bad=lambda line_no, e: session.report(f"line {line_no}: {e}")):
+            key = habit_key(entry["name"], entry["category"])
+            if key in known:
+                duplicates += 1
+                continue
+            known.add(key)
+            chunk.append(entry)
+            if len(chunk) >= 500:
+                added += len(session.store.add_many(chunk))
+                chunk = []
+        added += len(session.store.add_many(chunk))
+    except TransferError as e:
+        session.report(e)
+    finally:
+        if f is not stdin:
+            f.close()
+    out.write(f"imported {added} habits, skipped {duplicates} duplicates\n")
+
+
+def cmd_export(session, args, out):
+    target = open(args.output, "w", encoding="utf-8", newline="") if args.output else out
+    try:
+        if args.format == "json":
+            json.dump(session.store.to_data(), target, indent=2)
+            target.write("\n")
+        else:
+            # the same columns as an export from the app (transfer.FIELDS)
+            for _ in write_habits(target, session.store, args.format):
+                pass
+    finally:
+        if target is not out:
+            target.close()
+
+
+def cmd_stats(session, args, out):
+    from analytics import HabitAnalytics
+
+    analytics = HabitAnalytics(session.history)
+    habits = list(session.store)
+    per_habit = analytics.habit_stats(habits)
+    per_category = analytics.category_stats(habits, per_habit)
+    if args.json:
+        json.dump({"categories": per_category,
+                   "habits": {h.habit_id: dict(per_habit[h.habit_id], name=h.name) for h in habits}},
+                  out, indent=2)
+        out.write("\n")
+        return
+    out.write(f"{'Category':<18}{'Habits':>7}{'Progress':>10}{'7 days':>9}{'30 days':>9}{'Best':>6}\n")
+    for category, st in sorted(per_category.items()):
+        out.write(f"{category[:17]:<18}{st['habits']:>7}{st['avg_progress']:>10.0%}"
+                  f"{st['rate_7']:>9.0%}{st['rate_30']:>9.0%}{st['best_streak']:>6}\n")
+
+
+COMMANDS = {
+    "list": (cmd_list, False),
+    "add": (cmd_add, True),
+    "inc": (cmd_inc, True),
+    "reset": (cmd_reset, True),
+    "apply": (cmd_apply, True),
+    "import": (cmd_import, True),
+    "export": (cmd_export, False),
+    "stats": (cmd_stats, False),
+}
+
+
+def build_parser(defaults):
+    parser = argparse.ArgumentParser(prog="habit", description="Habit tracker command line")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default=defaults["backend"])
+    parser.add_argument("--data", dest="json_path", default=defaults["json_path"], help="JSON data file")
+    parser.add_argument("--journal", dest="journal_path", default=defaults["journal_path"])
+    parser.add_argument("--db", dest="sqlite_path", default=defaults["sqlite_path"], help="SQLite data file")
+    parser.add_argument("--profile", help="use this profile's data files (instead of --data/--journal/--db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="show habits")
+    p.add_argument("--category")
+    p.add_argument("--search", help="only names containing this text")
+    p.add_argument("--json", action="store_true", help="one JSON object per line")
+
+    p = sub.add_parser("add", help="add habits (\"-\": read from stdin)")
+    p.add_argument("names", nargs="+")
+    p.add_argument("--category", default="Other")
+    p.add_argument("--increment", type=float, default=None)
+    p.add_argument("--reminder", type=int, default=None, metavar="MINUTES",
+                   help="remind every MINUTES until the habit is complete")
+
+    p = sub.add_parser("inc", help="add progress to habits (\"-\": read from stdin)")
+    p.add_argument("names", nargs="+", metavar="name_or_id")
+    p.add_argument("--by", type=float, default=None, help="amount instead of the habit's increment")
+
+    p = sub.add_parser("reset", help="reset progress of the given habits, or of all habits")
+    p.add_argument("names", nargs="*", metavar="name_or_id")
+
+    sub.add_parser("apply", help="apply JSON operations from stdin, e.g. {\"op\": \"inc\", \"name\": \"Read\"}")
+
+    p = sub.add_parser("import", help="add habits from a CSV or NDJSON file (\"-\": NDJSON from stdin)")
+    p.add_argument("path")
+    p.add_argument("--format", choices=FORMATS, default=None, help="default: from the file extension")
+
+    p = sub.add_parser("export", help="write all habits")
+    p.add_argument("--format", choices=["json", "ndjson", "csv"], default="json")
+    p.add_argument("-o", "--output", help="file (default: stdout)")
+
+    p = sub.add_parser("stats", help="completion statistics per category")
+    p.add_argument("--json", action="store_true")
+    return parser
+
+
+def main(argv=None, stdin=None, out=None, **config):
+    config = dict(DEFAULTS, **config)
+    args = build_parser(config).parse_args(argv)
+    config.update(backend=args.backend, json_path=args.json_path, journal_path=args.journal_path,
+                  sqlite_path=args.sqlite_path)
+    if args.profile is not None:
+        profiles = ProfileManager(config["profiles_dir"])
+        if not profiles.exists(args.profile):
+            print(f"error: no profile named {args.profile!r} (have: {', '.join(profiles.names())})", file=sys.stderr)
+            return 2
+        for key in ("json_path", "journal_path", "sqlite_path", "history_dir"):
+            if config[key] is not None:
+                config[key] = profiles.path(args.profile, config[key])
+    stdin = stdin or sys.stdin
+    out = out or sys.stdout
+    command, writes = COMMANDS[args.command]
+
+    session = Session(config)
+    try:
+        # the lock is held from reading the data to writing the result
+        with session.storage.lock:
+            session.open()
+            try:
+                if writes:
+                    with session.storage.hold(), session.store.batch():
+                        command(session, args, out, stdin)
+                else:
+                    command(session, args, out)
+            finally:
+                session.close()
+    except TimeoutError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # output cut short (e.g. piped into head); nothing more to print
+        return 0
+    return 1 if session.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
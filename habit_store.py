@@ -0,0 +1,391 @@
+import uuid
+from contextlib import contextmanager
+
+# Default categories
+DEFAULT_CATEGORIES = [
+    "Health",
+    "Fitness",
+    "Productivity",
+    "Learning",
+    "Work",
+    "Personal",
+    "Finance",
+    "Chores",
+    "Social",
+    "Other",
+]
+
+DEFAULT_INCREMENT = 0.1
+
+
+def new_habit_id():
+    return uuid.uuid4().hex[:12]
+
+
+def clamp_progress(value):
+    return max(0.0, min(1.0, float(value)))
+
+
+def reminder_minutes(value):
+    # A reminder interval in whole minutes, or None for no reminder
+    if value in (None, "", 0):
+        return None
+    minutes = int(value)
+    if minutes < 1:
+        raise ValueError(f"reminder interval must be at least one minute, not {value!r}")
+    return minutes
+
+
+# ---------- Habit record ----------
+class Habit:
+    # reminder: minutes between reminders while the habit is not complete (None: off)
+    __slots__ = ("habit_id", "name", "category", "progress", "increment", "reminder")
+
+    def __init__(self, name, category="Other", progress=0.0, increment=DEFAULT_INCREMENT, habit_id=None,
+                 reminder=None):
+        self.habit_id = habit_id or new_habit_id()
+        self.name = name
+        self.category = category
+        self.progress = progress
+        self.increment = increment
+        self.reminder = reminder
+
+    def to_dict(self):
+        entry = {
+            "id": self.habit_id,
+            "name": self.name,
+            "progress": self.progress,
+            "increment": self.increment,
+            "category": self.category,
+        }
+        if self.reminder:
+            entry["reminder"] = self.reminder
+        return entry
+
+    @classmethod
+    def from_dict(cls, entry, default_increment=DEFAULT_INCREMENT):
+        # Validate and clamp one persisted entry; raises on unusable values
+        return cls(
+            str(entry.get("name", "Untitled")),
+            category=str(entry.get("category", "Other")),
+            progress=clamp_progress(entry.get("progress", 0.0)),
+            increment=float(entry.get("increment", default_increment)),
+            habit_id=entry.get("id"),
+            reminder=reminder_minutes(entry.get("reminder")),
+        )
+
+    def __repr__(self):
+        return f"Habit({self.name!r}, category={self.category!r}, progress={self.progress:.2f})"
+
+
+# ---------- Store ----------
+class HabitStore:
+    # Pure-Python owner of all habit state. Widgets and persistence subscribe
+    # with a callback(event, habit, changes) where event is one of:
+    #   "add"      habit was added                       (changes None)
+    #   "update"   fields of habit changed               (changes = {field: new value})
+    #   "remove"   habit was removed                     (changes None)
+    #   "all"      the same fields were set on every habit (habit None)
+    #   "settings" progress_increment/categories/current_day/collapsed changed (habit None)
+    #   "reload"   the whole store was replaced          (habit None, changes None)
+    #   "load"     persisted habits were appended by extend() (habit None, changes = [Habit, ...])
+    #   "merge"    another process's changes were merged in by merge() (habit None,
+    #              changes = [(event, habit, changes), ...] like "batch")
+    #   "batch"    several of the above, delivered at the end of a batch()
+    #              (habit None, changes = [(event, habit, changes), ...])
+    def __init__(self):
+        self.progress_increment = DEFAULT_INCREMENT
+        self.categories = list(DEFAULT_CATEGORIES)
+        self.current_day = None  # ISO date whose progress the habits hold (see history.roll_over)
+        self.collapsed = set()   # categories whose dashboard group is collapsed
+        self._habits = {}       # id -> Habit, in insertion order
+        self._by_category = {}  # category -> {id: Habit}, categories in order of first use
+        self._listeners = []
+        self._batch_depth = 0
+        self._batched = []
+
+    # ----- queries -----
+    def __len__(self):
+        return len(self._habits)
+
+    def __iter__(self):
+        return iter(list(self._habits.values()))
+
+    def __contains__(self, habit_id):
+        return habit_id in self._habits
+
+    def get(self, habit_id):
+        return self._habits.get(habit_id)
+
+    def by_category(self, category):
+        return list(self._by_category.get(category, {}).values())
+
+    def used_categories(self):
+        return [c for c, habits in self._by_category.items() if habits]
+
+    # ----- notifications -----
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+        def unsubscribe():
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+        return unsubscribe
+
+    def _notify(self, event, habit=None, changes=None):
+        if self._batch_depth:
+            self._batched.append((event, habit, changes))
+            return
+        for callback in list(self._listeners):
+            callback(event, habit, changes)
+
+    @contextmanager
+    def batch(self):
+        # Hold back notifications until the outermost batch ends, then deliver
+        # them as a single "batch" event
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batched:
+                events, self._batched = self._batched, []
+                for callback in list(self._listeners):
+                    callback("batch", None, events)
+
+    # ----- mutations -----
+    def _resolve(self, habit):
+        return habit if isinstance(habit, Habit) else self._habits.get(habit)
+
+    def _index(self, habit):
+        self._by_category.setdefault(habit.category, {})[habit.habit_id] = habit
+
+    def _unindex(self, habit):
+        group = self._by_category.get(habit.category)
+        if group is not None:
+            group.pop(habit.habit_id, None)
+            if not group:
+                del self._by_category[habit.category]
+
+    def add_category(self, category):
+        if category and category not in self.categories:
+            self.categories.append(category)
+            self._notify("settings", None, {"categories": list(self.categories)})
+
+    def add(self, name, category="Other", progress=0.0, increment=None, habit_id=None, reminder=None):
+        if increment is None:
+            increment = self.progress_increment
+        habit = Habit(name, category=category, progress=clamp_progress(progress), increment=increment,
+                      habit_id=habit_id, reminder=reminder_minutes(reminder))
+        self._insert(habit)
+        self._notify("add", habit)
+        return habit
+
+    def _insert(self, habit):
+        if habit.habit_id in self._habits:
+            self._unindex(self._habits[habit.habit_id])
+        self._habits[habit.habit_id] = habit
+        self._index(habit)
+        if habit.category not in self.categories:
+            self.categories.append(habit.category)
+
+    def update(self, habit, **fields):
+        habit = self._resolve(habit)
+        if habit is None:
+            return {}
+        if "progress" in fields:
+            fields["progress"] = clamp_progress(fields["progress"])
+        if "reminder" in fields:
+            fields["reminder"] = reminder_minutes(fields["reminder"])
+        changes = {k: v for k, v in fields.items() if getattr(habit, k) != v}
+        if not changes:
+            return changes
+        self._apply(habit, changes)
+        self._notify("update", habit, changes)
+        return changes
+
+    def _apply(self, habit, changes):
+        if "category" in changes:
+            self._unindex(habit)
+        for key, value in changes.items():
+            setattr(habit, key, value)
+        if "category" in changes:
+            self._index(habit)
+            if habit.category not in self.categories:
+                self.categories.append(habit.category)
+
+    def remove(self, habit):
+        habit = self._resolve(habit)
+        if habit is None or habit.habit_id not in self._habits:
+            return None
+        del self._habits[habit.habit_id]
+        self._unindex(habit)
+        self._notify("remove", habit)
+        return habit
+
+    def set_all(self, **fields):
+        # Apply the same field values to every habit with one notification
+        if "progress" in fields:
+            fields["progress"] = clamp_progress(fields["progress"])
+        for habit in self._habits.values():
+            for key, value in fields.items():
+                setattr(habit, key, value)
+        self._notify("all", None, fields)
+
+    def reset_all(self):
+        self.set_all(progress=0.0)
+
+    def set_current_day(self, iso_date):
+        if iso_date != self.current_day:
+            self.current_day = iso_date
+            self._notify("settings", None, {"current_day": iso_date})
+
+    def set_collapsed(self, category, collapsed=True):
+        if collapsed == (category in self.collapsed):
+            return
+        if collapsed:
+            self.collapsed.add(category)
+        else:
+            self.collapsed.discard(category)
+        self._notify("settings", None, {"collapsed": sorted(self.collapsed)})
+
+    def set_progress_increment(self, value, apply_to_all=True):
+        with self.batch():
+            self.progress_increment = float(value)
+            self._notify("settings", None, {"progress_increment": self.progress_increment})
+            if apply_to_all:
+                self.set_all(increment=self.progress_increment)
+
+    # ----- (de)serialization -----
+    def load(self, data, on_invalid=None):
+        # Replace the store contents with a parsed data document (validated and
+        # clamped); unusable entries are skipped and passed to on_invalid(entry, error).
+        # Settings the document does not have fall back to the defaults, not to
+        # what the store held before (e.g. another profile's).
+        meta = data.get("meta", {}) or {}
+        inc = meta.get("progress_increment")
+        self.progress_increment = float(inc) if isinstance(inc, (int, float)) else DEFAULT_INCREMENT
+        day = meta.get("current_day")
+        self.current_day = day if isinstance(day, str) else None
+        collapsed = meta.get("collapsed")
+        self.collapsed = {c for c in collapsed if isinstance(c, str)} if isinstance(collapsed, list) else set()
+        self.categories = list(DEFAULT_CATEGORIES)
+        cats = meta.get("categories")
+        if isinstance(cats, list) and cats:
+            # merge saved categories, ensuring defaults are present
+            for c in cats:
+                if isinstance(c, str) and c not in self.categories:
+                    self.categories.append(c)
+
+        self._habits = {}
+        self._by_category = {}
+        self._load_entries(data.get("habits", []), on_invalid)
+        self._notify("reload")
+
+    def extend(self, entries, on_invalid=None):
+        # Append persisted entries (validated like load()) without replacing the
+        # store, e.g. the next chunk of a streamed file. Listeners get one "load"
+        # event; it describes existing data, so persistence does not write it again.
+        habits = self._load_entries(entries, on_invalid)
+        if habits:
+            self._notify("load", None, habits)
+        return habits
+
+    def add_many(self, entries, on_invalid=None):
+        # Add habits from entry dicts (validated like load(), always with new ids),
+        # delivered to listeners as one batch
+        with self.batch():
+            habits = []
+            for entry in entries:
+                try:
+                    habit = Habit.from_dict(dict(entry, id=None), default_increment=self.progress_increment)
+                except (AttributeError, TypeError, ValueError) as e:
+                    if on_invalid is not None:
+                        on_invalid(entry, e)
+                    continue
+                self._insert(habit)
+                self._notify("add", habit)
+                habits.append(habit)
+        return habits
+
+    def merge(self, entries=(), removed=(), fields=None, meta=None, on_invalid=None):
+        # Bring in changes another process made to the persisted data: `fields`
+        # set on every habit, then the full state of changed or new habits
+        # (entries, validated like load()), removed habit ids and settings. Only
+        # habits that actually differ are touched; listeners get one "merge"
+        # event listing them, which persistence does not write again. The
+        # collapsed groups stay as they are (they belong to this window).
+        events = []
+        if fields:
+            fields = {k: v for k, v in fields.items() if k in ("progress", "increment")}
+            if "progress" in fields:
+                fields["progress"] = clamp_progress(fields["progress"])
+            for habit in self._habits.values():
+                for key, value in fields.items():
+                    setattr(habit, key, value)
+            events.append(("all", None, fields))
+        for entry in entries:
+            try:
+                incoming = Habit.from_dict(entry, default_increment=self.progress_increment)
+            except (AttributeError, TypeError, ValueError) as e:
+                if on_invalid is not None:
+                    on_invalid(entry, e)
+                continue
+            habit = self._habits.get(incoming.habit_id)
+            if habit is None:
+                self._insert(incoming)
+                events.append(("add", incoming, None))
+                continue
+            changes = {k: getattr(incoming, k) for k in ("name", "category", "progress", "increment", "reminder")
+                       if getattr(incoming, k) != getattr(habit, k)}
+            if changes:
+                self._apply(habit, changes)
+                events.append(("update", habit, changes))
+        for habit_id in removed:
+            habit = self._habits.pop(habit_id, None)
+            if habit is not None:
+                self._unindex(habit)
+                events.append(("remove", habit, None))
+        settings = {}
+        meta = meta or {}
+        inc = meta.get("progress_increment")
+        if isinstance(inc, (int, float)) and float(inc) != self.progress_increment:
+            self.progress_increment = settings["progress_increment"] = float(inc)
+        day = meta.get("current_day")
+        if isinstance(day, str) and day != self.current_day:
+            self.current_day = settings["current_day"] = day
+        cats = meta.get("categories")
+        if isinstance(cats, list):
+            added = [c for c in cats if isinstance(c, str) and c not in self.categories]
+            if added:
+                self.categories.extend(added)
+                settings["categories"] = list(self.categories)
+        if settings:
+            events.append(("settings", None, settings))
+        if events:
+            self._notify("merge", None, events)
+        return events
+
+    def _load_entries(self, entries, on_invalid):
+        habits = []
+        for entry in entries:
+            try:
+                habit = Habit.from_dict(entry, default_increment=self.progress_increment)
+            except (AttributeError, TypeError, ValueError) as e:
+                if on_invalid is not None:
+                    on_invalid(entry, e)
+                continue
+            self._insert(habit)
+            habits.append(habit)
+        return habits
+
+    def to_data(self):
+        return {
+            "meta": {
+                "progress_increment": self.progress_increment,
+                "categories": list(self.categories),
+                "current_day": self.current_day,
+                "collapsed": sorted(self.collapsed),
+            },
+            "habits": [habit.to_dict() for habit in self._habits.values()],
+        }
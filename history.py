@@ -0,0 +1,297 @@
+import datetime
+import mmap
+import os
+import struct
+
+# ---------- Completion history ----------
+# Each habit gets one append-only binary file <root>/<habit id>.bin made of
+# fixed-size records, in time order:
+#
+#   int32   day      days since 1970-01-01 (local date)
+#   uint16  minute   minute of the day
+#   uint8   kind     KIND_PROGRESS / KIND_RESET / KIND_ARCHIVE
+#   (pad)
+#   float32 value    progress after the change; for resets the progress that
+#                    was thrown away; for archives the final progress of the day
+#
+# Files are only opened when a habit's history is queried (memory-mapped and
+# binary-searched by day), so loading the dashboard never reads history.
+RECORD = struct.Struct("<iHBxf")
+
+KIND_PROGRESS = 0
+KIND_RESET = 1
+KIND_ARCHIVE = 2
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# progress values at or above this count as a completed day
+COMPLETE = 0.999
+
+
+def day_number(date=None):
+    date = date or datetime.date.today()
+    return date.toordinal() - EPOCH_ORDINAL
+
+
+def day_date(day):
+    return datetime.date.fromordinal(day + EPOCH_ORDINAL)
+
+
+class HabitHistory:
+    # Appends are buffered per habit and written together after flush_ms (via
+    # `after`, the Tk timer of the owning widget), when the buffer grows large,
+    # before a query, and on close().
+    def __init__(self, root, after=None, flush_ms=2000, max_pending_bytes=64 * 1024):
+        self.root = root
+        self._after = after
+        self.flush_ms = flush_ms
+        self.max_pending_bytes = max_pending_bytes
+        os.makedirs(root, exist_ok=True)
+
+        self._pending = {}          # habit id -> bytearray of packed records
+        self._pending_bytes = 0
+        self._timer = None
+        self._last_progress = {}    # habit id -> last known progress (to record what a reset discarded)
+        self._versions = {}         # habit id -> number of records added this session (cache key)
+        self._last_day = {}         # habit id -> day of the newest record written this session
+        self.store = None
+
+    def path_for(self, habit_id):
+        return os.path.join(self.root, f"{habit_id}.bin")
+
+    # ----- store integration -----
+    def attach(self, store):
+        self.store = store
+        self._seed()
+        self._unsubscribe = store.subscribe(self._on_store_event)
+
+    def detach(self):
+        self._unsubscribe()
+
+    def _seed(self):
+        self._last_progress = {h.habit_id: h.progress for h in self.store}
+
+    def _on_store_event(self, event, habit, changes):
+        events = changes if event == "batch" else [(event, habit, changes)]
+        for event, habit, changes in events:
+            if event == "reload":
+                self._seed()
+            elif event == "add":
+                self._last_progress[habit.habit_id] = habit.progress
+            elif event == "load":
+                for loaded in changes:
+                    self._last_progress[loaded.habit_id] = loaded.progress
+            elif event == "merge":
+                # the other process recorded these itself: only follow the values
+                for merged_event, merged, merged_changes in changes:
+                    if merged_event == "all" and "progress" in merged_changes:
+                        for habit_id in self._last_progress:
+                            self._last_progress[habit_id] = merged_changes["progress"]
+                    elif merged_event in ("add", "update"):
+                        self._last_progress[merged.habit_id] = merged.progress
+                    elif merged_event == "remove":
+                        self._last_progress.pop(merged.habit_id, None)
+            elif event == "remove":
+                self._last_progress.pop(habit.habit_id, None)
+                self.forget(habit.habit_id)
+            elif event == "update" and "progress" in changes:
+                self._progress_changed(habit.habit_id, changes["progress"])
+            elif event == "all" and "progress" in changes:
+                for habit_id in list(self._last_progress):
+                    self._progress_changed(habit_id, changes["progress"])
+
+    def _progress_changed(self, habit_id, value):
+        old = self._last_progress.get(habit_id, 0.0)
+        self._last_progress[habit_id] = value
+        if value == old:
+            return
+        if value == 0.0:
+            if old > 0.0:
+                self.record(habit_id, old, KIND_RESET)
+        else:
+            self.record(habit_id, value, KIND_PROGRESS)
+
+    # ----- writing -----
+    def record(self, habit_id, value, kind=KIND_PROGRESS, when=None):
+        when = when or datetime.datetime.now()
+        day = day_number(when.date())
+        minute = when.hour * 60 + when.minute
+        # files must stay in day order for the binary search; a late archive of
+        # an earlier day (e.g. after a suspended machine) is filed under the newer day
+        if day < self._last_day.get(habit_id, day):
+            day, minute = self._last_day[habit_id], 0
+        self._last_day[habit_id] = day
+        self._pending.setdefault(habit_id, bytearray()).extend(RECORD.pack(day, minute, kind, value))
+        self._versions[habit_id] = self._versions.get(habit_id, 0) + 1
+        self._pending_bytes += RECORD.size
+        if self._pending_bytes >= self.max_pending_bytes:
+            self.flush()
+        elif self._after is not None and self._timer is None:
+            self._timer = self._after(self.flush_ms, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self.flush()
+
+    def flush(self, habit_id=None):
+        ids = [habit_id] if habit_id is not None else list(self._pending)
+        for hid in ids:
+            buf = self._pending.pop(hid, None)
+            if not buf:
+                continue
+            self._pending_bytes -= len(buf)
+            with open(self.path_for(hid), "ab") as f:
+                f.write(buf)
+
+    def version(self, habit_id):
+        # changes whenever a record is added for the habit
+        return self._versions.get(habit_id, 0)
+
+    def forget(self, habit_id):
+        self._versions[habit_id] = self._versions.get(habit_id, 0) + 1
+        buf = self._pending.pop(habit_id, None)
+        if buf:
+            self._pending_bytes -= len(buf)
+        try:
+            os.remove(self.path_for(habit_id))
+        except OSError:
+            pass
+
+    def archive_day(self, day, habits):
+        # Store each habit's final progress for `day`. Afterwards the habits count
+        # as reset, so the reset that follows a rollover adds no reset records.
+        when = datetime.datetime.combine(day_date(day), datetime.time(23, 59))
+        for habit in habits:
+            if habit.progress > 0.0:
+                self.record(habit.habit_id, habit.progress, KIND_ARCHIVE, when=when)
+            self._last_progress[habit.habit_id] = 0.0
+
+    def close(self):
+        self.flush()
+
+    # ----- reading -----
+    def _read_range(self, habit_id, start_day, end_day):
+        # (day, minute, kind, value) for records with start_day <= day <= end_day
+        self.flush(habit_id)
+        path = self.path_for(habit_id)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return []
+        count = size // RECORD.size
+        if count == 0:
+            return []
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # records are appended in time order: binary search the first day >= start_day
+            lo, hi = 0, count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if RECORD.unpack_from(mm, mid * RECORD.size)[0] < start_day:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            out = []
+            for i in range(lo, count):
+                rec = RECORD.unpack_from(mm, i * RECORD.size)
+                if rec[0] > end_day:
+                    break
+                out.append(rec)
+            return out
+
+    def events(self, habit_id, start_day=None, end_day=None):
+        return self._read_range(habit_id, start_day if start_day is not None else -(2 ** 31),
+                                end_day if end_day is not None else 2 ** 31 - 1)
+
+    def daily_values(self, habit_id, start_day, end_day):
+        # Best progress reached on each day in [start_day, end_day]; 0.0 for days without events
+        values = [0.0] * (end_day - start_day + 1)
+        for day, _minute, _kind, value in self._read_range(habit_id, start_day, end_day):
+            i = day - start_day
+            if value > values[i]:
+                values[i] = value
+        return values
+
+    def last_days(self, habit_id, days, today=None):
+        today = day_number() if today is None else today
+        return self.daily_values(habit_id, today - days + 1, today)
+
+    def completion_rate(self, habit_id, days, today=None):
+        values = self.last_days(habit_id, days, today)
+        return sum(1 for v in values if v >= COMPLETE) / float(days) if days else 0.0
+
+    def streaks(self, habit_id, days=365, today=None):
+        # (current, longest) runs of completed days within the window. Today
+        # still counts towards the current streak while it is in progress.
+        values = self.last_days(habit_id, days, today)
+        longest = run = 0
+        for v in values:
+            run = run + 1 if v >= COMPLETE else 0
+            longest = max(longest, run)
+        current = 0
+        tail = values if values and values[-1] >= COMPLETE else values[:-1]
+        for v in reversed(tail):
+            if v < COMPLETE:
+                break
+            current += 1
+        return current, longest
+
+
+# ---------- Day rollover ----------
+def roll_over(store, history, today=None):
+    # Archive the progress of the day the store holds and reset every habit,
+    # if the local date has moved on since. Days the app was closed contribute
+    # nothing (no events = 0%), and the archived day is never revisited because
+    # store.current_day moves forward. Returns True if a rollover happened.
+    today = today or datetime.date.today()
+    if store.current_day is None:
+        store.set_current_day(today.isoformat())
+        return False
+    try:
+        last = datetime.date.fromisoformat(store.current_day)
+    except ValueError:
+        last = today
+    if last >= today:
+        if last > today:
+            # clock went backwards; adopt the new date without archiving
+            store.set_current_day(today.isoformat())
+        return False
+    with store.batch():
+        history.archive_day(day_number(last), list(store))
+        store.reset_all()
+        store.set_current_day(today.isoformat())
+    history.flush()
+    return True
+
+
+class DayRolloverScheduler:
+    # Sleeps (one pending after()) until just past the next local midnight, then
+    # calls on_rollover() (which archives the day's progress and resets every
+    # habit, see roll_over) and re-arms for the following midnight. `after` /
+    # `after_cancel` are the Tk timer functions of the owning widget.
+    def __init__(self, after, after_cancel, on_rollover, clock=datetime.datetime.now):
+        self._after = after
+        self._after_cancel = after_cancel
+        self.on_rollover = on_rollover
+        self.clock = clock
+        self._timer = None
+
+    def start(self):
+        self.cancel()
+        now = self.clock()
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+        delay_ms = int((midnight - now).total_seconds() * 1000) + 1000
+        self._timer = self._after(delay_ms, self._fire)
+
+    def cancel(self):
+        if self._timer is not None:
+            try:
+                self._after_cancel(self._timer)
+            except Exception:
+                pass
+            self._timer = None
+
+    def _fire(self):
+        self._timer = None
+        # a timer that fires early (clock adjusted) simply finds nothing to do and re-arms
+        self.on_rollover()
+        self.start()
@@ -0,0 +1,150 @@
+import functools
+import json
+import time
+import tkinter
+
+# ---------- Opt-in instrumentation ----------
+# Nothing here runs unless an Instrumentation is installed: wrap() replaces a
+# method on its class with a timing wrapper (and unwrap/uninstall put the
+# original back), so a normal run calls the plain methods with no added cost.
+#
+# While installed it also times every Tk callback (commands, bindings and
+# after() timers all go through tkinter.CallWrapper) and watches how late a
+# periodic heartbeat timer fires, which is how long the event loop was blocked.
+
+
+class Stat:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class Instrumentation:
+    def __init__(self, heartbeat_ms=50, block_ms=100):
+        self.heartbeat_ms = heartbeat_ms
+        self.block_ms = block_ms   # heartbeat lateness counted as a blocked loop
+        self.timers = {}           # name -> Stat
+        self.counters = {}         # name -> int
+        self.blocks = Stat()       # event loop stalls longer than block_ms
+        self.started = time.time()
+        self._patched = []
+        self._widget = None
+        self._heartbeat = None
+        self._expected = None
+
+    # ----- recording -----
+    def add_time(self, name, seconds):
+        stat = self.timers.get(name)
+        if stat is None:
+            stat = self.timers[name] = Stat()
+        stat.add(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def _timing_wrapper(self, name, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+        return wrapper
+
+    # ----- installing -----
+    def wrap(self, owner, attr, name=None):
+        original = owner.__dict__[attr]
+        setattr(owner, attr, self._timing_wrapper(name or f"{owner.__name__}.{attr}", original))
+        self._patched.append((owner, attr, original))
+
+    def wrap_tk_callbacks(self):
+        # every Python callback Tk invokes, named after the function it calls
+        original = tkinter.CallWrapper.__call__
+        stats = self
+
+        def __call__(wrapper_self, *args):
+            func = wrapper_self.func
+            name = "tk: " + getattr(func, "__qualname__", getattr(func, "__name__", repr(func)))
+            start = time.perf_counter()
+            try:
+                return original(wrapper_self, *args)
+            finally:
+                stats.add_time(name, time.perf_counter() - start)
+
+        tkinter.CallWrapper.__call__ = __call__
+        self._patched.append((tkinter.CallWrapper, "__call__", original))
+
+    def watch_event_loop(self, widget):
+        # heartbeat timer: any delay past its due time is time the loop spent blocked
+        self._widget = widget
+        self._expected = time.perf_counter() + self.heartbeat_ms / 1000.0
+        self._heartbeat = widget.after(self.heartbeat_ms, self._beat)
+
+    def _beat(self):
+        now = time.perf_counter()
+        late = now - self._expected
+        if late * 1000 >= self.block_ms:
+            self.blocks.add(late)
+        self._expected = now + self.heartbeat_ms / 1000.0
+        self._heartbeat = self._widget.after(self.heartbeat_ms, self._beat)
+
+    def uninstall(self):
+        if self._heartbeat is not None:
+            try:
+                self._widget.after_cancel(self._heartbeat)
+            except Exception:
+                pass
+            self._heartbeat = None
+        while self._patched:
+            owner, attr, original = self._patched.pop()
+            setattr(owner, attr, original)
+
+    # ----- reporting -----
+    def snapshot(self):
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "event_loop_blocks": dict(self.blocks.to_dict(), threshold_ms=self.block_ms),
+            "timers": {name: stat.to_dict() for name, stat in
+                       sorted(self.timers.items(), key=lambda item: item[1].total, reverse=True)},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def report(self, top=40):
+        snap = self.snapshot()
+        blocks = snap["event_loop_blocks"]
+        lines = [
+            f"Uptime {snap['uptime_s']}s",
+            f"Event loop blocked >= {blocks['threshold_ms']} ms: {blocks['count']} times, "
+            f"worst {blocks['max_ms']:.0f} ms, total {blocks['total_ms']:.0f} ms",
+            "",
+            f"{'Timer':<48}{'Calls':>8}{'Total ms':>11}{'Mean ms':>10}{'Max ms':>10}",
+        ]
+        for name, st in list(snap["timers"].items())[:top]:
+            lines.append(f"{name[:47]:<48}{st['count']:>8}{st['total_ms']:>11.1f}{st['mean_ms']:>10.2f}"
+                         f"{st['max_ms']:>10.2f}")
+        if snap["counters"]:
+            lines += ["", f"{'Counter':<48}{'Value':>8}"]
+            lines += [f"{name[:47]:<48}{value:>8}" for name, value in snap["counters"].items()]
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
@@ -0,0 +1,313 @@
+import json
+import os
+import threading
+
+
+# ---------- Append-only change journal ----------
+# Every mutation is appended as one JSON line next to the snapshot file:
+#
+#   {"seq": 12, "op": "put", "habit": {"id": ..., "name": ..., ...}}
+#   {"seq": 13, "op": "delete", "id": ...}
+#   {"seq": 14, "op": "all", "fields": {"progress": 0.0}}
+#   {"seq": 15, "op": "meta", "progress_increment": 0.2, "categories": [...], "current_day": ...,
+#    "collapsed": [...]}
+#   {"seq": 16, "op": "mark"}
+#
+# Records carry absolute values, and the snapshot remembers the last sequence
+# number folded into it (meta.journal_seq), so replaying a record twice is
+# harmless and a crash between writing the snapshot and trimming the journal
+# loses nothing.
+#
+# Several processes may append to the same journal (under the storage's file
+# lock): before writing, a journal reads what the others appended since its
+# last read or write (kept in `foreign` until the storage merges it), so
+# sequence numbers stay increasing across all of them. A trimmed journal keeps
+# a "mark" record with the highest number for the same reason.
+#
+# `durability` is one of persistence.DURABILITY_MODES: "always" fsyncs every
+# append and every trimmed journal, "close" only the file left on close(),
+# "none" never.
+class HabitJournal:
+    def __init__(self, path, durability="none"):
+        self.path = path
+        self.durability = durability
+        self._lock = threading.Lock()
+        self._file = None
+        self.last_seq = 0
+        self.foreign = []       # records other processes appended, not yet merged (see take_foreign)
+        self.rewritten = False  # another process replaced the file (compaction): reread everything
+        self._offset = 0        # bytes of the file this process has read or written
+        self._ino = None
+        records, self._offset, self._ino = self._read_from(0)
+        for record in records:
+            self.last_seq = max(self.last_seq, record.get("seq", 0))
+
+    # ----- writing -----
+    def _handle(self):
+        if self._file is None or self._file.closed:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def append(self, op, **fields):
+        return self.append_many([dict(fields, op=op)])
+
+    def append_many(self, records):
+        # Write several records with a single write call; returns the last seq
+        with self._lock:
+            if not records:
+                return self.last_seq
+            self._catch_up()
+            lines = []
+            for record in records:
+                self.last_seq += 1
+                lines.append(json.dumps(dict(record, seq=self.last_seq), separators=(",", ":")))
+            payload = "\n".join(lines) + "\n"
+            f = self._handle()
+            f.write(payload)
+            f.flush()
+            self._offset += len(payload.encode("utf-8"))
+            self._ino = os.fstat(f.fileno()).st_ino
+            if self.durability == "always":
+                os.fsync(f.fileno())
+            return self.last_seq
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def discard_through(self, seq):
+        # Drop records already folded into a snapshot (called after the snapshot
+        # has been written). Records appended meanwhile are kept.
+        with self._lock:
+            self._catch_up()
+            keep = [r for r in self.read() if r.get("seq", 0) > seq]
+            if not keep:
+                keep = [{"seq": max(seq, self.last_seq), "op": "mark"}]
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for record in keep:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                f.flush()
+                if self.durability == "always":
+                    os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            st = os.stat(self.path)
+            self._offset, self._ino = st.st_size, st.st_ino
+
+    def remove(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.last_seq = 0
+            self.foreign = []
+            self._offset, self._ino = 0, None
+
+    def close(self):
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._file.flush()
+                if self.durability != "none":
+                    os.fsync(self._file.fileno())
+                self._file.close()
+            self._file = None
+
+    # ----- other processes -----
+    def changed(self):
+        # Cheap check (one stat) whether the file differs from what this process last saw
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return self._ino is not None
+        return st.st_ino != self._ino or st.st_size != self._offset
+
+    def catch_up(self):
+        # Read what other processes appended into `foreign`; returns False (and
+        # sets `rewritten`) if the file was replaced instead, e.g. compacted
+        with self._lock:
+            return self._catch_up()
+
+    def _catch_up(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            st = None
+        if st is None or st.st_ino != self._ino or st.st_size < self._offset:
+            if self._ino is None and st is None:
+                return True
+            # our append handle may point at the replaced file: reopen on the next write
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            records, self._offset, self._ino = self._read_from(0)
+            for record in records:
+                self.last_seq = max(self.last_seq, record.get("seq", 0))
+            self.foreign = []
+            self.rewritten = True
+            return False
+        if st.st_size > self._offset:
+            records, self._offset, _ = self._read_from(self._offset)
+            for record in records:
+                self.last_seq = max(self.last_seq, record.get("seq", 0))
+            self.foreign.extend(records)
+        return True
+
+    def take_foreign(self):
+        with self._lock:
+            records, self.foreign = self.foreign, []
+        return records
+
+    def merged_seq(self):
+        # Highest seq up to which every record is reflected in this process's
+        # store (the journal_seq a snapshot of it may claim)
+        with self._lock:
+            if self.foreign:
+                return min(r.get("seq", 0) for r in self.foreign) - 1
+            return self.last_seq
+
+    # ----- reading / replay -----
+    def _read_from(self, offset):
+        # Complete records from byte `offset` on, the offset after the last
+        # complete line and the file's inode
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return [], 0, None
+        with f:
+            ino = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        records = []
+        for line in chunk[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+        return records, offset + end, ino
+
+    def read(self, after_seq=0):
+        records = []
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except OSError:
+            return records
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # a torn line from a crash mid-append; everything after it is suspect
+                    break
+                if isinstance(record, dict) and record.get("seq", 0) > after_seq:
+                    records.append(record)
+        return records
+
+    def replay(self, data):
+        # Apply journal records newer than the snapshot on top of `data`
+        meta = data.setdefault("meta", {})
+        base_seq = meta.get("journal_seq", 0) if isinstance(meta.get("journal_seq"), int) else 0
+        with self._lock:
+            records, self._offset, self._ino = self._read_from(0)
+            self.foreign = []
+            self.rewritten = False
+            for record in records:
+                self.last_seq = max(self.last_seq, record.get("seq", 0))
+            self.last_seq = max(self.last_seq, base_seq)
+        records = [r for r in records if r.get("seq", 0) > base_seq]
+        if records:
+            apply_records(data, records)
+        return data
+
+
+def apply_records(data, records):
+    meta = data.setdefault("meta", {})
+    habits = {}
+    order = []
+    for entry in data.get("habits", []):
+        if isinstance(entry, dict) and entry.get("id"):
+            habits[entry["id"]] = entry
+            order.append(entry["id"])
+        else:
+            # entries without an id cannot be targeted by the journal; keep as-is
+            key = object()
+            habits[key] = entry
+            order.append(key)
+
+    for record in records:
+        op = record.get("op")
+        if op == "put":
+            habit = record.get("habit") or {}
+            hid = habit.get("id")
+            if not hid:
+                continue
+            if hid not in habits:
+                order.append(hid)
+            habits[hid] = dict(habit)
+            cats = meta.setdefault("categories", [])
+            if habit.get("category") and habit["category"] not in cats:
+                cats.append(habit["category"])
+        elif op == "delete":
+            habits.pop(record.get("id"), None)
+        elif op == "all":
+            fields = record.get("fields") or {}
+            for entry in habits.values():
+                if isinstance(entry, dict):
+                    entry.update(fields)
+        elif op == "meta":
+            for key in ("progress_increment", "categories", "current_day", "collapsed"):
+                if key in record:
+                    meta[key] = record[key]
+
+    seen = set()
+    data["habits"] = []
+    for k in order:
+        if k in habits and k not in seen:
+            seen.add(k)
+            data["habits"].append(habits[k])
+    meta["journal_seq"] = max(meta.get("journal_seq", 0) or 0, records[-1].get("seq", 0))
+    return data
+
+
+def fold_records(records):
+    # The net effect of a run of records, as HabitStore.merge() arguments: the
+    # final state of every habit put, deleted ids, fields set on every habit and
+    # settings. Fields of an "all" record also go into the habits put before it.
+    puts = {}
+    removed = set()
+    fields = {}
+    meta = {}
+    for record in records:
+        op = record.get("op")
+        if op == "put":
+            habit = record.get("habit") or {}
+            if habit.get("id"):
+                puts[habit["id"]] = dict(habit)
+                removed.discard(habit["id"])
+        elif op == "delete":
+            puts.pop(record.get("id"), None)
+            removed.add(record.get("id"))
+        elif op == "all":
+            changed = record.get("fields") or {}
+            fields.update(changed)
+            for entry in puts.values():
+                entry.update(changed)
+        elif op == "meta":
+            for key in ("progress_increment", "categories", "current_day", "collapsed"):
+                if key in record:
+                    meta[key] = record[key]
+    return {"entries": list(puts.values()), "removed": list(removed), "fields": fields, "meta": meta}
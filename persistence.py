@@ -0,0 +1,468 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+
+# ---------- File helpers ----------
+# How hard writes try to survive a crash or power loss:
+#   "always"  fsync every snapshot (and its directory entry) before it replaces the old
+#             one, and every journal append (one disk flush per change, on the Tk thread)
+#   "close"   no fsync while running; the final write and journal on close are fsynced
+#   "none"    never fsync (fastest; the OS decides when data reaches the disk)
+DURABILITY_MODES = ("always", "close", "none")
+
+
+def write_json_file(path, data, fsync=True, keep=0):
+    # Serialize first, write to a temp file and rename it over the target, so a
+    # crash mid-write leaves the previous file intact. With keep > 0 the file
+    # being replaced is kept as path.1 (older ones shift to path.2 .. path.<keep>).
+    payload = json.dumps(data, indent=2)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(payload)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    if keep > 0:
+        rotate_snapshots(path, keep)
+    os.replace(tmp, path)
+    if fsync:
+        fsync_dir(path)
+
+
+def snapshot_path(path, n):
+    return f"{path}.{n}"
+
+
+def rotate_snapshots(path, keep):
+    # Shift path.1 .. path.<keep-1> up by one and hard-link the current file as
+    # path.1 (no data is copied; the rename that follows gives `path` a new
+    # inode and leaves the old contents to the link)
+    if not os.path.exists(path):
+        return
+    for n in range(keep - 1, 0, -1):
+        src = snapshot_path(path, n)
+        if os.path.exists(src):
+            os.replace(src, snapshot_path(path, n + 1))
+    newest = snapshot_path(path, 1)
+    try:
+        if os.path.exists(newest):
+            os.remove(newest)
+        os.link(path, newest)
+    except OSError:
+        # no hard links on this file system: copy instead
+        shutil.copyfile(path, newest)
+
+
+def fsync_dir(path):
+    # Make a rename durable (POSIX only; directories cannot be opened on Windows)
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def file_signature(path):
+    # Cheap "has this file changed" token: a rewrite (new inode), an append
+    # (size) or an in-place edit (mtime) all give a different value
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def fsync_file(path):
+    try:
+        with open(path, "rb") as f:
+            os.fsync(f.fileno())
+    except OSError:
+        pass
+
+
+# ---------- Inter-process lock ----------
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    # Advisory exclusive lock on a side file, shared by every process using the
+    # same data file (the GUI's writes, the command line). It only excludes
+    # other processes: once this process holds it, nested acquires from any of
+    # its threads pass (e.g. the save worker while the main thread holds it).
+    def __init__(self, path, timeout=10.0):
+        self.path = path
+        self.timeout = timeout
+        self._mutex = threading.Lock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self, timeout=None):
+        # timeout: seconds to wait for another process (default self.timeout; 0 = try once)
+        with self._mutex:
+            if self._depth == 0:
+                self._lock_file(self.timeout if timeout is None else timeout)
+            self._depth += 1
+
+    def release(self):
+        with self._mutex:
+            self._depth -= 1
+            if self._depth == 0:
+                self._unlock_file()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def _lock_file(self, timeout):
+        f = open(self.path, "a+")
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                self._file = f
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    f.close()
+                    raise TimeoutError(f"{self.path} is locked by another process")
+                time.sleep(0.02)
+
+    def _unlock_file(self):
+        f, self._file = self._file, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            f.close()
+
+
+# ---------- Streaming reader ----------
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+# bytes that are not valid UTF-8 come out of the "surrogateescape" decoder as U+DC80..U+DCFF
+_UNDECODABLE = re.compile("[\udc80-\udcff]")
+# a parse error this close to the end of the buffer may just be a value cut off by the chunk boundary
+_REFILL_MARGIN = 16
+
+
+class HabitFileReader:
+    # Reads a {"meta": {...}, "habits": [...]} document incrementally: keys
+    # before "habits" (meta) are parsed up front, habit entries one at a time
+    # as habits() is iterated, from a buffer refilled chunk_size characters at
+    # a time. An entry that does not parse is skipped up to the next "{" and
+    # handed to on_bad(raw_text, reason); a truncated tail ends the iteration
+    # the same way. Bytes that are not valid UTF-8 only cost the entry they are
+    # in. `streaming` is False when the document has another layout
+    # (no "habits" array, or "habits" before "meta"); read it with json.load then.
+    def __init__(self, path, on_bad=None, chunk_size=64 * 1024):
+        self.on_bad = on_bad
+        self.chunk_size = chunk_size
+        self.meta = {}
+        self.bad = 0
+        self._f = open(path, "r", encoding="utf-8", errors="surrogateescape")
+        self._buf = ""
+        self._pos = 0
+        self._start = 0            # where the value last returned by _value() began
+        self._undecodable = False  # some chunk held invalid UTF-8
+        try:
+            self.streaming = self._read_header()
+        except Exception:
+            self.close()
+            raise
+        if not self.streaming:
+            self.close()
+
+    def close(self):
+        self._f.close()
+
+    def _fill(self):
+        chunk = self._f.read(self.chunk_size)
+        if not chunk:
+            return False
+        if not self._undecodable and _UNDECODABLE.search(chunk):
+            self._undecodable = True
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"expected {char!r} in {self._f.name}")
+        self._pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                # maybe cut off at the end of the buffer: read more and retry. An
+                # error further in is a damaged value, however much is read after it.
+                if self._cut_off(e) and self._fill():
+                    continue
+                raise
+            if end == len(self._buf) and self._fill():
+                continue
+            self._start = self._pos
+            self._pos = end
+            return value
+
+    def _cut_off(self, error):
+        # an unterminated string always runs into the end of the buffer
+        return error.pos >= len(self._buf) - _REFILL_MARGIN or error.msg.startswith("Unterminated string")
+
+    def _read_header(self):
+        self._expect("{")
+        if self._peek() == "}":
+            return False
+        seen_meta = False
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == "habits":
+                if self._peek() != "[" or not isinstance(self.meta, dict) or not seen_meta:
+                    return False
+                self._pos += 1
+                return True
+            value = self._value()
+            if key == "meta":
+                self.meta = value
+                seen_meta = True
+            sep = self._peek()
+            self._pos += 1
+            if sep != ",":
+                return False
+
+    def _skip_bad(self, reason):
+        # Drop everything up to the next entry; False if nothing is left
+        start = self._pos
+        nxt = self._buf.find("{", start + 1)
+        while nxt < 0 and self._fill():
+            start = 0
+            nxt = self._buf.find("{", 1)
+        end = nxt if nxt >= 0 else len(self._buf)
+        raw = self._buf[start:end].strip().rstrip(",").strip()
+        self._pos = end
+        if raw and raw != "]}":
+            self._reject(raw, reason)
+        return nxt >= 0
+
+    def _reject(self, raw, reason):
+        self.bad += 1
+        if callable(self.on_bad):
+            self.on_bad(raw, reason)
+
+    def habits(self):
+        try:
+            if self._peek() == "]":
+                return
+            while True:
+                try:
+                    entry = self._value()
+                except ValueError as e:
+                    if not self._skip_bad(getattr(e, "msg", str(e))):
+                        return
+                    continue
+                if self._undecodable and _UNDECODABLE.search(self._buf, self._start, self._pos):
+                    self._reject(self._buf[self._start:self._pos], "entry is not valid UTF-8")
+                else:
+                    yield entry
+                sep = self._peek()
+                if sep == ",":
+                    self._pos += 1
+                elif sep == "]":
+                    return
+                elif not self._skip_bad("unexpected text after entry" if sep else "file ends inside the habit list"):
+                    return
+        finally:
+            self.close()
+
+
+# ---------- Debounced background writer ----------
+class SaveScheduler:
+    # Coalesces bursts of "something changed" notifications into one write.
+    #
+    # mark_dirty() is cheap and is called from the Tk thread on every change.
+    # After `quiet_ms` without further changes, snapshot_fn() is called (still
+    # on the Tk thread, so it may read widgets) and the resulting data is handed
+    # to a worker thread which serializes it and calls write_fn(data).
+    #
+    # `after` / `after_cancel` are the Tk timer functions of the owning widget.
+    # When they are None there is no timer and data is only written on flush().
+    def __init__(self, snapshot_fn, write_fn, quiet_ms=500, after=None, after_cancel=None, on_error=None):
+        self.snapshot_fn = snapshot_fn
+        self.write_fn = write_fn
+        self.quiet_ms = quiet_ms
+        self._after = after
+        self._after_cancel = after_cancel
+        self.on_error = on_error
+
+        self._timer = None
+        self._dirty = False
+        self._held = 0
+
+        # worker state (guarded by _cond)
+        self._cond = threading.Condition()
+        self._pending = None
+        self._has_pending = False
+        self._busy = False
+        self._closed = False
+        self._errors = []
+
+        # statistics
+        self.requests = 0
+        self.snapshots = 0
+        self.writes = 0
+        self.last_write_seconds = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="habit-save-writer", daemon=True)
+        self._worker.start()
+
+    # ----- Tk thread API -----
+    def mark_dirty(self):
+        self.requests += 1
+        self._dirty = True
+        self._report_errors()
+        if self._after is None or self._held:
+            return
+        self._cancel_timer()
+        self._timer = self._after(self.quiet_ms, self._on_quiet)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            try:
+                self._after_cancel(self._timer)
+            except Exception:
+                pass
+            self._timer = None
+
+    @contextmanager
+    def hold(self):
+        # Suspend the debounce timer (one already armed is cancelled); one write
+        # is scheduled when the hold ends
+        self._held += 1
+        self._cancel_timer()
+        try:
+            yield
+        finally:
+            self._held -= 1
+            if not self._held and self._dirty:
+                self.requests -= 1
+                self.mark_dirty()
+
+    def _on_quiet(self):
+        self._timer = None
+        self._submit_snapshot()
+        self._report_errors()
+
+    def _submit_snapshot(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = self.snapshot_fn()
+        self.snapshots += 1
+        with self._cond:
+            if self._closed:
+                return
+            # A snapshot that has not been written yet is simply replaced
+            self._pending = data
+            self._has_pending = True
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        # Write any outstanding change now and wait for the worker to finish
+        self._cancel_timer()
+        self._submit_snapshot()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._has_pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        self._report_errors()
+
+    def close(self, timeout=10.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+
+    @property
+    def coalesced(self):
+        # change notifications that did not cause a write of their own
+        return max(0, self.requests - self.writes)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "snapshots": self.snapshots,
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "last_write_ms": round(self.last_write_seconds * 1000, 2),
+        }
+
+    def _report_errors(self):
+        with self._cond:
+            errors, self._errors = self._errors, []
+        if errors and callable(self.on_error):
+            self.on_error(errors[-1])
+
+    # ----- worker thread -----
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._has_pending and not self._closed:
+                    self._cond.wait()
+                if not self._has_pending and self._closed:
+                    return
+                data = self._pending
+                self._pending = None
+                self._has_pending = False
+                self._busy = True
+            started = time.perf_counter()
+            try:
+                self.write_fn(data)
+            except Exception as e:
+                with self._cond:
+                    self._errors.append(e)
+            finally:
+                with self._cond:
+                    self.writes += 1
+                    self.last_write_seconds = time.perf_counter() - started
+                    self._busy = False
+                    self._cond.notify_all()
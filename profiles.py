@@ -0,0 +1,78 @@
+import json
+import os
+import re
+
+from persistence import write_json_file
+
+# ---------- Profiles ----------
+# A profile is one person's habit set with its own data files. The default
+# profile uses the files next to the app as before (habits.json,
+# habits.journal, habits.db, history/); every other profile has a directory
+# <root>/<name>/ holding files of the same names. Profiles are the
+# directories, so one created by another window or by the command line shows
+# up without further bookkeeping; <root>/profiles.json only remembers the
+# profile the app had open last.
+DEFAULT_PROFILE = "Default"
+STATE_FILE = "profiles.json"
+
+# letters, digits, spaces and . - _ (no path separators, no leading dot)
+NAME_PATTERN = re.compile(r"\w[\w .-]{0,39}")
+
+
+class ProfileError(ValueError):
+    pass
+
+
+class ProfileManager:
+    def __init__(self, root, base_dir=""):
+        self.root = root
+        self.base_dir = base_dir
+
+    def check_name(self, name):
+        name = (name or "").strip()
+        if not NAME_PATTERN.fullmatch(name):
+            raise ProfileError(f"{name!r} is not a usable profile name "
+                               f"(letters, digits, spaces, '.', '-' and '_'; at most 40)")
+        return name
+
+    def names(self):
+        # the default profile first, then the others alphabetically
+        try:
+            entries = os.listdir(self.root)
+        except OSError:
+            entries = []
+        others = [n for n in entries
+                  if n != DEFAULT_PROFILE and NAME_PATTERN.fullmatch(n) and os.path.isdir(os.path.join(self.root, n))]
+        return [DEFAULT_PROFILE] + sorted(others, key=str.casefold)
+
+    def exists(self, name):
+        return name == DEFAULT_PROFILE or (NAME_PATTERN.fullmatch(name or "") is not None
+                                           and os.path.isdir(os.path.join(self.root, name)))
+
+    def directory(self, name):
+        return self.base_dir if name == DEFAULT_PROFILE else os.path.join(self.root, name)
+
+    def path(self, name, filename):
+        # where profile `name` keeps `filename` (e.g. "habits.json")
+        return os.path.join(self.directory(name), filename)
+
+    def create(self, name):
+        name = self.check_name(name)
+        # names differing only in case would share a directory on some filesystems
+        if name.casefold() in {n.casefold() for n in self.names()}:
+            raise ProfileError(f"a profile named {name!r} already exists")
+        os.makedirs(self.directory(name))
+        return name
+
+    # ----- last used -----
+    def last_used(self):
+        try:
+            with open(os.path.join(self.root, STATE_FILE), "r", encoding="utf-8") as f:
+                name = json.load(f).get("active")
+        except (OSError, ValueError, AttributeError):
+            return DEFAULT_PROFILE
+        return name if isinstance(name, str) and self.exists(name) else DEFAULT_PROFILE
+
+    def set_last_used(self, name):
+        os.makedirs(self.root, exist_ok=True)
+        write_json_file(os.path.join(self.root, STATE_FILE), {"active": name}, fsync=False)
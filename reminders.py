@@ -0,0 +1,160 @@
+import heapq
+import itertools
+import time
+
+from history import COMPLETE
+
+# ---------- Reminders ----------
+# A habit with a reminder interval (Habit.reminder, minutes) is reminded every
+# interval while its progress is below COMPLETE. All reminders share one heap of
+# next-fire times and one pending `after` timer for the earliest of them:
+# adding, editing or deleting a habit pushes a new heap entry (O(log n)) and
+# orphans the old one, which is dropped when it reaches the top (lazy deletion).
+
+
+class ReminderQueue:
+    def __init__(self):
+        self._heap = []       # [due time, tie-breaker, habit id or None once orphaned]
+        self._entries = {}    # habit id -> its live heap entry
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, habit_id):
+        return habit_id in self._entries
+
+    def due_time(self, habit_id):
+        entry = self._entries.get(habit_id)
+        return entry[0] if entry is not None else None
+
+    def push(self, habit_id, due):
+        self.discard(habit_id)
+        entry = [due, next(self._seq), habit_id]
+        self._entries[habit_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def discard(self, habit_id):
+        entry = self._entries.pop(habit_id, None)
+        if entry is None:
+            return
+        entry[2] = None
+        # rebuild once orphans clearly outnumber live entries
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+
+    def clear(self):
+        self._heap = []
+        self._entries = {}
+
+    def peek(self):
+        # earliest live due time, or None
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now):
+        # ids of every habit due at or before `now`, earliest first
+        due = []
+        while True:
+            first = self.peek()
+            if first is None or first > now:
+                return due
+            entry = heapq.heappop(self._heap)
+            del self._entries[entry[2]]
+            due.append(entry[2])
+
+
+class HabitReminders:
+    # Keeps a ReminderQueue in line with a HabitStore and calls on_due(habits)
+    # with every habit whose reminder is due. `after` / `after_cancel` are the
+    # Tk timer functions of the owning widget; the timer is only re-armed when
+    # the earliest due time changes.
+    def __init__(self, after, after_cancel, on_due, clock=time.time):
+        self._after = after
+        self._after_cancel = after_cancel
+        self.on_due = on_due
+        self.clock = clock
+        self.queue = ReminderQueue()
+        self.store = None
+        self._timer = None
+        self._armed_for = None
+        self.fired = 0
+
+    def attach(self, store):
+        self.store = store
+        self._seed()
+        store.subscribe(self._on_store_event)
+        self._arm()
+
+    def _seed(self):
+        self.queue.clear()
+        for habit in self.store:
+            self._schedule(habit)
+
+    def _schedule(self, habit, restart=False):
+        # queue the habit's next reminder (keeping one already queued unless
+        # `restart`), or drop it when it has none or is complete
+        if not habit.reminder or habit.progress >= COMPLETE:
+            self.queue.discard(habit.habit_id)
+        elif restart or habit.habit_id not in self.queue:
+            self.queue.push(habit.habit_id, self.clock() + habit.reminder * 60)
+
+    def _on_store_event(self, event, habit, changes):
+        events = changes if event in ("batch", "merge") else [(event, habit, changes)]
+        for event, habit, changes in events:
+            if event == "reload":
+                self._seed()
+            elif event == "load":
+                for loaded in changes:
+                    self._schedule(loaded)
+            elif event == "add":
+                self._schedule(habit)
+            elif event == "remove":
+                self.queue.discard(habit.habit_id)
+            elif event == "update" and ("reminder" in changes or "progress" in changes):
+                self._schedule(habit, restart="reminder" in changes)
+            elif event == "all" and "progress" in changes:
+                for each in self.store:
+                    if each.reminder:
+                        self._schedule(each)
+        self._arm()
+
+    # ----- timer -----
+    def _arm(self):
+        first = self.queue.peek()
+        if first == self._armed_for:
+            return
+        self.cancel()
+        if first is None or self._after is None:
+            return
+        delay_ms = max(0, int((first - self.clock()) * 1000)) + 1
+        self._timer = self._after(delay_ms, self._fire)
+        self._armed_for = first
+
+    def cancel(self):
+        if self._timer is not None:
+            try:
+                self._after_cancel(self._timer)
+            except Exception:
+                pass
+        self._timer = None
+        self._armed_for = None
+
+    def _fire(self):
+        self._timer = None
+        self._armed_for = None
+        now = self.clock()
+        due = []
+        for habit_id in self.queue.pop_due(now):
+            habit = self.store.get(habit_id)
+            if habit is None or not habit.reminder or habit.progress >= COMPLETE:
+                continue
+            due.append(habit)
+            self.queue.push(habit_id, now + habit.reminder * 60)
+        self._arm()
+        if due:
+            self.fired += len(due)
+            self.on_due(due)
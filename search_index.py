@@ -0,0 +1,148 @@
+import re
+
+from history import COMPLETE
+
+# ---------- Search / filter index ----------
+# In-memory index over a HabitStore, kept up to date from store events:
+#   - trigrams of each lowercased name -> habit ids (substring search for
+#     query words of 3+ characters, verified against the name afterwards)
+#   - the first one and two characters of every word of each name -> habit
+#     ids (prefix search for shorter query words)
+# Category and progress facets are checked on the live records, so they need
+# no upkeep. Results come back in store order.
+WORD_RE = re.compile(r"\w+")
+
+# progress facets offered by the dashboard
+PROGRESS_FACETS = {
+    "Any progress": None,
+    "Not started": (0.0, 0.0),
+    "In progress": (1e-9, COMPLETE - 1e-9),
+    "Done": (COMPLETE, 1.0),
+}
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def word_prefixes(text):
+    return {word[:n] for word in WORD_RE.findall(text) for n in (1, 2)}
+
+
+class HabitIndex:
+    def __init__(self, store=None):
+        self.store = None
+        self._names = {}      # habit id -> lowercased name the habit is indexed under
+        self._order = {}      # habit id -> position in the store (for result order)
+        self._next_order = 0
+        self._trigrams = {}   # trigram -> set of habit ids
+        self._prefixes = {}   # 1-2 character word prefix -> set of habit ids
+        if store is not None:
+            self.attach(store)
+
+    def attach(self, store):
+        self.store = store
+        self.rebuild()
+        store.subscribe(self._on_store_event)
+
+    def __len__(self):
+        return len(self._names)
+
+    # ----- upkeep -----
+    def rebuild(self):
+        self._names.clear()
+        self._order.clear()
+        self._trigrams.clear()
+        self._prefixes.clear()
+        self._next_order = 0
+        for habit in self.store:
+            name = habit.name.lower()
+            self._names[habit.habit_id] = name
+            self._order[habit.habit_id] = self._next_order
+            self._next_order += 1
+            self._index_name(habit.habit_id, name)
+
+    def _add(self, habit):
+        if habit.habit_id in self._names:
+            self._remove(habit.habit_id)
+        else:
+            self._order[habit.habit_id] = self._next_order
+            self._next_order += 1
+        name = habit.name.lower()
+        self._names[habit.habit_id] = name
+        self._index_name(habit.habit_id, name)
+
+    def _index_name(self, habit_id, name):
+        for tri in trigrams(name):
+            self._trigrams.setdefault(tri, set()).add(habit_id)
+        for prefix in word_prefixes(name):
+            self._prefixes.setdefault(prefix, set()).add(habit_id)
+
+    def _remove(self, habit_id, forget=False):
+        name = self._names.pop(habit_id, None)
+        if forget:
+            self._order.pop(habit_id, None)
+        if name is None:
+            return
+        for table, keys in ((self._trigrams, trigrams(name)), (self._prefixes, word_prefixes(name))):
+            for key in keys:
+                ids = table.get(key)
+                if ids is not None:
+                    ids.discard(habit_id)
+                    if not ids:
+                        del table[key]
+
+    def _on_store_event(self, event, habit, changes):
+        events = changes if event in ("batch", "merge") else [(event, habit, changes)]
+        for event, habit, changes in events:
+            if event == "reload":
+                self.rebuild()
+            elif event == "add" or (event == "update" and "name" in changes):
+                self._add(habit)
+            elif event == "load":
+                for loaded in changes:
+                    self._add(loaded)
+            elif event == "remove":
+                self._remove(habit.habit_id, forget=True)
+
+    # ----- queries -----
+    def _substring(self, part):
+        sets = sorted((self._trigrams.get(tri, ()) for tri in trigrams(part)), key=len)
+        if not sets or not sets[0]:
+            return set()
+        ids = set(sets[0])
+        for other in sets[1:]:
+            ids &= other
+            if not ids:
+                return ids
+        # trigrams may come from different places in the name: confirm the substring
+        return {hid for hid in ids if part in self._names[hid]}
+
+    def search(self, text="", category=None, progress=None, limit=None):
+        # Habits whose name contains every query word (words shorter than three
+        # characters match the start of a word), in the given category and with
+        # progress within the (low, high) range
+        store = self.store
+        ids = None
+        for part in text.lower().split():
+            found = self._substring(part) if len(part) >= 3 else self._prefixes.get(part, set())
+            ids = found if ids is None else ids & found
+            if not ids:
+                return []
+
+        if ids is None:
+            habits = store.by_category(category) if category is not None else list(store)
+        elif len(ids) * 4 > len(store):
+            # broad match: a pass over the store is cheaper than sorting the ids
+            habits = [h for h in store if h.habit_id in ids]
+            if category is not None:
+                habits = [h for h in habits if h.category == category]
+        else:
+            habits = [store.get(hid) for hid in sorted(ids, key=self._order.__getitem__)]
+            if category is not None:
+                habits = [h for h in habits if h is not None and h.category == category]
+        if progress is not None:
+            low, high = progress
+            habits = [h for h in habits if h is not None and low <= h.progress <= high]
+        habits = [h for h in habits if h is not None]
+        return habits[:limit] if limit is not None else habits
@@ -0,0 +1,592 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from journal import HabitJournal, fold_records
+from persistence import (DURABILITY_MODES, FileLock, HabitFileReader, SaveScheduler, file_signature, fsync_dir,
+                         fsync_file, snapshot_path, write_json_file)
+
+
+# ---------- Storage interface ----------
+class Storage:
+    # A backend persists one HabitStore. The app calls load() once, feeds the
+    # result to HabitStore.load(), then attach()es the backend so every store
+    # event is persisted. save() requests a write of the store (at most what
+    # changed), write_all() replaces the persisted data with it, flush() makes
+    # everything durable now, close() flushes and releases resources.
+    location = ""
+
+    # set by load() when the loaded data should be rewritten once (e.g. ids were added);
+    # with a streamed habit list it is only final once the list has been consumed
+    needs_rewrite = False
+
+    # records moved to the quarantine file (see quarantine())
+    quarantined = 0
+
+    # set by load() when the data file was unreadable and an older snapshot was used
+    recovered_from = None
+
+    # held around changes to the files by any process (SQLite locks by itself)
+    lock = contextlib.nullcontext()
+
+    def load(self):
+        # Returns {"meta": {...}, "habits": iterable of dicts} or None if there is no data yet
+        raise NotImplementedError
+
+    def attach(self, store):
+        self.store = store
+        self._unsubscribe = store.subscribe(self._on_store_event)
+
+    def detach(self):
+        # Stop persisting the store's events and merging into it (after close(),
+        # before the store is loaded with another profile's habits; or when the
+        # files could not be read and must not be saved over)
+        self._unsubscribe()
+        self.store = None
+
+    def _on_store_event(self, event, habit, changes):
+        raise NotImplementedError
+
+    def save(self):
+        raise NotImplementedError
+
+    def write_all(self):
+        # Replace everything persisted with the store's contents (sample data,
+        # migration); save() may only write what changed
+        self.save()
+
+    def hold(self):
+        # Context manager deferring background writes (see HabitTrackerApp.batch)
+        return contextlib.nullcontext()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def reset(self):
+        # Throw away all persisted data (used after an unreadable file)
+        raise NotImplementedError
+
+    def sync(self, timeout=0):
+        # Merge changes another process (a second window, cli.py) made to the
+        # persisted data into the store; polled from the Tk thread. Returns the
+        # store's list of merged changes (empty if nothing changed, or if the
+        # files stayed locked for `timeout` seconds; the next poll retries).
+        return []
+
+    def stats(self):
+        return {}
+
+    @property
+    def quarantine_path(self):
+        return self.location + ".quarantine"
+
+    def quarantine(self, entry, reason):
+        # Keep a record that could not be loaded in a side file (one JSON line
+        # each) instead of dropping it or refusing the whole file
+        line = json.dumps({"quarantined_at": datetime.datetime.utcnow().isoformat(), "reason": str(reason),
+                           "source": self.location, "entry": entry}, default=str)
+        with open(self.quarantine_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self.quarantined += 1
+
+
+def _events(event, habit, changes):
+    return changes if event == "batch" else [(event, habit, changes)]
+
+
+# ---------- JSON file (+ optional journal) ----------
+class JsonStorage(Storage):
+    # The original habits.json format. With a journal, mutations are appended to
+    # journal_path and folded into the snapshot in the background once the
+    # journal grows past compact_bytes; without one every change schedules a
+    # debounced full rewrite. Each write keeps the previous `snapshots` versions
+    # (path.1 newest .. path.N) for load() to fall back on; `durability` is one
+    # of persistence.DURABILITY_MODES.
+    def __init__(self, path, journal_path=None, compact_bytes=256 * 1024, quiet_ms=750, after=None,
+                 after_cancel=None, on_error=None, snapshots=3, durability="close"):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}, not {durability!r}")
+        self.path = path
+        self.location = path
+        self.compact_bytes = compact_bytes
+        self.on_error = on_error
+        self.snapshots = snapshots
+        self.durability = durability
+        self.store = None
+        self.journal = HabitJournal(journal_path, durability=durability) if journal_path else None
+        # held while the files change, so other processes (cli.py) never see half an update
+        self.lock = FileLock(path + ".lock")
+        # what this process last read or wrote, to tell other processes' changes from its own
+        # (guarded by _sync_lock: the writer thread updates it too)
+        self._sync_lock = threading.Lock()
+        self._file_sig = None
+        self._base = {}        # without a journal: habit id -> entry as last read or written
+        self._resave = False   # a write was skipped because another process had changed the file
+        self.scheduler = SaveScheduler(self._snapshot_data, self._write_data, quiet_ms=quiet_ms, after=after,
+                                       after_cancel=after_cancel, on_error=on_error)
+
+    def load(self):
+        # Habit entries are parsed lazily as the returned "habits" iterator is
+        # consumed (unless journal records have to be replayed on top); entries
+        # that do not parse go to the quarantine file
+        # If the data file is missing or unreadable, the newest readable snapshot
+        # is used instead (recovered_from) and the damaged file is set aside.
+        self.needs_rewrite = False
+        self.recovered_from = None
+        self._file_sig = file_signature(self.path)
+        self._base = {}
+        data = None
+        first_error = None
+        candidates = [self.path] + [snapshot_path(self.path, n) for n in range(1, self.snapshots + 1)]
+        for candidate in candidates:
+            if not os.path.exists(candidate):
+                continue
+            try:
+                data = self._read_file(candidate)
+            except ValueError as e:
+                first_error = first_error or e
+                continue
+            if candidate != self.path:
+                self.recovered_from = candidate
+                self.needs_rewrite = True
+                if os.path.exists(self.path):
+                    os.replace(self.path, self.path + ".corrupt")
+            break
+        if self.recovered_from:
+            self._file_sig = None
+        if data is None:
+            if first_error is not None:
+                raise first_error
+            # (a trimmed journal only holds a "mark" record)
+            if self.journal is None or all(r.get("op") == "mark" for r in self.journal.read()):
+                return None
+            data = {"meta": {}, "habits": []}
+        if self.journal is not None:
+            data = self.journal.replay(data)
+        data["habits"] = self._check_ids(data.get("habits", []))
+        return data
+
+    def _read_file(self, path):
+        # Raises ValueError if not even the document header can be parsed
+        reader = HabitFileReader(path, on_bad=lambda raw, reason: self.quarantine(raw, reason))
+        if reader.streaming:
+            return {"meta": reader.meta, "habits": reader.habits()}
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{path} does not hold a habits document")
+        return data
+
+    def _check_ids(self, entries):
+        # Older files have no habit ids; they must be written out once so journal records can refer to them
+        for entry in entries:
+            if isinstance(entry, dict) and not entry.get("id"):
+                self.needs_rewrite = True
+            elif self.journal is None and isinstance(entry, dict):
+                self._base[entry["id"]] = entry
+            yield entry
+
+    def _on_store_event(self, event, habit, changes):
+        # Turn store events into journal records (or a full save without a journal)
+        events = _events(event, habit, changes)
+        if all(e in ("reload", "load", "merge") for e, _, _ in events):
+            return
+        if self.journal is None:
+            self.save()
+            return
+
+        records = []
+        touched = {}
+        for event, habit, changes in events:
+            if event in ("add", "update"):
+                touched[habit.habit_id] = habit
+            elif event == "remove":
+                records.append({"op": "delete", "id": habit.habit_id})
+            elif event == "all":
+                records.append({"op": "all", "fields": changes})
+            elif event == "settings":
+                records.append({"op": "meta", "progress_increment": self.store.progress_increment,
+                                "categories": list(self.store.categories),
+                                "current_day": self.store.current_day,
+                                "collapsed": sorted(self.store.collapsed)})
+        # one put per habit with its final state, after the ops it may have followed
+        for habit_id, habit in touched.items():
+            if habit_id in self.store:
+                records.append({"op": "put", "habit": habit.to_dict()})
+        self._journal_records(records)
+
+    def _journal_records(self, records):
+        try:
+            with self.lock:
+                self.journal.append_many(records)
+        except Exception as e:
+            if callable(self.on_error):
+                self.on_error(e)
+            return
+        # Fold the journal into a fresh snapshot in the background once it is big
+        if self.journal.size() > self.compact_bytes:
+            self.save()
+
+    def hold(self):
+        return self.scheduler.hold()
+
+    def save(self):
+        # Cheap: the scheduler merges bursts of changes into one background write
+        self.scheduler.mark_dirty()
+
+    def flush(self):
+        if self.needs_rewrite:
+            self.scheduler.mark_dirty()
+            self.needs_rewrite = False
+        self.scheduler.flush()
+
+    def close(self):
+        # pick up other processes' changes first, or the final write would be skipped
+        self.sync(timeout=self.lock.timeout)
+        self.scheduler.close()
+        if self.journal is not None:
+            self.journal.close()
+        if self.durability == "close" and os.path.exists(self.path):
+            fsync_file(self.path)
+            fsync_dir(self.path)
+
+    def reset(self):
+        # Start over without destroying anything: the unreadable file and
+        # snapshots are renamed to *.corrupt, the journal is dropped
+        for candidate in [self.path] + [snapshot_path(self.path, n) for n in range(1, self.snapshots + 1)]:
+            try:
+                os.replace(candidate, candidate + ".corrupt")
+            except OSError:
+                pass
+        if self.journal is not None:
+            self.journal.remove()
+
+    def stats(self):
+        return self.scheduler.stats()
+
+    # ----- other processes -----
+    def sync(self, timeout=0):
+        if self.store is None:
+            return []
+        # two stat() calls when nothing changed (records read while appending are still to merge)
+        if file_signature(self.path) == self._file_sig and (
+                self.journal is None or not (self.journal.foreign or self.journal.changed())):
+            return []
+        try:
+            self.lock.acquire(timeout)
+        except TimeoutError:
+            return []
+        try:
+            if not self._sync_lock.acquire(timeout=timeout):
+                return []
+            try:
+                patch = self._read_changes()
+            finally:
+                self._sync_lock.release()
+        finally:
+            self.lock.release()
+        changes = self.store.merge(on_invalid=self.quarantine, **patch) if patch else []
+        if self._resave:
+            self._resave = False
+            self.save()
+        return changes
+
+    def _read_changes(self):
+        # What changed on disk since this process last read or wrote, as
+        # HabitStore.merge() arguments (None: nothing)
+        rewritten = file_signature(self.path) != self._file_sig
+        if self.journal is not None and self.journal.catch_up() and not rewritten:
+            records = self.journal.take_foreign()
+            return fold_records(records) if records else None
+
+        # the data file was replaced (another process saved or compacted): read all of it
+        self._file_sig = file_signature(self.path)
+        try:
+            data = self._read_file(self.path) if self._file_sig is not None else {"meta": {}, "habits": []}
+            entries = [e for e in data.get("habits", []) if isinstance(e, dict) and e.get("id")]
+        except (OSError, ValueError):
+            return None
+        meta = data.get("meta") or {}
+        if self.journal is not None:
+            data = self.journal.replay({"meta": meta, "habits": entries})
+            ids = {e["id"] for e in data["habits"]}
+            return {"entries": data["habits"], "meta": meta,
+                    "removed": [h.habit_id for h in self.store if h.habit_id not in ids]}
+        # no journal: only what differs from the version this process last saw,
+        # so its own unsaved changes to other habits survive
+        base, self._base = self._base, {e["id"]: e for e in entries}
+        return {"entries": [e for e in entries if base.get(e["id"]) != e], "meta": meta,
+                "removed": [hid for hid in base if hid not in self._base]}
+
+    def _snapshot_data(self):
+        # Built from the store on the Tk thread; no widget access needed
+        data = self.store.to_data()
+        data["meta"]["saved_at"] = datetime.datetime.utcnow().isoformat()
+        if self.journal is not None:
+            data["meta"]["journal_seq"] = self.journal.merged_seq()
+        return data
+
+    def _write_data(self, data):
+        # Runs on the writer thread
+        with self.lock, self._sync_lock:
+            if file_signature(self.path) != self._file_sig:
+                # another process replaced the file since this one read it: writing
+                # now would drop its changes, so sync() merges them and saves again
+                self._resave = True
+                return
+            write_json_file(self.path, data, fsync=self.durability == "always", keep=self.snapshots)
+            self._file_sig = file_signature(self.path)
+            if self.journal is not None:
+                self.journal.discard_through(data["meta"].get("journal_seq", 0))
+            else:
+                self._base = {e["id"]: e for e in data["habits"]}
+
+
+# ---------- SQLite ----------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS habits (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    increment REAL NOT NULL,
+    position INTEGER NOT NULL,
+    reminder INTEGER
+);
+CREATE INDEX IF NOT EXISTS habits_category ON habits (category, position);
+CREATE INDEX IF NOT EXISTS habits_name ON habits (name);
+CREATE INDEX IF NOT EXISTS habits_position ON habits (position);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+HABIT_COLUMNS = {"name": "name", "category": "category", "progress": "progress", "increment": "increment",
+                 "reminder": "reminder"}
+
+
+class SqliteStorage(Storage):
+    # One row per habit; every card action becomes a single-row UPDATE committed
+    # in WAL mode, and load() streams rows from a cursor instead of parsing one blob.
+    SYNCHRONOUS = {"always": "FULL", "close": "NORMAL", "none": "OFF"}
+
+    def __init__(self, path, on_error=None, chunk_size=500, durability="close"):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}, not {durability!r}")
+        self.path = path
+        self.location = path
+        self.on_error = on_error
+        self.chunk_size = chunk_size
+        self.store = None
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL in WAL mode only syncs at checkpoints (one happens on close)
+        self.conn.execute(f"PRAGMA synchronous={self.SYNCHRONOUS[durability]}")
+        self.conn.executescript(SCHEMA)
+        # databases created before reminders existed
+        if "reminder" not in {row[1] for row in self.conn.execute("PRAGMA table_info(habits)")}:
+            self.conn.execute("ALTER TABLE habits ADD COLUMN reminder INTEGER")
+        self.conn.commit()
+        self.statements = 0
+        self._data_version = None
+
+    # ----- reading -----
+    def _settings(self):
+        meta = {}
+        for key, value in self.conn.execute("SELECT key, value FROM settings"):
+            try:
+                meta[key] = json.loads(value)
+            except ValueError:
+                pass
+        return meta
+
+    def iter_habits(self, category=None, name_prefix=None):
+        # Stream habit dicts in insertion order, optionally narrowed via the indexes
+        sql = "SELECT id, name, category, progress, increment, reminder FROM habits"
+        where, params = [], []
+        if category is not None:
+            where.append("category = ?")
+            params.append(category)
+        if name_prefix:
+            where.append("name >= ? AND name < ?")
+            params.extend([name_prefix, name_prefix + "\U0010ffff"])
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY position"
+        cursor = self.conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                return
+            for hid, name, cat, progress, increment, reminder in rows:
+                entry = {"id": hid, "name": name, "category": cat, "progress": progress, "increment": increment}
+                if reminder:
+                    entry["reminder"] = reminder
+                yield entry
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM habits").fetchone()[0]
+
+    def load(self):
+        self._data_version = self._version()
+        meta = self._settings()
+        if not meta and not self.count():
+            return None
+        return {"meta": meta, "habits": self.iter_habits()}
+
+    # ----- writing -----
+    def _execute(self, sql, params=()):
+        self.conn.execute(sql, params)
+        self.statements += 1
+
+    def _put(self, habit):
+        # The position is taken inside the write transaction, so habits added
+        # by two processes at once still get distinct positions
+        self._execute(
+            "INSERT INTO habits (id, name, category, progress, increment, position, reminder) "
+            "VALUES (?, ?, ?, ?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM habits), ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, category = excluded.category, "
+            "progress = excluded.progress, increment = excluded.increment, reminder = excluded.reminder",
+            (habit.habit_id, habit.name, habit.category, habit.progress, habit.increment, habit.reminder))
+
+    def _write_settings(self):
+        for key, value in (("progress_increment", self.store.progress_increment),
+                           ("categories", list(self.store.categories)),
+                           ("current_day", self.store.current_day),
+                           ("collapsed", sorted(self.store.collapsed))):
+            self._execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _on_store_event(self, event, habit, changes):
+        try:
+            with self.conn:
+                for event, habit, changes in _events(event, habit, changes):
+                    if event == "add":
+                        self._put(habit)
+                    elif event == "update":
+                        columns = [c for c in changes if c in HABIT_COLUMNS]
+                        if columns:
+                            assignments = ", ".join(f"{HABIT_COLUMNS[c]} = ?" for c in columns)
+                            self._execute(f"UPDATE habits SET {assignments} WHERE id = ?",
+                                          [changes[c] for c in columns] + [habit.habit_id])
+                    elif event == "remove":
+                        self._execute("DELETE FROM habits WHERE id = ?", (habit.habit_id,))
+                    elif event == "all":
+                        columns = [c for c in changes if c in HABIT_COLUMNS]
+                        if columns:
+                            assignments = ", ".join(f"{HABIT_COLUMNS[c]} = ?" for c in columns)
+                            self._execute(f"UPDATE habits SET {assignments}", [changes[c] for c in columns])
+                    elif event == "settings":
+                        self._write_settings()
+        except sqlite3.Error as e:
+            if callable(self.on_error):
+                self.on_error(e)
+
+    def save(self):
+        # Every change is already a row update of its own: just commit. (A full
+        # rewrite would renumber positions and delete rows another process added
+        # since the last sync().)
+        self.flush()
+
+    def write_all(self):
+        # Replace the table with the whole store (freshly created sample data, migration)
+        try:
+            with self.conn:
+                self._execute("DELETE FROM habits")
+                for habit in self.store:
+                    self._put(habit)
+                self._write_settings()
+        except sqlite3.Error as e:
+            if callable(self.on_error):
+                self.on_error(e)
+
+    def flush(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def reset(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM habits")
+            self.conn.execute("DELETE FROM settings")
+
+    def stats(self):
+        return {"statements": self.statements}
+
+    # ----- other processes -----
+    def _version(self):
+        # changes whenever another connection commits to the database
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def sync(self, timeout=0):
+        if self.store is None:
+            return []
+        try:
+            version = self._version()
+        except sqlite3.Error:
+            return []
+        if version == self._data_version:
+            return []
+        self._data_version = version
+        entries = list(self.iter_habits())
+        ids = {e["id"] for e in entries}
+        return self.store.merge(entries, removed=[h.habit_id for h in self.store if h.habit_id not in ids],
+                                meta=self._settings(), on_invalid=self.quarantine)
+
+
+def open_storage(backend, json_path, journal_path=None, sqlite_path=None, **kwargs):
+    if backend == "sqlite":
+        return SqliteStorage(sqlite_path, on_error=kwargs.get("on_error"),
+                             durability=kwargs.get("durability", "close"))
+    return JsonStorage(json_path, journal_path=journal_path, **kwargs)
+
+
+# ---------- Migration ----------
+def migrate_json_to_sqlite(json_path, db_path, journal_path=None):
+    # Import habits.json (plus any pending journal records) into a SQLite database
+    from habit_store import HabitStore
+
+    source = JsonStorage(json_path, journal_path=journal_path)
+    try:
+        data = source.load()
+    finally:
+        source.scheduler.close()
+    if data is None:
+        raise FileNotFoundError(json_path)
+
+    store = HabitStore()
+    store.load(data)
+    target = SqliteStorage(db_path)
+    target.store = store
+    target.write_all()
+    target.close()
+    return len(store)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Habit storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="import a habits.json file into a SQLite database")
+    migrate.add_argument("json_path")
+    migrate.add_argument("db_path")
+    migrate.add_argument("--journal", default=None, help="journal file to replay on top of the JSON snapshot")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        count = migrate_json_to_sqlite(args.json_path, args.db_path, journal_path=args.journal)
+        print(f"Imported {count} habits into {args.db_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import datetime
+import random
+
+import pytest
+
+from analytics import HabitAnalytics
+from habit_store import Habit
+from history import COMPLETE, HabitHistory, day_date, day_number
+
+TODAY = day_number(datetime.date(2026, 3, 10))
+
+
+def fill(history, habit_id, values, today=TODAY):
+    # values[i] is the progress of day today - len(values) + 1 + i
+    for i, value in enumerate(values):
+        if value:
+            when = datetime.datetime.combine(day_date(today - len(values) + 1 + i), datetime.time(12))
+            history.record(habit_id, value, when=when)
+
+
+def random_rows(count, days, seed=7):
+    rng = random.Random(seed)
+    return [[rng.choice((0.0, 0.5, COMPLETE, 1.0)) for _ in range(days)] for _ in range(count)]
+
+
+def test_python_kernel_matches_history_streaks(tmp_path):
+    history = HabitHistory(str(tmp_path))
+    habits = [Habit(f"H{i}", habit_id=f"h{i}") for i in range(20)]
+    for habit, values in zip(habits, random_rows(20, 40)):
+        fill(history, habit.habit_id, values)
+    stats = HabitAnalytics(history, window=40, use_numpy=False).habit_stats(habits, today=TODAY)
+    for habit in habits:
+        current, longest = history.streaks(habit.habit_id, days=40, today=TODAY)
+        assert (stats[habit.habit_id]["current_streak"], stats[habit.habit_id]["longest_streak"]) == (current, longest)
+        assert stats[habit.habit_id]["rate_30"] == pytest.approx(
+            history.completion_rate(habit.habit_id, 30, today=TODAY))
+
+
+@pytest.mark.parametrize("days", [1, 2, 7, 365])
+def test_numpy_and_python_kernels_agree(days):
+    pytest.importorskip("numpy")
+    analytics = HabitAnalytics(None)
+    rows = random_rows(50, days) + [[1.0] * days, [0.0] * days]
+    fast, slow = analytics._compute_numpy(rows), analytics._compute_python(rows)
+    for a, b in zip(fast, slow):
+        assert a["current_streak"] == b["current_streak"]
+        assert a["longest_streak"] == b["longest_streak"]
+        for key in ("rate_7", "rate_30"):
+            assert a[key] == pytest.approx(b[key])
+
+
+def test_cache_follows_history_version_and_date(tmp_path):
+    history = HabitHistory(str(tmp_path))
+    habit = Habit("Read", habit_id="a")
+    fill(history, "a", [1.0, 1.0])
+    analytics = HabitAnalytics(history, window=30, use_numpy=False)
+    computed = []
+    kernel = analytics._compute_python
+    analytics._compute_python = lambda rows: computed.append(len(rows)) or kernel(rows)
+
+    assert analytics.habit_stats([habit], today=TODAY)["a"]["current_streak"] == 2
+    analytics.habit_stats([habit], today=TODAY)
+    assert computed == [1]
+
+    # a new record bumps the history version
+    fill(history, "a", [1.0], today=TODAY + 1)
+    assert analytics.habit_stats([habit], today=TODAY + 1)["a"]["current_streak"] == 3
+    # the next day alone also recomputes (today in progress, streak carried)
+    assert analytics.habit_stats([habit], today=TODAY + 2)["a"]["current_streak"] == 3
+    assert analytics.habit_stats([habit], today=TODAY + 3)["a"]["current_streak"] == 0
+    assert computed == [1, 1, 1, 1]
+
+
+def test_category_stats_weight_by_increment(tmp_path):
+    history = HabitHistory(str(tmp_path))
+    habits = [Habit("A", category="Health", progress=1.0, increment=0.3, habit_id="a"),
+              Habit("B", category="Health", progress=0.0, increment=0.1, habit_id="b")]
+    fill(history, "a", [1.0] * 7)
+    analytics = HabitAnalytics(history, window=30, use_numpy=False)
+    stats = analytics.category_stats(habits, analytics.habit_stats(habits, today=TODAY))["Health"]
+    assert stats["habits"] == 2
+    assert stats["avg_progress"] == pytest.approx(0.75)
+    assert stats["rate_7"] == pytest.approx(0.75)
+    assert stats["best_streak"] == 7
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+
+import pytest
+
+import cli
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    # the default (relative) file names, in a scratch directory
+    monkeypatch.chdir(tmp_path)
+
+    def run(*argv, stdin=""):
+        out = io.StringIO()
+        code = cli.main(list(argv), stdin=io.StringIO(stdin), out=out)
+        return code, out.getvalue()
+    return run
+
+
+def listed(run, *argv):
+    code, out = run(*argv, "list", "--json")
+    assert code == 0
+    return [json.loads(line) for line in out.splitlines()]
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_add_inc_reset(run, backend):
+    assert run("--backend", backend, "add", "Read", "Run", "--category", "Health")[0] == 0
+    code, out = run("--backend", backend, "inc", "read", "--by", "0.25")
+    assert code == 0 and out == "Read: 25%\n"
+    habits = listed(run, "--backend", backend)
+    assert [(h["name"], h["category"], h["progress"]) for h in habits] == [("Read", "Health", 0.25),
+                                                                        ("Run", "Health", 0.0)]
+    assert run("--backend", backend, "reset")[0] == 0
+    assert [h["progress"] for h in listed(run, "--backend", backend)] == [0.0, 0.0]
+
+
+def test_stdin_operations_and_errors(run):
+    run("add", "-", stdin='Read\n{"name": "Run", "category": "Fitness"}\n')
+    code, _ = run("apply", stdin='{"op": "inc", "name": "Run", "by": 0.5}\n{"op": "inc", "name": "Nope"}\n'
+                                '{"op": "delete", "name": "Read"}\n')
+    assert code == 1
+    assert [(h["name"], h["progress"]) for h in listed(run)] == [("Run", 0.5)]
+
+
+def test_import_skips_duplicates(run, tmp_path):
+    path = tmp_path / "in.csv"
+    path.write_text("name,category\nRead,Learning\nread,learning\nRun,Fitness\n", encoding="utf-8")
+    code, out = run("import", str(path))
+    assert code == 0 and out == "imported 2 habits, skipped 1 duplicates\n"
+    code, out = run("import", str(path))
+    assert out == "imported 0 habits, skipped 3 duplicates\n"
+
+
+def test_export_formats(run):
+    run("add", "Read", "--category", "Learning")
+    code, out = run("export", "--format", "ndjson")
+    assert code == 0 and json.loads(out)["name"] == "Read"
+    code, out = run("export", "--format", "csv")
+    assert out.splitlines()[0] == "id,name,category,progress,increment,reminder"
+    code, out = run("export")
+    assert json.loads(out)["habits"][0]["name"] == "Read"
+
+
+def test_csv_export_includes_reminders(run):
+    run("add", "Stretch", "--reminder", "30")
+    run("add", "Read")
+    code, out = run("export", "--format", "csv")
+    assert code == 0
+    rows = list(csv.DictReader(io.StringIO(out)))
+    assert [(r["name"], r["reminder"]) for r in rows] == [("Stretch", "30"), ("Read", "")]
+
+
+def test_csv_export_imports_with_reminders(run, tmp_path):
+    run("add", "Stretch", "--reminder", "30")
+    run("export", "--format", "csv", "-o", "habits.csv")
+    (tmp_path / "profiles" / "Alex").mkdir(parents=True)
+    code, out = run("--profile", "Alex", "import", "habits.csv")
+    assert code == 0 and out == "imported 1 habits, skipped 0 duplicates\n"
+    assert [(h["name"], h.get("reminder")) for h in listed(run, "--profile", "Alex")] == [("Stretch", 30)]
+
+
+def test_profiles(run, tmp_path):
+    assert run("--profile", "Alex", "list")[0] == 2
+    (tmp_path / "profiles" / "Alex").mkdir(parents=True)
+    run("--profile", "Alex", "add", "Stretch")
+    assert [h["name"] for h in listed(run, "--profile", "Alex")] == ["Stretch"]
+    assert listed(run) == []
@@ -0,0 +1,135 @@
+import pytest
+
+from habit_store import DEFAULT_CATEGORIES, DEFAULT_INCREMENT, Habit, HabitStore
+
+
+def recorder(store):
+    events = []
+    store.subscribe(lambda event, habit, changes: events.append((event, habit, changes)))
+    return events
+
+
+def test_add_update_remove_notify():
+    store = HabitStore()
+    events = recorder(store)
+    habit = store.add("Read", category="Learning")
+    assert store.update(habit, progress=1.5) == {"progress": 1.0}
+    assert store.update(habit, progress=1.0) == {}
+    store.remove(habit.habit_id)
+    assert [e for e, _, _ in events] == ["add", "update", "remove"]
+    assert len(store) == 0 and store.by_category("Learning") == []
+
+
+def test_category_change_moves_index():
+    store = HabitStore()
+    habit = store.add("Run", category="Fitness")
+    store.update(habit, category="Health")
+    assert store.by_category("Fitness") == []
+    assert store.by_category("Health") == [habit]
+    assert store.used_categories() == ["Health"]
+
+
+def test_batch_delivers_one_event_at_the_end():
+    store = HabitStore()
+    events = recorder(store)
+    with store.batch():
+        a = store.add("A")
+        with store.batch():
+            store.update(a, progress=0.5)
+        assert events == []
+        store.reset_all()
+    assert len(events) == 1
+    event, habit, changes = events[0]
+    assert event == "batch" and habit is None
+    assert [e for e, _, _ in changes] == ["add", "update", "all"]
+
+
+def test_batch_delivers_events_after_an_exception():
+    store = HabitStore()
+    events = recorder(store)
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store.add("A")
+            raise RuntimeError
+    assert [e for e, _, _ in events] == ["batch"]
+
+
+def test_add_many_assigns_new_ids_and_skips_invalid():
+    store = HabitStore()
+    existing = store.add("Old")
+    events = recorder(store)
+    bad = []
+    habits = store.add_many([{"id": existing.habit_id, "name": "Copy", "progress": 0.3},
+                             {"name": "Broken", "progress": "lots"},
+                             {"name": "New", "category": "Work"}],
+                            on_invalid=lambda entry, e: bad.append(entry["name"]))
+    assert [h.name for h in habits] == ["Copy", "New"]
+    assert habits[0].habit_id != existing.habit_id
+    assert store.get(existing.habit_id).name == "Old"
+    assert bad == ["Broken"]
+    assert len(events) == 1 and [e for e, _, _ in events[0][2]] == ["add", "add"]
+    assert "Work" in store.categories
+
+
+def test_load_validates_and_reports_invalid_entries():
+    store = HabitStore()
+    events = recorder(store)
+    bad = []
+    store.load({"meta": {"progress_increment": 0.25, "categories": ["Custom"], "collapsed": ["Work", 3]},
+                "habits": [{"id": "a", "name": "A", "progress": 2},
+                           {"id": "b", "name": "B", "increment": "x"},
+                           "not a dict"]},
+               on_invalid=lambda entry, e: bad.append(entry))
+    assert [h.habit_id for h in store] == ["a"]
+    assert store.get("a").progress == 1.0
+    assert store.progress_increment == 0.25
+    assert store.categories[:len(DEFAULT_CATEGORIES)] == DEFAULT_CATEGORIES and "Custom" in store.categories
+    assert store.collapsed == {"Work"}
+    assert len(bad) == 2
+    assert events == [("reload", None, None)]
+
+
+def test_merge_only_touches_what_differs():
+    store = HabitStore()
+    store.load({"habits": [{"id": "a", "name": "A", "progress": 0.2},
+                           {"id": "b", "name": "B"},
+                           {"id": "c", "name": "C"}]})
+    events = recorder(store)
+    changes = store.merge(entries=[{"id": "a", "name": "A", "progress": 0.2},
+                                   {"id": "b", "name": "B2"},
+                                   {"id": "d", "name": "D", "category": "Social"}],
+                          removed=["c", "missing"],
+                          meta={"progress_increment": 0.5, "categories": ["Extra"], "collapsed": ["Health"]})
+    kinds = [(e, h.habit_id if h else None) for e, h, _ in changes]
+    assert kinds == [("update", "b"), ("add", "d"), ("remove", "c"), ("settings", None)]
+    assert changes[0][2] == {"name": "B2"}
+    assert store.progress_increment == 0.5 and "Extra" in store.categories
+    assert store.collapsed == set()
+    assert events == [("merge", None, changes)]
+
+
+def test_merge_fields_apply_to_every_habit():
+    store = HabitStore()
+    store.load({"habits": [{"id": "a", "name": "A", "progress": 0.5}, {"id": "b", "name": "B", "progress": 1}]})
+    changes = store.merge(fields={"progress": 0.0, "name": "ignored"})
+    assert changes == [("all", None, {"progress": 0.0})]
+    assert [h.progress for h in store] == [0.0, 0.0]
+    assert store.merge() == []
+
+
+def test_to_data_round_trips():
+    store = HabitStore()
+    store.add("Read", category="Learning", reminder=30)
+    store.set_collapsed("Work")
+    copy = HabitStore()
+    copy.load(store.to_data())
+    assert copy.to_data() == store.to_data()
+    assert Habit.from_dict(store.to_data()["habits"][0]).reminder == 30
+
+
+def test_load_does_not_keep_settings_of_the_previous_document():
+    store = HabitStore()
+    store.load({"meta": {"progress_increment": 0.5, "categories": ["Alex only"]}, "habits": []})
+    store.load({"meta": {}, "habits": [{"id": "a", "name": "A", "category": "Work"}]})
+    assert store.categories == DEFAULT_CATEGORIES
+    assert store.progress_increment == DEFAULT_INCREMENT
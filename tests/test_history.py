@@ -0,0 +1,138 @@
+import datetime
+
+from habit_store import HabitStore
+from history import (COMPLETE, KIND_ARCHIVE, KIND_PROGRESS, KIND_RESET, RECORD, DayRolloverScheduler, HabitHistory,
+                     day_date, day_number, roll_over)
+
+DAY = day_number(datetime.date(2026, 3, 10))
+
+
+def at(day, hour=12, minute=0):
+    return datetime.datetime.combine(day_date(day), datetime.time(hour, minute))
+
+
+def test_records_are_fixed_size_binary(tmp_path):
+    history = HabitHistory(str(tmp_path))
+    history.record("a", 0.5, when=at(DAY, 8, 30))
+    history.record("a", 0.25, KIND_RESET, when=at(DAY, 9))
+    history.close()
+    with open(history.path_for("a"), "rb") as f:
+        raw = f.read()
+    assert len(raw) == 2 * RECORD.size
+    assert RECORD.unpack_from(raw, 0) == (DAY, 8 * 60 + 30, KIND_PROGRESS, 0.5)
+    assert RECORD.unpack_from(raw, RECORD.size) == (DAY, 9 * 60, KIND_RESET, 0.25)
+
+
+def test_buffered_records_are_visible_to_queries(tmp_path):
+    history = HabitHistory(str(tmp_path))
+    history.record("a", 0.5, when=at(DAY))
+    assert not (tmp_path / "a.bin").exists()
+    assert history.events("a") == [(DAY, 12 * 60, KIND_PROGRESS, 0.5)]
+
+
+def test_round_trip_through_close_and_reopen(tmp_path):
+    history = HabitHistory(str(tmp_path))
+    for offset in range(10):
+        history.record("a", 1.0 if offset % 3 else 0.5, when=at(DAY + offset))
+    history.close()
+
+    reopened = HabitHistory(str(tmp_path))
+    assert len(reopened.events("a")) == 10
+    assert reopened.daily_values("a", DAY, DAY + 3) == [0.5, 1.0, 1.0, 0.5]
+
+
+def test_day_boundaries_of_a_range_query(tmp_path):
+    history = HabitHistory(str(tmp_path))
+    # (values exact in float32)
+    history.record("a", 0.125, when=at(DAY - 1, 23, 59))
+    history.record("a", 0.25, when=at(DAY, 0, 0))
+    history.record("a", 0.5, when=at(DAY, 23, 59))
+    history.record("a", 0.75, when=at(DAY + 1, 0, 0))
+    assert [rec[3] for rec in history.events("a", DAY, DAY)] == [0.25, 0.5]
+    assert [rec[3] for rec in history.events("a", DAY + 1)] == [0.75]
+    assert [rec[3] for rec in history.events("a", end_day=DAY - 1)] == [0.125]
+    assert history.events("a", DAY + 2) == []
+    assert history.events("missing") == []
+
+
+def test_late_records_stay_in_day_order(tmp_path):
+    history = HabitHistory(str(tmp_path))
+    history.record("a", 0.5, when=at(DAY))
+    history.record("a", 0.7, KIND_ARCHIVE, when=at(DAY - 2))
+    assert [rec[0] for rec in history.events("a")] == [DAY, DAY]
+
+
+def test_archive_day_and_store_events(tmp_path):
+    store = HabitStore()
+    history = HabitHistory(str(tmp_path))
+    history.attach(store)
+    done, untouched = store.add("Done"), store.add("Untouched")
+    store.update(done, progress=1.0)
+    today = day_number()
+    history.archive_day(today, list(store))
+    # the reset after an archive adds no reset records
+    store.reset_all()
+    kinds = [rec[2] for rec in history.events(done.habit_id)]
+    assert kinds == [KIND_PROGRESS, KIND_ARCHIVE]
+    assert history.events(done.habit_id, today, today)[-1] == (today, 23 * 60 + 59, KIND_ARCHIVE, 1.0)
+    assert history.events(untouched.habit_id) == []
+
+    store.remove(done)
+    assert history.events(done.habit_id) == []
+
+
+def test_streaks_and_completion_rate(tmp_path):
+    history = HabitHistory(str(tmp_path))
+    today = DAY + 9
+    # completed on days 0-3 and 6-8 of the window, today still in progress
+    for offset in (0, 1, 2, 3, 6, 7, 8):
+        history.record("a", COMPLETE, when=at(DAY + offset))
+    history.record("a", 0.5, when=at(today))
+    assert history.streaks("a", days=10, today=today) == (3, 4)
+    assert history.completion_rate("a", 10, today=today) == 0.7
+    history.record("a", 1.0, when=at(today, 18))
+    assert history.streaks("a", days=10, today=today) == (4, 4)
+
+
+def test_roll_over_catches_up_after_missed_days(tmp_path):
+    store = HabitStore()
+    history = HabitHistory(str(tmp_path))
+    history.attach(store)
+    habit = store.add("Read")
+    assert not roll_over(store, history, today=day_date(DAY))
+    assert store.current_day == day_date(DAY).isoformat()
+    store.update(habit, progress=0.5)
+
+    # closed for three days: the last open day is archived once, the days in between stay empty
+    assert roll_over(store, history, today=day_date(DAY + 3))
+    assert store.current_day == day_date(DAY + 3).isoformat()
+    assert habit.progress == 0.0
+    assert not roll_over(store, history, today=day_date(DAY + 3))
+    assert history.daily_values(habit.habit_id, DAY + 1, DAY + 3) == [0.0, 0.0, 0.0]
+    archived = [rec for rec in history.events(habit.habit_id) if rec[2] == KIND_ARCHIVE]
+    assert len(archived) == 1 and archived[0][3] == 0.5
+
+
+def test_roll_over_adopts_a_date_that_went_backwards(tmp_path):
+    store = HabitStore()
+    history = HabitHistory(str(tmp_path))
+    store.set_current_day(day_date(DAY).isoformat())
+    store.add("Read", progress=0.5)
+    assert not roll_over(store, history, today=day_date(DAY - 1))
+    assert store.current_day == day_date(DAY - 1).isoformat()
+    assert [h.progress for h in store] == [0.5]
+
+
+def test_rollover_timer_rearms_for_each_midnight():
+    now = [datetime.datetime(2026, 3, 10, 23, 59, 30)]
+    timers, rollovers = [], []
+    scheduler = DayRolloverScheduler(lambda ms, callback: timers.append((ms, callback)) or len(timers),
+                                     lambda timer: None, lambda: rollovers.append(now[0]),
+                                     clock=lambda: now[0])
+    scheduler.start()
+    assert timers[-1][0] == 30 * 1000 + 1000
+
+    now[0] = datetime.datetime(2026, 3, 11, 0, 0, 1)
+    timers[-1][1]()
+    assert rollovers == [now[0]]
+    assert timers[-1][0] == (24 * 3600 - 1) * 1000 + 1000
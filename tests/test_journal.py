@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from journal import HabitJournal, apply_records, fold_records
+
+
+def test_apply_records_puts_deletes_and_settings():
+    data = {"meta": {"journal_seq": 1},
+            "habits": [{"id": "a", "name": "A", "progress": 0.5}, {"id": "b", "name": "B"}, {"name": "no id"}]}
+    records = [
+        {"seq": 2, "op": "put", "habit": {"id": "c", "name": "C", "category": "Custom"}},
+        {"seq": 3, "op": "delete", "id": "b"},
+        {"seq": 4, "op": "all", "fields": {"progress": 0.0}},
+        {"seq": 5, "op": "put", "habit": {"id": "a", "name": "A2", "progress": 0.1}},
+        {"seq": 6, "op": "meta", "progress_increment": 0.2, "categories": ["Custom", "X"]},
+    ]
+    apply_records(data, records)
+    assert data["habits"] == [{"id": "a", "name": "A2", "progress": 0.1}, {"name": "no id", "progress": 0.0},
+                              {"id": "c", "name": "C", "category": "Custom", "progress": 0.0}]
+    assert data["meta"] == {"journal_seq": 6, "progress_increment": 0.2, "categories": ["Custom", "X"]}
+
+
+def test_fold_records_nets_out_a_run():
+    records = [
+        {"seq": 1, "op": "put", "habit": {"id": "a", "name": "A", "progress": 0.5}},
+        {"seq": 2, "op": "delete", "id": "b"},
+        {"seq": 3, "op": "all", "fields": {"progress": 0.0}},
+        {"seq": 4, "op": "put", "habit": {"id": "b", "name": "B"}},
+        {"seq": 5, "op": "delete", "id": "c"},
+        {"seq": 6, "op": "meta", "current_day": "2026-01-02"},
+        {"seq": 7, "op": "mark"},
+    ]
+    folded = fold_records(records)
+    assert folded["entries"] == [{"id": "a", "name": "A", "progress": 0.0}, {"id": "b", "name": "B"}]
+    assert folded["removed"] == ["c"]
+    assert folded["fields"] == {"progress": 0.0}
+    assert folded["meta"] == {"current_day": "2026-01-02"}
+
+
+def test_replay_skips_records_in_the_snapshot(tmp_path):
+    path = str(tmp_path / "habits.journal")
+    journal = HabitJournal(path)
+    journal.append("put", habit={"id": "a", "name": "A"})
+    journal.append("put", habit={"id": "b", "name": "B"})
+    journal.close()
+
+    data = HabitJournal(path).replay({"meta": {"journal_seq": 1}, "habits": [{"id": "a", "name": "Old"}]})
+    assert [h["name"] for h in data["habits"]] == ["Old", "B"]
+    assert data["meta"]["journal_seq"] == 2
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = str(tmp_path / "habits.journal")
+    journal = HabitJournal(path)
+    journal.append("put", habit={"id": "a", "name": "A"})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "op": "put", "hab')
+    assert [r["seq"] for r in HabitJournal(path).read()] == [1]
+
+
+def test_discard_through_keeps_newer_records_and_sequence(tmp_path):
+    path = str(tmp_path / "habits.journal")
+    journal = HabitJournal(path)
+    for name in "ABC":
+        journal.append("put", habit={"id": name.lower(), "name": name})
+    journal.discard_through(2)
+    assert [r["seq"] for r in journal.read()] == [3]
+    journal.discard_through(3)
+    assert journal.read() == [{"seq": 3, "op": "mark"}]
+    assert journal.append("delete", id="a") == 4
+
+
+def test_appends_of_another_process_are_caught_up(tmp_path):
+    path = str(tmp_path / "habits.journal")
+    mine, theirs = HabitJournal(path), HabitJournal(path)
+    mine.append("put", habit={"id": "a", "name": "A"})
+    theirs.append("put", habit={"id": "b", "name": "B"})
+    assert mine.changed()
+    assert mine.catch_up()
+    assert [r["seq"] for r in mine.take_foreign()] == [2]
+    assert mine.append("delete", id="a") == 3
+
+
+@pytest.mark.parametrize("durability, expected", [("always", 4), ("close", 1), ("none", 0)])
+def test_fsyncs_follow_durability(tmp_path, monkeypatch, durability, expected):
+    synced = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+    journal = HabitJournal(str(tmp_path / "habits.journal"), durability=durability)
+    journal.append("put", habit={"id": "a", "name": "A"})
+    journal.discard_through(1)
+    journal.append("delete", id="a")
+    journal.close()
+    assert len(synced) == expected
@@ -0,0 +1,148 @@
+import json
+
+from persistence import HabitFileReader, SaveScheduler
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def read_all(path, chunk_size=64 * 1024):
+    bad = []
+    reader = HabitFileReader(path, on_bad=lambda raw, reason: bad.append(raw), chunk_size=chunk_size)
+    return reader, (list(reader.habits()) if reader.streaming else None), bad
+
+
+def document(count):
+    habits = [{"id": f"h{i}", "name": f"Habit {i}", "progress": 0.0} for i in range(count)]
+    return json.dumps({"meta": {"progress_increment": 0.2}, "habits": habits}, indent=2)
+
+
+def test_streams_entries_across_chunk_boundaries(tmp_path):
+    path = write(tmp_path / "habits.json", document(50))
+    for chunk_size in (1, 7, 64, 4096):
+        reader, habits, bad = read_all(path, chunk_size)
+        assert reader.meta == {"progress_increment": 0.2}
+        assert [h["id"] for h in habits] == [f"h{i}" for i in range(50)]
+        assert bad == []
+
+
+def test_malformed_entry_is_skipped(tmp_path):
+    text = document(5).replace('"name": "Habit 2"', '"name": Habit 2"')
+    path = write(tmp_path / "habits.json", text)
+    for chunk_size in (3, 64, 4096):
+        reader, habits, bad = read_all(path, chunk_size)
+        assert [h["id"] for h in habits] == ["h0", "h1", "h3", "h4"]
+        assert len(bad) == 1 and '"h2"' in bad[0]
+        assert reader.bad == 1
+
+
+def test_truncated_file_keeps_complete_entries(tmp_path):
+    text = document(5)
+    path = write(tmp_path / "habits.json", text[:text.index('"h3"') + 10])
+    reader, habits, bad = read_all(path, 16)
+    assert [h["id"] for h in habits] == ["h0", "h1", "h2"]
+    assert len(bad) == 1
+
+
+def test_other_layouts_are_not_streamed(tmp_path):
+    reader, _, _ = read_all(write(tmp_path / "a.json", '{"habits": [], "meta": {}}'))
+    assert not reader.streaming
+    reader, _, _ = read_all(write(tmp_path / "b.json", '{}'))
+    assert not reader.streaming
+
+
+def test_broken_header_raises(tmp_path):
+    path = write(tmp_path / "habits.json", '["not", "a", "document"]')
+    try:
+        HabitFileReader(path)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_invalid_utf8_only_costs_its_entry(tmp_path):
+    raw = document(3000).encode("utf-8").replace(b'"Habit 2500"', b'"Habit \xff2500"')
+    path = tmp_path / "habits.json"
+    path.write_bytes(raw)
+    reader, habits, bad = read_all(str(path))
+    assert len(habits) == 2999 and "h2500" not in {h["id"] for h in habits}
+    assert len(bad) == 1 and '"h2500"' in bad[0]
+
+
+def test_malformed_entry_does_not_pull_in_the_rest_of_the_file(tmp_path):
+    text = document(20000).replace('"name": "Habit 3"', '"name": Habit 3"')
+    path = write(tmp_path / "habits.json", text)
+    reader = HabitFileReader(path, chunk_size=4096)
+    fill, peak = reader._fill, [0]
+
+    def tracking_fill():
+        filled = fill()
+        peak[0] = max(peak[0], len(reader._buf))
+        return filled
+    reader._fill = tracking_fill
+    assert len(list(reader.habits())) == 19999
+    assert peak[0] < 3 * 4096
+
+
+class FakeTimers:
+    def __init__(self):
+        self.pending = {}
+        self._ids = 0
+
+    def after(self, ms, callback):
+        self._ids += 1
+        self.pending[self._ids] = callback
+        return self._ids
+
+    def after_cancel(self, timer):
+        self.pending.pop(timer, None)
+
+    def fire_all(self):
+        pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            callback()
+
+
+def scheduler(timers, writes):
+    state = {"n": 0}
+
+    def snapshot():
+        state["n"] += 1
+        return state["n"]
+    return SaveScheduler(snapshot, writes.append, after=timers.after, after_cancel=timers.after_cancel)
+
+
+def test_bursts_of_changes_coalesce_into_one_write():
+    timers, writes = FakeTimers(), []
+    saves = scheduler(timers, writes)
+    try:
+        for _ in range(50):
+            saves.mark_dirty()
+        assert len(timers.pending) == 1
+        timers.fire_all()
+        saves.flush()
+        assert writes == [1]
+        assert saves.stats()["coalesced"] == 49
+    finally:
+        saves.close()
+
+
+def test_hold_defers_the_write_and_cancels_an_armed_timer():
+    timers, writes = FakeTimers(), []
+    saves = scheduler(timers, writes)
+    try:
+        saves.mark_dirty()
+        with saves.hold():
+            assert timers.pending == {}
+            saves.mark_dirty()
+            assert timers.pending == {}
+        assert len(timers.pending) == 1
+        timers.fire_all()
+        saves.flush()
+        assert writes == [1]
+    finally:
+        saves.close()
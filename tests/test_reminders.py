@@ -0,0 +1,64 @@
+from habit_store import HabitStore
+from reminders import HabitReminders, ReminderQueue
+
+
+def test_queue_orders_and_replaces_entries():
+    queue = ReminderQueue()
+    queue.push("a", 30)
+    queue.push("b", 10)
+    queue.push("c", 20)
+    queue.push("b", 40)
+    queue.discard("c")
+    assert len(queue) == 2 and "c" not in queue
+    assert queue.peek() == 30
+    assert queue.pop_due(35) == ["a"]
+    assert queue.pop_due(35) == []
+    assert queue.due_time("b") == 40
+    assert queue.pop_due(100) == ["b"] and queue.peek() is None
+
+
+def test_orphaned_entries_are_compacted():
+    queue = ReminderQueue()
+    for i in range(200):
+        queue.push("a", i)
+    assert len(queue) == 1 and len(queue._heap) < 100
+
+
+class FakeTimers:
+    def __init__(self):
+        self.pending = {}
+        self._ids = 0
+
+    def after(self, ms, callback):
+        self._ids += 1
+        self.pending[self._ids] = (ms, callback)
+        return self._ids
+
+    def after_cancel(self, timer):
+        self.pending.pop(timer, None)
+
+
+def test_reminders_fire_until_the_habit_is_complete():
+    now = [1000.0]
+    timers = FakeTimers()
+    fired = []
+    store = HabitStore()
+    reminders = HabitReminders(timers.after, timers.after_cancel, fired.extend, clock=lambda: now[0])
+    reminders.attach(store)
+    habit = store.add("Stretch", reminder=5)
+    store.add("No reminder")
+    assert reminders.queue.due_time(habit.habit_id) == 1300.0
+    assert len(timers.pending) == 1
+
+    now[0] = 1300.0
+    (timer, (ms, callback)), = timers.pending.items()
+    del timers.pending[timer]
+    callback()
+    assert fired == [habit]
+    assert reminders.queue.due_time(habit.habit_id) == 1600.0
+
+    store.update(habit, progress=1.0)
+    assert habit.habit_id not in reminders.queue
+    assert timers.pending == {}
+    store.update(habit, progress=0.0)
+    assert reminders.queue.due_time(habit.habit_id) == 1600.0
@@ -0,0 +1,49 @@
+from habit_store import HabitStore
+from search_index import PROGRESS_FACETS, HabitIndex
+
+
+def make_index():
+    store = HabitStore()
+    for name, category, progress in (("Drink water", "Health", 0.0), ("Read a book", "Learning", 0.5),
+                                     ("Water plants", "Chores", 1.0), ("Run", "Fitness", 0.0)):
+        store.add(name, category=category, progress=progress)
+    return store, HabitIndex(store)
+
+
+def names(habits):
+    return [h.name for h in habits]
+
+
+def test_substring_and_prefix_queries():
+    store, index = make_index()
+    assert names(index.search("water")) == ["Drink water", "Water plants"]
+    assert names(index.search("ate")) == ["Drink water", "Water plants"]
+    assert names(index.search("wa pl")) == ["Water plants"]
+    assert names(index.search("r")) == ["Read a book", "Run"]
+    assert index.search("xyz") == []
+    assert len(names(index.search(""))) == 4
+
+
+def test_facets():
+    store, index = make_index()
+    assert names(index.search("water", category="Chores")) == ["Water plants"]
+    assert names(index.search(progress=PROGRESS_FACETS["Not started"])) == ["Drink water", "Run"]
+    assert names(index.search(progress=PROGRESS_FACETS["In progress"])) == ["Read a book"]
+    assert names(index.search(limit=1)) == ["Drink water"]
+
+
+def test_index_follows_store_events():
+    store, index = make_index()
+    run = store.by_category("Fitness")[0]
+    store.update(run, name="Go jogging")
+    assert names(index.search("run")) == []
+    assert names(index.search("jog")) == ["Go jogging"]
+    store.remove(run)
+    assert index.search("jog") == [] and len(index) == 3
+    with store.batch():
+        store.add("Jog again")
+    assert names(index.search("jog")) == ["Jog again"]
+    store.load({"habits": [{"id": "x", "name": "Stretch"}]})
+    assert names(index.search("st")) == ["Stretch"] and len(index) == 1
+    store.extend([{"id": "y", "name": "Stretch more"}])
+    assert names(index.search("stretch")) == ["Stretch", "Stretch more"]
@@ -0,0 +1,256 @@
+import json
+import os
+
+import pytest
+
+from habit_store import HabitStore
+from persistence import write_json_file
+from storage import JsonStorage, SqliteStorage, migrate_json_to_sqlite
+
+
+def open_store(storage):
+    store = HabitStore()
+    data = storage.load()
+    if data is not None:
+        store.load(data, on_invalid=storage.quarantine)
+    storage.attach(store)
+    return store
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "habits.json"), str(tmp_path / "habits.journal")
+
+
+def test_missing_file_loads_nothing(paths):
+    storage = JsonStorage(*paths)
+    try:
+        assert storage.load() is None
+    finally:
+        storage.close()
+
+
+def test_changes_survive_through_the_journal(paths):
+    storage = JsonStorage(*paths)
+    store = open_store(storage)
+    habit = store.add("Read", category="Learning")
+    store.update(habit, progress=0.5)
+    # nothing flushed: the snapshot does not exist yet, the journal is replayed
+    storage.journal.close()
+    assert not os.path.exists(paths[0])
+
+    other = JsonStorage(*paths)
+    try:
+        reloaded = open_store(other)
+        assert [(h.name, h.progress) for h in reloaded] == [("Read", 0.5)]
+    finally:
+        other.close()
+        storage.close()
+
+
+def test_flush_folds_the_journal_into_the_snapshot(paths):
+    storage = JsonStorage(*paths)
+    store = open_store(storage)
+    store.add("Read")
+    storage.save()
+    storage.flush()
+    storage.close()
+    with open(paths[0], encoding="utf-8") as f:
+        assert [h["name"] for h in json.load(f)["habits"]] == ["Read"]
+    assert [r["op"] for r in JsonStorage(*paths).journal.read()] == ["mark"]
+
+
+def test_files_without_ids_are_rewritten(paths):
+    write_json_file(paths[0], {"meta": {}, "habits": [{"name": "Old", "progress": 0.2}]})
+    storage = JsonStorage(*paths)
+    store = open_store(storage)
+    assert storage.needs_rewrite
+    storage.flush()
+    storage.close()
+    with open(paths[0], encoding="utf-8") as f:
+        assert json.load(f)["habits"][0]["id"] == store.to_data()["habits"][0]["id"]
+
+
+def test_bad_entries_are_quarantined(paths):
+    with open(paths[0], "w", encoding="utf-8") as f:
+        f.write('{"meta": {}, "habits": [{"id": "a", "name": "A"}, {"id": "b", "name": }, {"id": "c", "name": "C"}]}')
+    storage = JsonStorage(*paths)
+    try:
+        store = open_store(storage)
+        assert [h.habit_id for h in store] == ["a", "c"]
+        assert storage.quarantined == 1
+        with open(storage.quarantine_path, encoding="utf-8") as f:
+            assert '"b"' in json.loads(f.readline())["entry"]
+    finally:
+        storage.close()
+
+
+def test_unreadable_file_recovers_from_the_newest_snapshot(paths):
+    storage = JsonStorage(*paths, snapshots=2)
+    store = open_store(storage)
+    store.add("First")
+    storage.save()
+    storage.flush()
+    store.add("Second")
+    storage.save()
+    storage.flush()
+    storage.close()
+    os.remove(paths[1])
+    with open(paths[0], "w", encoding="utf-8") as f:
+        f.write("garbage")
+
+    storage = JsonStorage(*paths, snapshots=2)
+    try:
+        store = open_store(storage)
+        assert storage.recovered_from == paths[0] + ".1"
+        assert [h.name for h in store] == ["First"]
+        assert os.path.exists(paths[0] + ".corrupt")
+    finally:
+        storage.close()
+
+
+def test_unreadable_profile_is_never_saved_over(paths, tmp_path):
+    # switching to a profile whose files cannot be read (and not starting over)
+    first = JsonStorage(*paths)
+    store = open_store(first)
+    store.add("Read")
+    first.close()
+    first.detach()
+    other = str(tmp_path / "other.json")
+    with open(other, "w", encoding="utf-8") as f:
+        f.write("garbage")
+
+    storage = JsonStorage(other, snapshots=0)
+    storage.attach(store)
+    with pytest.raises(ValueError):
+        storage.load()
+    storage.detach()
+    store.load({"habits": [], "meta": {}})
+    assert list(store) == []
+    store.add("Run")
+    assert storage.sync() == []
+    storage.close()
+    with open(other, encoding="utf-8") as f:
+        assert f.read() == "garbage"
+
+    # the previous profile opens again as it was left
+    first = JsonStorage(*paths)
+    try:
+        assert [h.name for h in open_store(first)] == ["Read"]
+    finally:
+        first.close()
+
+
+def test_sync_merges_journal_records_of_another_instance(paths):
+    first, second = JsonStorage(*paths), JsonStorage(*paths)
+    try:
+        store_a, store_b = open_store(first), open_store(second)
+        habit = store_a.add("Read")
+        assert [e for e, _, _ in second.sync()] == ["add"]
+        store_b.update(store_b.get(habit.habit_id), progress=0.5)
+        assert [e for e, _, _ in first.sync()] == ["update"]
+        assert store_a.get(habit.habit_id).progress == 0.5
+        assert first.sync() == []
+    finally:
+        first.close()
+        second.close()
+
+
+def test_sync_rereads_a_snapshot_written_by_another_instance(paths):
+    first, second = JsonStorage(*paths), JsonStorage(*paths)
+    try:
+        store_a, store_b = open_store(first), open_store(second)
+        store_a.add("Read")
+        store_a.add("Run")
+        first.save()
+        first.flush()
+        second.sync()
+        assert sorted(h.name for h in store_b) == ["Read", "Run"]
+        store_a.remove(store_a.by_category("Other")[0])
+        first.save()
+        first.flush()
+        second.sync()
+        assert [h.name for h in store_b] == ["Run"]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_sync_without_a_journal_keeps_own_unsaved_changes(paths):
+    first, second = JsonStorage(paths[0]), JsonStorage(paths[0])
+    try:
+        store_a = open_store(first)
+        a, b = store_a.add("A"), store_a.add("B")
+        first.flush()
+        store_b = open_store(second)
+        store_b.update(store_b.get(b.habit_id), progress=0.5)
+        store_a.update(a, progress=1.0)
+        first.flush()
+        second.sync()
+        assert store_b.get(a.habit_id).progress == 1.0
+        assert store_b.get(b.habit_id).progress == 0.5
+    finally:
+        first.close()
+        second.close()
+
+
+def test_sqlite_round_trip_and_sync(tmp_path):
+    path = str(tmp_path / "habits.db")
+    first, second = SqliteStorage(path), SqliteStorage(path)
+    try:
+        store_a, store_b = open_store(first), open_store(second)
+        habit = store_a.add("Read", category="Learning")
+        store_a.update(habit, progress=0.5)
+        assert [e for e, _, _ in second.sync()] == ["add"]
+        assert store_b.get(habit.habit_id).progress == 0.5
+        assert list(first.iter_habits(category="Learning"))[0]["name"] == "Read"
+    finally:
+        first.close()
+        second.close()
+
+
+def test_sqlite_save_keeps_rows_of_another_process(tmp_path):
+    path = str(tmp_path / "habits.db")
+    first, second = SqliteStorage(path), SqliteStorage(path)
+    try:
+        store_a, store_b = open_store(first), open_store(second)
+        store_a.add("Mine")
+        store_b.add("Theirs")
+        first.save()
+        first.flush()
+        assert sorted(e["name"] for e in first.iter_habits()) == ["Mine", "Theirs"]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_migrate_json_to_sqlite(paths, tmp_path):
+    storage = JsonStorage(*paths)
+    store = open_store(storage)
+    store.add("Read", category="Learning", reminder=15)
+    store.add("Run")
+    storage.close()
+
+    db = str(tmp_path / "habits.db")
+    assert migrate_json_to_sqlite(paths[0], db, journal_path=paths[1]) == 2
+    target = SqliteStorage(db)
+    try:
+        assert [(e["name"], e.get("reminder")) for e in target.iter_habits()] == [("Read", 15), ("Run", None)]
+    finally:
+        target.close()
+
+
+def test_sqlite_positions_stay_distinct_across_connections(tmp_path):
+    path = str(tmp_path / "habits.db")
+    first, second = SqliteStorage(path), SqliteStorage(path)
+    try:
+        store_a, store_b = open_store(first), open_store(second)
+        store_a.add("A1")
+        store_b.add("B1")
+        store_a.add("A2")
+        positions = [row[0] for row in first.conn.execute("SELECT position FROM habits ORDER BY position")]
+        assert positions == [0, 1, 2]
+        assert [e["name"] for e in first.iter_habits()] == ["A1", "B1", "A2"]
+    finally:
+        first.close()
+        second.close()
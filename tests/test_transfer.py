@@ -0,0 +1,58 @@
+import io
+
+import pytest
+
+from transfer import FIELDS, TransferError, detect_format, read_habits, write_habits
+
+
+def collect(text, fmt):
+    bad = []
+    entries = list(read_habits(io.StringIO(text), fmt, on_bad=lambda line_no, e: bad.append(line_no)))
+    return entries, bad
+
+
+def test_csv_rows():
+    entries, bad = collect("Name, Category ,progress,reminder\nRead,Learning,0.5,30\n,Health,0,\nRun,,x,\n"
+                           "Walk,,,\nSwim,,,-5\n", "csv")
+    assert entries == [{"name": "Read", "category": "Learning", "progress": 0.5, "reminder": 30},
+                       {"name": "Walk", "category": "Other"}]
+    assert bad == [3, 4, 6]
+
+
+def test_csv_needs_a_name_column():
+    with pytest.raises(TransferError):
+        collect("title\nRead\n", "csv")
+
+
+def test_ndjson_lines():
+    text = '{"name": "Read", "increment": 0.2}\n\nnot json\n[1]\n{"name": "Run", "id": "x"}\n'
+    entries, bad = collect(text, "ndjson")
+    assert entries == [{"name": "Read", "category": "Other", "increment": 0.2},
+                       {"name": "Run", "category": "Other"}]
+    assert bad == [3, 4]
+
+
+def test_written_files_read_back():
+    habits = [{"name": "Read", "progress": 0.5, "increment": 0.1, "category": "Learning", "reminder": 45},
+              {"name": "Run", "progress": 0.0, "increment": 0.2, "category": "Fitness"}]
+    for fmt in ("csv", "ndjson"):
+        f = io.StringIO()
+        for _ in write_habits(f, habits, fmt):
+            pass
+        entries, bad = collect(f.getvalue(), fmt)
+        assert entries == habits and bad == []
+
+
+def test_csv_header_is_the_shared_field_list():
+    f = io.StringIO()
+    for _ in write_habits(f, [], "csv"):
+        pass
+    assert f.getvalue().splitlines() == [",".join(FIELDS)]
+    assert "reminder" in FIELDS
+
+
+def test_detect_format():
+    assert detect_format("a.CSV") == "csv"
+    assert detect_format("a.jsonl") == "ndjson"
+    with pytest.raises(TransferError):
+        detect_format("a.txt")
@@ -0,0 +1,263 @@
+import csv
+import json
+import os
+import queue
+import threading
+
+from habit_store import reminder_minutes
+
+# ---------- Bulk import / export ----------
+# CSV (with a header row) and newline-delimited JSON, one habit per row/line
+# with the fields of HabitCard.to_dict. Files are read and written one row at
+# a time, so memory does not depend on the file size:
+#
+#   id,name,category,progress,increment,reminder    {"id": "3f2a", "name": "Read", ...}
+#   3f2a,Read,Learning,0.5,0.1,30
+#
+# Rows whose (name, category) already exists in the store or earlier in the
+# file are skipped. Imported rows always become new habits (an "id" column is
+# ignored). FIELDS is also the column list of `habit export` (cli.py).
+FIELDS = ("id", "name", "category", "progress", "increment", "reminder")
+FORMATS = ("csv", "ndjson")
+
+
+class TransferError(ValueError):
+    pass
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    raise TransferError(f"unknown file type {ext or path!r} (use .csv or .ndjson)")
+
+
+def habit_key(name, category):
+    # what counts as "the same habit" when importing
+    return str(name).strip().casefold(), str(category).strip().casefold()
+
+
+class CountingLines:
+    # Text lines of a binary file, counting the bytes consumed (for progress)
+    def __init__(self, f):
+        self.f = f
+        self.bytes = 0
+
+    def __iter__(self):
+        first = True
+        for raw in self.f:
+            self.bytes += len(raw)
+            yield raw.decode("utf-8-sig" if first else "utf-8")
+            first = False
+
+
+def _row_entry(row):
+    entry = {}
+    name = (row.get("name") or "").strip()
+    if not name:
+        raise TransferError("missing name")
+    entry["name"] = name
+    entry["category"] = (row.get("category") or "").strip() or "Other"
+    for field in ("progress", "increment"):
+        value = row.get(field)
+        if value not in (None, ""):
+            try:
+                entry[field] = float(value)
+            except (TypeError, ValueError):
+                raise TransferError(f"{field} is not a number: {value!r}")
+    reminder = row.get("reminder")
+    if reminder not in (None, ""):
+        try:
+            entry["reminder"] = reminder_minutes(reminder)
+        except (TypeError, ValueError):
+            raise TransferError(f"reminder is not a whole number of minutes: {reminder!r}")
+    return entry
+
+
+def read_habits(lines, fmt, on_bad=None):
+    # Yield habit entries ({name, category[, progress, increment, reminder]}) from an
+    # iterable of text lines (a text file, CountingLines); rows that do not make
+    # a habit go to on_bad(line number, reason)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        if reader.fieldnames is None:
+            return
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        if "name" not in reader.fieldnames:
+            raise TransferError("the CSV header has no \"name\" column")
+        rows = ((reader.line_num, row) for row in reader)
+    elif fmt == "ndjson":
+        def parse():
+            for line_no, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_no, e
+                    continue
+                yield line_no, row if isinstance(row, dict) else TransferError("not a JSON object")
+        rows = parse()
+    else:
+        raise TransferError(f"unknown format {fmt!r}")
+
+    for line_no, row in rows:
+        try:
+            if isinstance(row, Exception):
+                raise row
+            yield _row_entry(row)
+        except (TransferError, ValueError) as e:
+            if on_bad is not None:
+                on_bad(line_no, e)
+
+
+def write_habits(f, habits, fmt):
+    # Write Habit records (or dicts with FIELDS) to a text file object; a
+    # generator that yields after each row, so callers can report progress.
+    # Fields a habit does not have (no reminder, a dict without id) are left
+    # empty in CSV and out of the JSON object.
+    if fmt == "csv":
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for habit in habits:
+            entry = habit if isinstance(habit, dict) else habit.to_dict()
+            writer.writerow([entry.get(field, "") for field in FIELDS])
+            yield
+    elif fmt == "ndjson":
+        for habit in habits:
+            entry = habit if isinstance(habit, dict) else habit.to_dict()
+            f.write(json.dumps({field: entry[field] for field in FIELDS if field in entry}) + "\n")
+            yield
+    else:
+        raise TransferError(f"unknown format {fmt!r}")
+
+
+# ---------- Background jobs ----------
+class ImportJob:
+    # Parses and de-duplicates a file on a worker thread. New entries come back
+    # in chunks through a bounded queue, so the reader never runs more than
+    # `max_chunks` chunks ahead of the Tk thread draining it with poll().
+    def __init__(self, path, known_keys, fmt=None, chunk_size=500, max_chunks=4):
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        self.chunk_size = chunk_size
+        self.total_bytes = os.path.getsize(path)
+        self.known_keys = known_keys   # owned by the worker from here on
+        self.rows = 0
+        self.duplicates = 0
+        self.bad = []                  # (line number, reason), first 100
+        self.bad_count = 0
+        self.done = False
+        self.error = None
+        self._lines = None
+        self._cancelled = False
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._thread = threading.Thread(target=self._run, name="habit-import", daemon=True)
+        self._thread.start()
+
+    @property
+    def fraction(self):
+        if self.done or not self.total_bytes:
+            return 1.0
+        return min(1.0, self._lines.bytes / self.total_bytes) if self._lines is not None else 0.0
+
+    def _on_bad(self, line_no, reason):
+        self.bad_count += 1
+        if len(self.bad) < 100:
+            self.bad.append((line_no, str(reason)))
+
+    def _put(self, item):
+        # blocks while the queue is full (back-pressure); gives up once cancelled
+        while not self._cancelled:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            with open(self.path, "rb") as f:
+                self._lines = CountingLines(f)
+                chunk = []
+                for entry in read_habits(self._lines, self.fmt, on_bad=self._on_bad):
+                    self.rows += 1
+                    key = habit_key(entry["name"], entry["category"])
+                    if key in self.known_keys:
+                        self.duplicates += 1
+                        continue
+                    self.known_keys.add(key)
+                    chunk.append(entry)
+                    if len(chunk) >= self.chunk_size:
+                        if not self._put(chunk):
+                            return
+                        chunk = []
+                if chunk and not self._put(chunk):
+                    return
+        except Exception as e:
+            self.error = e
+        self._put(None)
+
+    def poll(self, max_chunks=4):
+        # (Tk thread) chunks ready so far; sets `done` after the last one
+        chunks = []
+        while len(chunks) < max_chunks:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if chunk is None:
+                self.done = True
+                break
+            chunks.append(chunk)
+        return chunks
+
+    def cancel(self):
+        self._cancelled = True
+        self._thread.join(1.0)
+
+
+class ExportJob:
+    # Writes habits to a file on a worker thread (to a temporary file that
+    # replaces the target when complete). `habits` is a list of the store's
+    # records taken on the Tk thread; each is converted when it is written.
+    def __init__(self, path, habits, fmt=None):
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        self.habits = habits
+        self.total = len(habits)
+        self.written = 0
+        self.done = False
+        self.error = None
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, name="habit-export", daemon=True)
+        self._thread.start()
+
+    @property
+    def fraction(self):
+        return 1.0 if self.done or not self.total else self.written / self.total
+
+    def _run(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                for _ in write_habits(f, self.habits, self.fmt):
+                    self.written += 1
+                    if self._cancelled:
+                        break
+            if self._cancelled:
+                os.remove(tmp)
+            else:
+                os.replace(tmp, self.path)
+        except Exception as e:
+            self.error = e
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.done = True
+
+    def cancel(self):
+        self._cancelled = True
+        self._thread.join(1.0)